@@ -15,7 +15,12 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import ROOM_AREA, BATHROOM_AREA, FRAME_PATH, FRAME_WIDTH, FRAME_HEIGHT
+from config import (
+    ROOM_AREA, BATHROOM_AREA, FRAME_PATH, FRAME_WIDTH, FRAME_HEIGHT,
+    SHM_FRAMES_ENABLED, SHM_FRAMES_NAME, ZONES_CONFIG_PATH
+)
+from pipeline.memoria_compartilhada import LeitorAnelFrames
+from pipeline.zonas import TIPO_BANHEIRO, TIPO_QUARTO, Zona, carregar_zonas, salvar_zonas
 
 
 class CalibracaoVisual:
@@ -28,6 +33,39 @@ class CalibracaoVisual:
         self.frame_path = FRAME_PATH
         self.frame_width = FRAME_WIDTH
         self.frame_height = FRAME_HEIGHT
+        self.zonas_path = ZONES_CONFIG_PATH
+    
+    def area_inicial(self, tipo: str, padrao: list) -> list:
+        """Retângulo normalizado das zonas de um tipo no arquivo de zonas (ou o padrão)."""
+        zonas = carregar_zonas(self.zonas_path, ROOM_AREA, BATHROOM_AREA).do_tipo(tipo)
+        if not zonas:
+            return list(padrao)
+        pontos = np.concatenate([z.pontos for z in zonas])
+        x1, y1 = pontos.min(axis=0)
+        x2, y2 = pontos.max(axis=0)
+        return [float(x1), float(y1), float(x2), float(y2)]
+    
+    def desenhar_zonas(self, frame: np.ndarray, zonas: list) -> np.ndarray:
+        """
+        Desenha zonas poligonais no frame.
+        
+        Args:
+            frame: Frame numpy (RGB)
+            zonas: Lista de Zona
+        
+        Returns:
+            Frame com as zonas desenhadas
+        """
+        frame_copy = frame.copy()
+        altura, largura = frame_copy.shape[:2]
+        for zona in zonas:
+            pontos = zona.pontos_px(largura, altura)
+            cor = tuple(reversed(zona.cor))  # BGR da configuração -> RGB da imagem
+            cv2.polylines(frame_copy, [pontos], True, cor, 3)
+            x, y = pontos[np.argmin(pontos[:, 1])]
+            cv2.putText(frame_copy, zona.nome, (int(x), int(y) + 25),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, cor, 2)
+        return frame_copy
     
     def desenhar_area(self, frame: np.ndarray, area: Tuple[float, float, float, float], 
                      cor: Tuple[int, int, int] = (0, 255, 0), label: str = "") -> np.ndarray:
@@ -73,9 +111,15 @@ class CalibracaoVisual:
         st.title("🎯 Calibração Visual de Áreas")
         st.markdown("Configure as áreas de monitoramento arrastando os sliders abaixo.")
         
-        # Carregar frame atual
+        # Carregar frame atual (memória compartilhada do pipeline ou JPEG salvo)
         frame_atual = None
-        if Path(self.frame_path).exists():
+        if SHM_FRAMES_ENABLED:
+            leitor = LeitorAnelFrames(SHM_FRAMES_NAME)
+            frame_atual = leitor.ler_mais_recente()
+            leitor.fechar()
+            if frame_atual is not None:
+                frame_atual = cv2.cvtColor(frame_atual, cv2.COLOR_BGR2RGB)
+        if frame_atual is None and Path(self.frame_path).exists():
             try:
                 frame_atual = cv2.imread(self.frame_path)
                 if frame_atual is not None:
@@ -87,8 +131,11 @@ class CalibracaoVisual:
             st.warning("⚠️ Nenhum frame disponível. Inicie o sistema de inferência primeiro.")
             return
         
-        # Tabs para quarto e banheiro
-        tab_quarto, tab_banheiro = st.tabs(["🏠 Quarto", "🚿 Banheiro"])
+        area_quarto = self.area_inicial(TIPO_QUARTO, ROOM_AREA)
+        area_banheiro = self.area_inicial(TIPO_BANHEIRO, BATHROOM_AREA)
+        
+        # Tabs para quarto, banheiro e zonas poligonais livres
+        tab_quarto, tab_banheiro, tab_poligonos = st.tabs(["🏠 Quarto", "🚿 Banheiro", "🔷 Zonas (polígonos)"])
         
         with tab_quarto:
             st.subheader("Configurar Área do Quarto")
@@ -99,10 +146,10 @@ class CalibracaoVisual:
                 st.markdown("### 📐 Coordenadas")
                 st.info("Coordenadas normalizadas (0.0 a 1.0)")
                 
-                room_x1 = st.slider("X1 (esquerda)", 0.0, 1.0, ROOM_AREA[0], 0.01, key="room_x1")
-                room_y1 = st.slider("Y1 (topo)", 0.0, 1.0, ROOM_AREA[1], 0.01, key="room_y1")
-                room_x2 = st.slider("X2 (direita)", 0.0, 1.0, ROOM_AREA[2], 0.01, key="room_x2")
-                room_y2 = st.slider("Y2 (fundo)", 0.0, 1.0, ROOM_AREA[3], 0.01, key="room_y2")
+                room_x1 = st.slider("X1 (esquerda)", 0.0, 1.0, area_quarto[0], 0.01, key="room_x1")
+                room_y1 = st.slider("Y1 (topo)", 0.0, 1.0, area_quarto[1], 0.01, key="room_y1")
+                room_x2 = st.slider("X2 (direita)", 0.0, 1.0, area_quarto[2], 0.01, key="room_x2")
+                room_y2 = st.slider("Y2 (fundo)", 0.0, 1.0, area_quarto[3], 0.01, key="room_y2")
                 
                 # Validar
                 if room_x1 >= room_x2:
@@ -137,10 +184,10 @@ class CalibracaoVisual:
                 st.markdown("### 📐 Coordenadas")
                 st.info("Coordenadas normalizadas (0.0 a 1.0)")
                 
-                bath_x1 = st.slider("X1 (esquerda)", 0.0, 1.0, BATHROOM_AREA[0], 0.01, key="bath_x1")
-                bath_y1 = st.slider("Y1 (topo)", 0.0, 1.0, BATHROOM_AREA[1], 0.01, key="bath_y1")
-                bath_x2 = st.slider("X2 (direita)", 0.0, 1.0, BATHROOM_AREA[2], 0.01, key="bath_x2")
-                bath_y2 = st.slider("Y2 (fundo)", 0.0, 1.0, BATHROOM_AREA[3], 0.01, key="bath_y2")
+                bath_x1 = st.slider("X1 (esquerda)", 0.0, 1.0, area_banheiro[0], 0.01, key="bath_x1")
+                bath_y1 = st.slider("Y1 (topo)", 0.0, 1.0, area_banheiro[1], 0.01, key="bath_y1")
+                bath_x2 = st.slider("X2 (direita)", 0.0, 1.0, area_banheiro[2], 0.01, key="bath_x2")
+                bath_y2 = st.slider("Y2 (fundo)", 0.0, 1.0, area_banheiro[3], 0.01, key="bath_y2")
                 
                 # Validar
                 if bath_x1 >= bath_x2:
@@ -166,6 +213,9 @@ class CalibracaoVisual:
                 st.image(frame_preview, use_container_width=True)
                 st.caption(f"Área: ({bath_x1:.2f}, {bath_y1:.2f}) a ({bath_x2:.2f}, {bath_y2:.2f})")
         
+        with tab_poligonos:
+            self.criar_editor_poligonos(frame_atual)
+        
         # Preview combinado
         st.markdown("---")
         st.subheader("📊 Preview Combinado")
@@ -202,41 +252,52 @@ class CalibracaoVisual:
                 mime="application/json"
             )
     
-    def salvar_configuracao_quarto(self, area: list):
-        """Salva configuração do quarto em arquivo."""
-        config_file = Path("config_areas.json")
-        config = {}
+    def criar_editor_poligonos(self, frame_atual: np.ndarray):
+        """Editor das zonas poligonais (JSON) com preview sobre o frame atual."""
+        st.subheader("Zonas Poligonais")
+        st.info(
+            "Cada zona tem nome, tipo (quarto, banheiro ou livre: cama, porta, poltrona...) "
+            "e vértices normalizados [x, y] de 0.0 a 1.0. Zonas podem se sobrepor."
+        )
         
-        if config_file.exists():
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                pass
+        camera = st.text_input("Câmera (vazio = zonas padrão)", value="", key="zonas_camera").strip() or None
+        zonas_atuais = carregar_zonas(self.zonas_path, ROOM_AREA, BATHROOM_AREA, camera=camera).zonas
+        texto = st.text_area(
+            "Zonas (JSON)",
+            json.dumps([z.para_dict() for z in zonas_atuais], indent=2, ensure_ascii=False),
+            height=300,
+            key=f"zonas_json_{camera or ''}"
+        )
         
-        config['room_area'] = area
-        config['room_area_updated'] = datetime.now().isoformat()
+        try:
+            zonas = [Zona.de_dict(z) for z in json.loads(texto)]
+        except Exception as e:
+            st.error(f"⚠️ Zonas inválidas: {e}")
+            return
+        
+        st.image(self.desenhar_zonas(frame_atual, zonas), use_container_width=True)
+        st.caption(" | ".join(f"{z.nome} ({z.tipo}, {len(z.pontos)} pontos)" for z in zonas))
         
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        if st.button("💾 Salvar Zonas", use_container_width=True):
+            salvar_zonas(self.zonas_path, zonas, camera=camera)
+            st.success(f"✅ {len(zonas)} zona(s) salva(s) em {self.zonas_path}")
+    
+    def salvar_area_retangular(self, tipo: str, nome: str, area: list):
+        """Substitui as zonas de um tipo por um retângulo no arquivo de zonas."""
+        zonas = [
+            z for z in carregar_zonas(self.zonas_path, ROOM_AREA, BATHROOM_AREA).zonas
+            if z.tipo != tipo
+        ]
+        zonas.append(Zona.retangulo(nome, tipo, area))
+        salvar_zonas(self.zonas_path, zonas)
+    
+    def salvar_configuracao_quarto(self, area: list):
+        """Salva a área do quarto no arquivo de zonas."""
+        self.salvar_area_retangular(TIPO_QUARTO, "Quarto", area)
     
     def salvar_configuracao_banheiro(self, area: list):
-        """Salva configuração do banheiro em arquivo."""
-        config_file = Path("config_areas.json")
-        config = {}
-        
-        if config_file.exists():
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                pass
-        
-        config['bathroom_area'] = area
-        config['bathroom_area_updated'] = datetime.now().isoformat()
-        
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        """Salva a área do banheiro no arquivo de zonas."""
+        self.salvar_area_retangular(TIPO_BANHEIRO, "Banheiro", area)
 
 
 def criar_pagina_calibracao():
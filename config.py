@@ -19,6 +19,13 @@ RESULTS_DIR = BASE_DIR / "resultados"
 LOGS_DIR = BASE_DIR / "logs"
 MODELS_DIR = BASE_DIR / "modelos"
 
+
+def _caminho_projeto(valor: str) -> str:
+    """Caminho relativo vindo do ambiente é relativo à raiz do projeto, não ao diretório de trabalho."""
+    caminho = Path(valor).expanduser()
+    return str(caminho if caminho.is_absolute() else BASE_DIR / caminho)
+
+
 # Criar diretórios se não existirem
 RESULTS_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
@@ -35,19 +42,62 @@ MONITOR_IDX = int(os.getenv("MONITOR_IDX", "3"))
 FRAME_WIDTH = int(os.getenv("FRAME_WIDTH", "1280"))
 FRAME_HEIGHT = int(os.getenv("FRAME_HEIGHT", "720"))
 FPS = int(os.getenv("FPS", "20"))
+# Sub-retângulo do monitor a capturar, em coordenadas normalizadas "x1,y1,x2,y2"
+# de 0.0 a 1.0 (vazio = monitor inteiro). Ex.: CAPTURE_REGION=0.5,0,1,1 = metade direita
+CAPTURE_REGION = [float(v) for v in os.getenv("CAPTURE_REGION", "").split(",") if v.strip()] or None
 
 # Configurações do modelo YOLO
 # Modelo customizado treinado para detecção de quedas
 MODEL_PATH = os.getenv("MODEL_PATH", str(BASE_DIR / "modelos" / "queda_custom.pt"))
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.4"))
 
+# Backend de inferência: pytorch | onnx | openvino | onnx_int8
+# Os artefatos são exportados a partir do .pt e guardados ao lado dele
+# (ver scripts/exportar_modelo.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch").lower()
+INFERENCE_IMGSZ = int(os.getenv("INFERENCE_IMGSZ", "640"))
+BACKEND_AUTO_EXPORT = os.getenv("BACKEND_AUTO_EXPORT", "true").lower() == "true"
+
+# Pool de processos de inferência (0 = inferência no próprio processo)
+# Cada worker carrega o modelo e limita o PyTorch/OpenMP a INFERENCE_WORKER_THREADS
+# threads; para 4-8 câmeras em CPU, workers x threads ~ número de núcleos físicos
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_WORKER_THREADS = int(os.getenv("INFERENCE_WORKER_THREADS", "2"))
+INFERENCE_WORKER_TIMEOUT = float(os.getenv("INFERENCE_WORKER_TIMEOUT", "30"))
+
+# Troca de modelo a quente: pesos alterados em disco (ou pedidos pelo arquivo de
+# comando / SIGHUP) são carregados e validados em segundo plano e trocados entre
+# dois frames; falhas nos primeiros MODEL_SWAP_PROBATION_FRAMES revertem a troca
+MODEL_HOT_SWAP_ENABLED = os.getenv("MODEL_HOT_SWAP_ENABLED", "true").lower() == "true"
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+MODEL_SWAP_COMMAND_PATH = _caminho_projeto(
+    os.getenv("MODEL_SWAP_COMMAND_PATH", str(RESULTS_DIR / "trocar_modelo.json"))
+)
+MODEL_SWAP_PROBATION_FRAMES = int(os.getenv("MODEL_SWAP_PROBATION_FRAMES", "30"))
+
 # Configurações de detecção
 # Classes COCO: person=0
 PERSON_CLASS_ID = 0
 FALL_DETECTION_ENABLED = os.getenv("FALL_DETECTION_ENABLED", "true").lower() == "true"
 
+# Cascata de detecção de quedas: o modelo customizado só roda sobre recortes das
+# pessoas candidatas (proporção baixa, posição baixa ou queda brusca de altura do track)
+# ou a cada FALL_CASCADE_HEARTBEAT_SECONDS. Se False, roda no frame inteiro a cada frame.
+FALL_CASCADE_ENABLED = os.getenv("FALL_CASCADE_ENABLED", "false").lower() == "true"
+FALL_CASCADE_HEARTBEAT_SECONDS = float(os.getenv("FALL_CASCADE_HEARTBEAT_SECONDS", "5"))
+FALL_CASCADE_ASPECT_RATIO = float(os.getenv("FALL_CASCADE_ASPECT_RATIO", "1.0"))
+FALL_CASCADE_LOW_POSITION = float(os.getenv("FALL_CASCADE_LOW_POSITION", "0.8"))
+FALL_CASCADE_HEIGHT_DROP = float(os.getenv("FALL_CASCADE_HEIGHT_DROP", "0.35"))
+
 # Configurações de tracking de pessoas
 TRACKING_ENABLED = os.getenv("TRACKING_ENABLED", "true").lower() == "true"
+# "ultralytics" (model.track, estado dentro do modelo) ou "interno" (rastreador
+# NumPy por câmera, independente de backend, lotes, pool e frames pulados).
+# O motor multi-câmera sempre usa o interno
+TRACKER = os.getenv("TRACKER", "ultralytics").lower()
+TRACKER_IOU = float(os.getenv("TRACKER_IOU", "0.3"))
+# Atualizações sem detecção até a trilha ser descartada
+TRACKER_MAX_LOST = int(os.getenv("TRACKER_MAX_LOST", "30"))
 
 # Configurações de contagem de pessoas no quarto
 ROOM_COUNT_ENABLED = os.getenv("ROOM_COUNT_ENABLED", "true").lower() == "true"
@@ -66,6 +116,12 @@ ROOM_AREA = [
 BATHROOM_MONITORING_ENABLED = os.getenv("BATHROOM_MONITORING_ENABLED", "true").lower() == "true"
 BATHROOM_TIME_LIMIT_MINUTES = int(os.getenv("BATHROOM_TIME_LIMIT_MINUTES", "10"))
 BATHROOM_TIME_LIMIT_SECONDS = BATHROOM_TIME_LIMIT_MINUTES * 60
+# Tempo sem detecção até considerar que a pessoa saiu do banheiro (0 = primeiro frame
+# sem ela). Uma tolerância curta evita que falhas de detecção zerem o cronômetro
+BATHROOM_EXIT_GRACE_SECONDS = float(os.getenv("BATHROOM_EXIT_GRACE_SECONDS", "0"))
+# Máximo de pessoas guardadas nos estados de banheiro/notificações (as vistas há
+# mais tempo são descartadas); sem tracking as chaves são posições e não se repetem
+TRACK_STORE_MAX = int(os.getenv("TRACK_STORE_MAX", "256"))
 # Área do banheiro em coordenadas normalizadas (x1, y1, x2, y2) de 0.0 a 1.0
 # Exemplo: [0.6, 0.0, 1.0, 1.0] = lado direito da tela
 BATHROOM_AREA = [
@@ -75,15 +131,96 @@ BATHROOM_AREA = [
     float(os.getenv("BATHROOM_Y2", "1.0"))
 ]
 
+# Zonas poligonais (quarto, banheiro, cama, porta...) gravadas pela calibração visual.
+# Sem o arquivo, ROOM_AREA e BATHROOM_AREA são usadas como zonas retangulares
+ZONES_CONFIG_PATH = _caminho_projeto(os.getenv("ZONES_CONFIG_PATH", "config_zonas.json"))
+
+# Configurações do pipeline de inferência
+# "sequencial" = captura, inferência, desenho e envio um após o outro na mesma thread
+# "estagios" = cada etapa em um worker próprio, ligadas por filas limitadas
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "sequencial").lower()
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+
+# Portão de movimento: com a cena parada (diferença de frames abaixo do limiar),
+# o modelo é pulado e as últimas detecções reaproveitadas; uma inferência é
+# forçada a cada MOTION_GATE_FORCE_SECONDS por segurança
+MOTION_GATE_ENABLED = os.getenv("MOTION_GATE_ENABLED", "false").lower() == "true"
+MOTION_GATE_THRESHOLD = float(os.getenv("MOTION_GATE_THRESHOLD", "0.002"))  # fração de pixels alterados
+MOTION_GATE_PIXEL_DIFF = int(os.getenv("MOTION_GATE_PIXEL_DIFF", "25"))  # diferença mínima de intensidade
+MOTION_GATE_WIDTH = int(os.getenv("MOTION_GATE_WIDTH", "160"))  # largura da imagem reduzida
+MOTION_GATE_FORCE_SECONDS = float(os.getenv("MOTION_GATE_FORCE_SECONDS", "5"))
+
+# Keyframes: o modelo roda a cada KEYFRAME_INTERVAL frames (ou quando a cena
+# volta a se mexer com o portão de movimento); nos demais, as caixas são
+# propagadas por Kalman + fluxo óptico. 1 = inferência em todo frame
+KEYFRAME_INTERVAL = max(1, int(os.getenv("KEYFRAME_INTERVAL", "1")))
+KEYFRAME_FLOW_WIDTH = int(os.getenv("KEYFRAME_FLOW_WIDTH", "320"))  # largura do frame do fluxo óptico
+
+# Inferência restrita às zonas: o frame é recortado para a união das áreas habilitadas
+# (quarto se ROOM_USE_AREA, banheiro se BATHROOM_MONITORING_ENABLED) mais uma margem
+# antes de ir para o modelo. Pessoas fora dessa região não são detectadas.
+ROI_INFERENCE_ENABLED = os.getenv("ROI_INFERENCE_ENABLED", "false").lower() == "true"
+ROI_MARGIN = float(os.getenv("ROI_MARGIN", "0.05"))  # fração da largura/altura do frame
+
+# Configurações do motor multi-câmera (scripts/inferencia_multicamera.py)
+# Lista "nome=fonte" separada por vírgula; fonte = "monitor:N", URL RTSP/HTTP ou arquivo
+# Exemplo: CAMERAS=quarto1=monitor:3,quarto2=rtsp://10.0.0.5:554/stream
+CAMERAS = os.getenv("CAMERAS", f"monitor:{MONITOR_IDX}")
+MULTICAM_BATCH_SIZE = int(os.getenv("MULTICAM_BATCH_SIZE", "8"))
+MULTICAM_STATUS_PATH = str(RESULTS_DIR / "status_cameras.json")
+
 # Configurações do FFmpeg
 FFMPEG_PRESET = os.getenv("FFMPEG_PRESET", "ultrafast")
 FFMPEG_TUNE = os.getenv("FFMPEG_TUNE", "zerolatency")
+# Frames aguardando o FFmpeg; com a fila cheia o mais antigo é descartado
+FFMPEG_QUEUE_SIZE = int(os.getenv("FFMPEG_QUEUE_SIZE", "2"))
+# Espera inicial (s) antes de reiniciar o FFmpeg após uma falha (dobra a cada falha)
+FFMPEG_RESTART_DELAY = float(os.getenv("FFMPEG_RESTART_DELAY", "1"))
+# Publicador RTSP: "ffmpeg" (subprocesso lendo BGR cru por pipe) ou "pyav"
+# (codificação H.264 no próprio processo; requer o pacote av)
+RTSP_PUBLISHER = os.getenv("RTSP_PUBLISHER", "ffmpeg").lower()
+
+# Consumidores do vídeo anotado: sem nenhum, o overlay não é renderizado
+RTSP_PUBLISH_ENABLED = os.getenv("RTSP_PUBLISH_ENABLED", "true").lower() == "true"
+PANEL_FRAME_ENABLED = os.getenv("PANEL_FRAME_ENABLED", "true").lower() == "true"
 
 # Configurações do painel
 FRAME_PATH = str(RESULTS_DIR / "ultima_frame.jpg")
 STATUS_PATH = str(RESULTS_DIR / "status.txt")
 ROOM_COUNT_PATH = str(RESULTS_DIR / "contagem_quarto.txt")
 BATHROOM_STATUS_PATH = str(RESULTS_DIR / "status_banheiro.txt")
+# Publicações por segundo do frame/status para o painel (independente do FPS da inferência)
+STATE_PUBLISH_FPS = float(os.getenv("STATE_PUBLISH_FPS", "2"))
+PANEL_JPEG_QUALITY = int(os.getenv("PANEL_JPEG_QUALITY", "85"))
+
+# Anel de frames em memória compartilhada (consumidores locais leem sem JPEG/RTSP)
+SHM_FRAMES_ENABLED = os.getenv("SHM_FRAMES_ENABLED", "true").lower() == "true"
+SHM_FRAMES_NAME = os.getenv("SHM_FRAMES_NAME", "iasenior_frames")
+SHM_FRAMES_SLOTS = int(os.getenv("SHM_FRAMES_SLOTS", "4"))
+# Segundo anel com os frames crus (antes do overlay), lido pelo servidor MJPEG
+# com detecções: no anel anotado ele inferiria sobre caixas já desenhadas
+SHM_RAW_FRAMES_ENABLED = os.getenv("SHM_RAW_FRAMES_ENABLED", "false").lower() == "true"
+SHM_RAW_FRAMES_NAME = os.getenv("SHM_RAW_FRAMES_NAME", f"{SHM_FRAMES_NAME}_cru")
+
+# Clipes pré-evento: anel de JPEGs por câmera descarregado em clipe .avi em
+# quedas e alertas de banheiro (caminho gravado em deteccoes_queda.clip_path)
+CLIP_ENABLED = os.getenv("CLIP_ENABLED", "true").lower() == "true"
+CLIP_DIR = os.getenv("CLIP_DIR", str(RESULTS_DIR / "clipes"))
+CLIP_PRE_SECONDS = float(os.getenv("CLIP_PRE_SECONDS", "10"))
+CLIP_POST_SECONDS = float(os.getenv("CLIP_POST_SECONDS", "5"))
+CLIP_FPS = float(os.getenv("CLIP_FPS", "5"))
+CLIP_JPEG_QUALITY = int(os.getenv("CLIP_JPEG_QUALITY", "70"))
+# Teto de memória do anel por câmera
+CLIP_MAX_MB = float(os.getenv("CLIP_MAX_MB", "32"))
+
+# Métricas de desempenho (formato Prometheus): latência por estágio (p50/p95/p99
+# nas últimas METRICS_WINDOW execuções), filas e descartes. O stream de inferência
+# expõe em http://METRICS_HOST:METRICS_PORT/metrics; os servidores MJPEG, na rota /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Endpoint sem autenticação: só local por padrão; 0.0.0.0 expõe em todas as interfaces
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1024"))
 
 # Configurações do servidor MJPEG
 MJPEG_HOST = os.getenv("MJPEG_HOST", "0.0.0.0")
@@ -174,11 +174,17 @@ class DatabaseManager:
                         posicao_x NUMERIC,
                         posicao_y NUMERIC,
                         metadata JSONB,
+                        clip_path TEXT,
                         timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
                         created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
                     );
                 """)
                 
+                # Bancos criados antes dos clipes pré-evento
+                cur.execute("""
+                    ALTER TABLE deteccoes_queda ADD COLUMN IF NOT EXISTS clip_path TEXT;
+                """)
+                
                 # Índice para detecções de queda
                 cur.execute("""
                     CREATE INDEX IF NOT EXISTS idx_queda_timestamp ON deteccoes_queda(timestamp);
@@ -435,7 +441,8 @@ class DatabaseManager:
             self.return_connection(conn)
     
     def inserir_deteccao_queda(self, confianca: float = None, posicao_x: float = None, 
-                               posicao_y: float = None, metadata: Dict = None) -> int:
+                               posicao_y: float = None, metadata: Dict = None,
+                               clip_path: str = None) -> int:
         """
         Insere detecção de queda.
         
@@ -444,6 +451,7 @@ class DatabaseManager:
             posicao_x: Posição X
             posicao_y: Posição Y
             metadata: Dados adicionais
+            clip_path: Clipe com os segundos antes/depois da queda
         
         Returns:
             ID da detecção inserida
@@ -452,11 +460,11 @@ class DatabaseManager:
         try:
             with conn.cursor() as cur:
                 cur.execute("""
-                    INSERT INTO deteccoes_queda (confianca, posicao_x, posicao_y, metadata, timestamp)
-                    VALUES (%s, %s, %s, %s, %s)
+                    INSERT INTO deteccoes_queda (confianca, posicao_x, posicao_y, metadata, clip_path, timestamp)
+                    VALUES (%s, %s, %s, %s, %s, %s)
                     RETURNING id
                 """, (confianca, posicao_x, posicao_y, 
-                      json.dumps(metadata) if metadata else None, datetime.now()))
+                      json.dumps(metadata) if metadata else None, clip_path, datetime.now()))
                 
                 deteccao_id = cur.fetchone()[0]
                 conn.commit()
@@ -9,8 +9,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from ultralytics import YOLO
 from config import MODEL_PATH
+from pipeline.backends import carregar_modelo
 
 MODELOS_DIR = Path(__file__).parent.parent.parent / "modelos"
 MODELO_CUSTOM = MODELOS_DIR / "queda_custom.pt"
@@ -36,22 +36,24 @@ class DetectorQuedaCustomizado:
             print(f"   Usando modelo padrão: {MODEL_PATH}")
             modelo_path = MODEL_PATH
         
-        self.model = YOLO(str(modelo_path))
+        self.model = carregar_modelo(modelo_path)
         self.conf_threshold = conf_threshold
         self.modelo_custom = Path(modelo_path) == MODELO_CUSTOM
+        self.execucoes = 0  # Número de passagens do modelo (para métricas)
         
         if self.modelo_custom:
             print(f"✅ Usando modelo customizado: {modelo_path}")
         else:
             print(f"ℹ️  Usando modelo padrão: {modelo_path}")
     
-    def detectar(self, frame, mostrar_todas_deteccoes=False):
+    def detectar(self, frame, mostrar_todas_deteccoes=False, anotar=True):
         """
         Detecta quedas em um frame.
         
         Args:
             frame: Frame numpy (BGR)
             mostrar_todas_deteccoes: Se True, mostra todas as detecções mesmo abaixo do threshold
+            anotar: Se False, não copia nem desenha o frame (frame_anotado = None)
         
         Returns:
             (tem_queda, deteccoes, frame_anotado)
@@ -69,31 +71,13 @@ class DetectorQuedaCustomizado:
             conf=threshold_inferencia,
             verbose=False
         )
+        self.execucoes += 1
         
-        deteccoes = []
-        tem_queda = False
+        deteccoes = self._extrair_quedas(results, [(0, 0)] * len(results), mostrar_todas_deteccoes)
+        tem_queda = len(deteccoes) > 0
         
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None and len(boxes) > 0:
-                for box in boxes:
-                    conf = float(box.conf[0])
-                    cls = int(box.cls[0])
-                    
-                    # Filtrar por threshold se não mostrar todas
-                    if not mostrar_todas_deteccoes and conf < self.conf_threshold:
-                        continue
-                    
-                    # Classe 0 = queda (no modelo customizado)
-                    if cls == 0 or (not self.modelo_custom and self._eh_queda_heuristica(box, frame)):
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        
-                        deteccoes.append({
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'confianca': conf,
-                            'classe': cls
-                        })
-                        tem_queda = True
+        if not anotar:
+            return tem_queda, deteccoes, None
         
         # Anotar frame
         frame_anotado = frame.copy()
@@ -115,6 +99,76 @@ class DetectorQuedaCustomizado:
         
         return tem_queda, deteccoes, frame_anotado
     
+    def detectar_recortes(self, frame, caixas, margem=0.2):
+        """
+        Detecta quedas apenas nos recortes das pessoas indicadas (segundo estágio da cascata).
+        
+        Os recortes são inferidos em um único lote e as caixas voltam para
+        coordenadas do frame. Não há anotação.
+        
+        Args:
+            frame: Frame numpy (BGR)
+            caixas: Array (N, 4) com as caixas das pessoas em pixels (x1, y1, x2, y2)
+            margem: Margem relativa adicionada em volta de cada caixa
+        
+        Returns:
+            (tem_queda, deteccoes)
+        """
+        if len(caixas) == 0:
+            tem_queda, deteccoes, _ = self.detectar(frame, anotar=False)
+            return tem_queda, deteccoes
+        
+        altura, largura = frame.shape[:2]
+        recortes = []
+        offsets = []
+        for x1, y1, x2, y2 in caixas:
+            mx = (x2 - x1) * margem
+            my = (y2 - y1) * margem
+            rx1 = max(0, int(x1 - mx))
+            ry1 = max(0, int(y1 - my))
+            rx2 = min(largura, int(x2 + mx))
+            ry2 = min(altura, int(y2 + my))
+            if rx2 - rx1 < 2 or ry2 - ry1 < 2:
+                continue
+            recortes.append(cv2.cvtColor(frame[ry1:ry2, rx1:rx2], cv2.COLOR_BGR2RGB))
+            offsets.append((rx1, ry1))
+        
+        if not recortes:
+            return False, []
+        
+        results = self.model.predict(recortes, conf=self.conf_threshold, verbose=False)
+        self.execucoes += 1
+        
+        deteccoes = self._extrair_quedas(results, offsets, False)
+        return len(deteccoes) > 0, deteccoes
+    
+    def _extrair_quedas(self, results, offsets, mostrar_todas_deteccoes):
+        """Converte os resultados do modelo em detecções de queda em coordenadas do frame."""
+        deteccoes = []
+        
+        for result, (dx, dy) in zip(results, offsets):
+            boxes = result.boxes
+            if boxes is not None and len(boxes) > 0:
+                for box in boxes:
+                    conf = float(box.conf[0])
+                    cls = int(box.cls[0])
+                    
+                    # Filtrar por threshold se não mostrar todas
+                    if not mostrar_todas_deteccoes and conf < self.conf_threshold:
+                        continue
+                    
+                    # Classe 0 = queda (no modelo customizado)
+                    if cls == 0 or (not self.modelo_custom and self._eh_queda_heuristica(box, None)):
+                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                        
+                        deteccoes.append({
+                            'bbox': [int(x1) + dx, int(y1) + dy, int(x2) + dx, int(y2) + dy],
+                            'confianca': conf,
+                            'classe': cls
+                        })
+        
+        return deteccoes
+    
     def _eh_queda_heuristica(self, box, frame):
         """Heurística de queda (fallback se não usar modelo customizado)"""
         x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
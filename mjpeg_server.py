@@ -8,11 +8,18 @@ import cv2
 import logging
 import time
 import sys
+import threading
 from pathlib import Path
 
 # Adicionar diretório raiz ao path para importar config
 sys.path.insert(0, str(Path(__file__).parent))
-from config import RTSP_URL, MJPEG_HOST, MJPEG_PORT, LOGS_DIR
+from config import (
+    RTSP_URL, MJPEG_HOST, MJPEG_PORT, LOGS_DIR, SHM_FRAMES_ENABLED, SHM_FRAMES_NAME,
+    METRICS_WINDOW
+)
+from pipeline.leitor_rtsp import LeitorUltimoFrame
+from pipeline.memoria_compartilhada import LeitorAnelFrames
+from pipeline.metricas import CONTENT_TYPE_PROMETHEUS, RegistroMetricas
 
 # Configurar logging
 LOGS_DIR.mkdir(exist_ok=True)
@@ -29,103 +36,72 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Variáveis globais para gerenciar a conexão
-cap = None
+# Leitor contínuo do RTSP, compartilhado pelos clientes (criado sob demanda)
+leitor_rtsp = None
+leitor_rtsp_lock = threading.Lock()
+leitor_status = LeitorAnelFrames(SHM_FRAMES_NAME) if SHM_FRAMES_ENABLED else None
+metricas = RegistroMetricas(janela=METRICS_WINDOW)
+clientes_conectados = 0
+metricas.expor('clientes_conectados', lambda: clientes_conectados, ajuda="Clientes MJPEG conectados")
 RECONNECT_DELAY = 5  # segundos
-MAX_RECONNECT_ATTEMPTS = 10
-
 
-def inicializar_captura():
-    """Inicializa ou reinicializa a captura RTSP."""
-    global cap
-    
-    if cap is not None:
-        try:
-            cap.release()
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao liberar captura anterior: {e}")
-    
-    try:
-        logger.info(f"🎥 Conectando ao stream RTSP: {RTSP_URL}")
-        cap = cv2.VideoCapture(RTSP_URL)
-        
-        if not cap.isOpened():
-            logger.error(f"❌ Não foi possível abrir o stream: {RTSP_URL}")
-            return False
-        
-        # Configurar buffer mínimo para reduzir latência
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        logger.info("✅ Stream RTSP conectado com sucesso!")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Erro ao conectar ao stream: {e}", exc_info=True)
-        return False
 
-
-def reconectar():
-    """Tenta reconectar ao stream RTSP."""
-    global cap
+def obter_leitor_rtsp():
+    """
+    Leitor do stream RTSP, iniciado no primeiro cliente que precisar dele.
     
-    for attempt in range(MAX_RECONNECT_ATTEMPTS):
-        logger.info(f"🔄 Tentativa de reconexão {attempt + 1}/{MAX_RECONNECT_ATTEMPTS}...")
-        
-        if inicializar_captura():
-            return True
-        
-        if attempt < MAX_RECONNECT_ATTEMPTS - 1:
-            time.sleep(RECONNECT_DELAY)
+    Uma thread decodifica continuamente e guarda só o frame mais recente;
+    a reconexão automática também fica com ela.
+    """
+    global leitor_rtsp
     
-    logger.error("❌ Falha ao reconectar após todas as tentativas")
-    return False
+    with leitor_rtsp_lock:
+        if leitor_rtsp is None:
+            logger.info(f"🎥 Conectando ao stream RTSP: {RTSP_URL}")
+            leitor = LeitorUltimoFrame(RTSP_URL, atraso_reconexao=RECONNECT_DELAY, nome="rtsp")
+            metricas.expor('erros_leitura_total', lambda: leitor.erros_leitura, tipo='counter',
+                           ajuda="Falhas ao ler frame do stream")
+            metricas.expor('frames_nao_consumidos_total', lambda: leitor.frames_nao_consumidos,
+                           tipo='counter', ajuda="Frames decodificados e substituídos antes de serem lidos")
+            metricas.expor('reconexoes_total', lambda: leitor.reconexoes, tipo='counter',
+                           ajuda="Reconexões ao stream RTSP")
+            leitor.iniciar()
+            leitor_rtsp = leitor
+        return leitor_rtsp
 
 
 def gerar_frames():
     """
     Generator que produz frames do stream RTSP.
-    Implementa reconexão automática em caso de falha.
+    Cada cliente pega sempre o frame mais recente (sem fila atrás do tempo real).
     """
-    global cap
-    
-    # Inicializar captura
-    if not inicializar_captura():
-        logger.error("❌ Falha ao inicializar captura na primeira tentativa")
-        yield None
-        return
-    
-    frames_erro = 0
-    MAX_FRAMES_ERRO = 10
+    # Na mesma máquina do pipeline, os frames vêm da memória compartilhada
+    leitor = LeitorAnelFrames(SHM_FRAMES_NAME) if SHM_FRAMES_ENABLED else None
+    seq = 0
     
     while True:
         try:
-            if cap is None or not cap.isOpened():
-                logger.warning("⚠️ Stream desconectado. Tentando reconectar...")
-                if not reconectar():
-                    logger.error("❌ Não foi possível reconectar. Parando stream.")
-                    break
-                frames_erro = 0
-            
-            sucesso, frame = cap.read()
-            
-            if not sucesso:
-                frames_erro += 1
-                logger.warning(f"⚠️ Erro ao ler frame ({frames_erro}/{MAX_FRAMES_ERRO})")
-                
-                if frames_erro >= MAX_FRAMES_ERRO:
-                    logger.error("❌ Muitos frames com erro. Tentando reconectar...")
-                    if not reconectar():
-                        break
-                    frames_erro = 0
-                
-                time.sleep(0.1)  # Pequeno delay antes de tentar novamente
-                continue
-            
-            frames_erro = 0  # Reset contador de erros
+            if leitor and leitor.disponivel():
+                frame = leitor.ler(aguardar=1.0)
+                if frame is None:
+                    continue
+                # Idade do frame desde a publicação pelo pipeline
+                metricas.observar('atraso_frame', max(0.0, time.time() - leitor.ultimo_timestamp))
+            else:
+                with metricas.medir('leitura_rtsp'):
+                    lido = obter_leitor_rtsp().ler(seq, aguardar=1.0)
+                if lido is None:
+                    continue  # sem frame novo (ou reconectando)
+                frame, seq, instante = lido
+                # Idade do frame desde a decodificação
+                metricas.observar('atraso_frame', max(0.0, time.time() - instante))
             
             # Codificar frame como JPEG
             try:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                frame_bytes = buffer.tobytes()
+                with metricas.medir('codificacao'):
+                    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                    frame_bytes = buffer.tobytes()
+                metricas.contar('frames_enviados_total', ajuda="Frames JPEG entregues aos clientes")
                 
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
@@ -138,30 +114,44 @@ def gerar_frames():
         except Exception as e:
             logger.error(f"❌ Erro no generator de frames: {e}", exc_info=True)
             time.sleep(1)
-            
-            # Tentar reconectar em caso de erro crítico
-            if not reconectar():
-                break
 
 
 @app.route('/video')
 def video():
     """Endpoint para streaming MJPEG."""
     return Response(
-        gerar_frames(),
+        contar_cliente(gerar_frames()),
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+def contar_cliente(frames):
+    """Mantém o medidor de clientes conectados enquanto o stream estiver aberto."""
+    global clientes_conectados
+    clientes_conectados += 1
+    try:
+        yield from frames
+    finally:
+        clientes_conectados -= 1
+
+
+@app.route('/metrics')
+def metrics():
+    """Métricas de latência/vazão no formato Prometheus."""
+    return Response(metricas.texto_prometheus(), content_type=CONTENT_TYPE_PROMETHEUS)
+
+
 @app.route('/health')
 def health():
     """Endpoint de health check."""
-    global cap
-    
+    memoria = bool(leitor_status and leitor_status.disponivel())
+    conectado = memoria or bool(leitor_rtsp and leitor_rtsp.conectado)
     status = {
-        'status': 'healthy' if cap and cap.isOpened() else 'unhealthy',
+        'status': 'healthy' if conectado else 'unhealthy',
         'stream_url': RTSP_URL,
-        'connected': cap.isOpened() if cap else False
+        'connected': conectado,
+        'memoria_compartilhada': memoria,
+        'leitor_rtsp': leitor_rtsp.estatisticas() if leitor_rtsp else None
     }
     
     return status, 200 if status['connected'] else 503
@@ -185,6 +175,7 @@ def index():
         <h1>🎥 MJPEG Stream Server</h1>
         <p>Stream disponível em: <a href="/video">/video</a></p>
         <p>Health check: <a href="/health">/health</a></p>
+        <p>Métricas: <a href="/metrics">/metrics</a></p>
         <hr>
         <h2>Stream ao vivo:</h2>
         <img src="/video" alt="Stream de vídeo">
@@ -198,6 +189,10 @@ if __name__ == "__main__":
     logger.info(f"🚀 Iniciando servidor MJPEG em {MJPEG_HOST}:{MJPEG_PORT}")
     logger.info(f"📡 Stream RTSP: {RTSP_URL}")
     
+    # Sem o anel do pipeline nesta máquina, o RTSP já começa a ser lido (e o /health reflete a fonte)
+    if not (leitor_status and leitor_status.disponivel()):
+        obter_leitor_rtsp()
+    
     try:
         app.run(
             host=MJPEG_HOST,
@@ -210,9 +205,6 @@ if __name__ == "__main__":
         sys.exit(1)
     finally:
         # Limpeza final
-        if cap is not None:
-            try:
-                cap.release()
-                logger.info("✅ Recursos liberados.")
-            except Exception as e:
-                logger.error(f"❌ Erro ao liberar recursos: {e}")
+        if leitor_rtsp is not None:
+            leitor_rtsp.parar()
+            logger.info("✅ Recursos liberados.")
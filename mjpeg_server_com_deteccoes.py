@@ -6,9 +6,12 @@ Stream MJPEG com inferência YOLO em tempo real, incluindo detecções de quedas
 from flask import Flask, Response, jsonify
 from flask_cors import CORS
 import cv2
+import numpy as np
+import importlib.util
 import logging
 import time
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
@@ -20,24 +23,26 @@ from config import (
     RTSP_URL, MJPEG_HOST, MJPEG_PORT, LOGS_DIR,
     MODEL_PATH, CONFIDENCE_THRESHOLD, FRAME_WIDTH, FRAME_HEIGHT,
     PERSON_CLASS_ID, FALL_DETECTION_ENABLED, TRACKING_ENABLED,
+    TRACKER, TRACKER_IOU, TRACKER_MAX_LOST,
     ROOM_COUNT_ENABLED, ROOM_USE_AREA, ROOM_AREA,
-    BATHROOM_MONITORING_ENABLED, BATHROOM_TIME_LIMIT_SECONDS, BATHROOM_AREA
+    BATHROOM_MONITORING_ENABLED, BATHROOM_TIME_LIMIT_SECONDS, BATHROOM_AREA,
+    BATHROOM_EXIT_GRACE_SECONDS, TRACK_STORE_MAX, ZONES_CONFIG_PATH,
+    SHM_RAW_FRAMES_ENABLED, SHM_RAW_FRAMES_NAME, METRICS_WINDOW
 )
-
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
-    logging.warning("Ultralytics não disponível")
-
-# Importar detector customizado se disponível
-try:
-    sys.path.insert(0, str(Path(__file__).parent / "datasets" / "quedas"))
-    from inferencia_quedas import DetectorQuedaCustomizado
-    DETECTOR_CUSTOM_DISPONIVEL = True
-except ImportError:
-    DETECTOR_CUSTOM_DISPONIVEL = False
+from pipeline.memo_frame import MemoPorFrame
+from pipeline.memoria_compartilhada import LeitorAnelFrames
+from pipeline.backends import carregar_modelo
+from pipeline.leitor_rtsp import LeitorUltimoFrame
+from pipeline.metricas import CONTENT_TYPE_PROMETHEUS, RegistroMetricas
+from pipeline.overlay import RenderizadorOverlay, textos_contadores
+from pipeline.posprocessamento import extrair_deteccoes
+from pipeline.rastreador import RastreadorSORT
+from pipeline.trilhas import ArmazemTrilhas
+from pipeline.zonas import TIPO_QUARTO, carregar_zonas
+
+# Só verifica se o pacote existe: ultralytics/torch são importados na carga do
+# modelo, em segundo plano, depois que o servidor já está respondendo
+YOLO_AVAILABLE = importlib.util.find_spec('ultralytics') is not None
 
 # Configurar logging
 LOGS_DIR.mkdir(exist_ok=True)
@@ -56,120 +61,150 @@ app = Flask(__name__)
 CORS(app)  # Permitir CORS para acesso do dashboard
 
 # Variáveis globais
-cap = None
+leitor_rtsp = None  # leitor contínuo do RTSP, compartilhado pelos clientes
+leitor_rtsp_lock = threading.Lock()
 model = None
 detector_queda_custom = None
-person_tracker = {}
-bathroom_people = {}
+estado_modelo = 'carregando'  # carregando | pronto | indisponivel | erro
+# Rastreador interno (TRACKER=interno); senão o tracking fica no model.track
+rastreador = (RastreadorSORT(iou_min=TRACKER_IOU, max_perdidos=TRACKER_MAX_LOST)
+              if TRACKING_ENABLED and TRACKER == "interno" else None)
+bathroom_people = ArmazemTrilhas(ttl=BATHROOM_EXIT_GRACE_SECONDS, max_itens=TRACK_STORE_MAX)
 room_people_count = 0
 frame_count = 0
+frames_lidos = 0
+ultima_chave_frame = None
+frame_seq_lock = threading.Lock()
+# Análise completa por frame (inferência, rastreador, quarto, banheiro e
+# quedas): roda uma vez por frame, sob um único lock; os clientes só desenham
+# (um cliente atrasado reaproveita a análise mais nova: o rastreador não volta no
+# tempo; "mais antigo" só vale dentro da mesma fonte e geração do anel)
+memo_analise = MemoPorFrame(mais_antigo=lambda chave, ultima: chave[:2] == ultima[:2] and chave[2] < ultima[2])
+execucoes_modelo_queda = 0
+renderizacao_lock = threading.Lock()
+leitor_status = LeitorAnelFrames(SHM_RAW_FRAMES_NAME) if SHM_RAW_FRAMES_ENABLED else None
+metricas = RegistroMetricas(janela=METRICS_WINDOW)
+clientes_conectados = 0
+metricas.expor('clientes_conectados', lambda: clientes_conectados, ajuda="Clientes MJPEG conectados")
+metricas.expor('frames_processados_total', lambda: frame_count, tipo='counter',
+               ajuda="Frames processados com detecções")
+metricas.expor('execucoes_modelo_queda_total', lambda: execucoes_modelo_queda,
+               tipo='counter', ajuda="Execuções do detector customizado de quedas")
+metricas.expor('modelo_carregado', lambda: 1 if model is not None else 0,
+               ajuda="1 quando o modelo YOLO terminou de carregar")
 RECONNECT_DELAY = 5
-MAX_RECONNECT_ATTEMPTS = 10
-
-# Calcular áreas em pixels
-bathroom_area_px = (
-    int(BATHROOM_AREA[0] * FRAME_WIDTH),
-    int(BATHROOM_AREA[1] * FRAME_HEIGHT),
-    int(BATHROOM_AREA[2] * FRAME_WIDTH),
-    int(BATHROOM_AREA[3] * FRAME_HEIGHT)
-)
-room_area_px = (
-    int(ROOM_AREA[0] * FRAME_WIDTH),
-    int(ROOM_AREA[1] * FRAME_HEIGHT),
-    int(ROOM_AREA[2] * FRAME_WIDTH),
-    int(ROOM_AREA[3] * FRAME_HEIGHT)
-)
+
+# Zonas poligonais (rasterizadas por resolução do stream, sob demanda)
+mapa_zonas = carregar_zonas(ZONES_CONFIG_PATH, ROOM_AREA, BATHROOM_AREA)
+
+# Overlay desenhado direto no frame lido (cada leitura é um array novo)
+renderizador = RenderizadorOverlay(FRAME_WIDTH, FRAME_HEIGHT)
+renderizador.definir_zonas(mapa_zonas.poligonos_overlay(
+    FRAME_WIDTH, FRAME_HEIGHT, ignorar_tipos=() if ROOM_USE_AREA else (TIPO_QUARTO,)
+))
 
 
 def inicializar_modelo():
     """Inicializa modelo YOLO."""
-    global model, detector_queda_custom
+    global model, detector_queda_custom, estado_modelo
     
     if not YOLO_AVAILABLE:
         logger.warning("⚠️ YOLO não disponível, servindo stream sem detecções")
+        estado_modelo = 'indisponivel'
         return False
     
     try:
         logger.info(f"🧠 Carregando modelo YOLO: {MODEL_PATH}")
-        model = YOLO(MODEL_PATH)
+        with metricas.medir('carga_modelo'):
+            model = carregar_modelo(MODEL_PATH)
         logger.info("✅ Modelo YOLO carregado")
         
         # Tentar carregar detector customizado de quedas
-        if DETECTOR_CUSTOM_DISPONIVEL:
+        modelo_custom = Path(__file__).parent / "modelos" / "queda_custom.pt"
+        if modelo_custom.exists():
             try:
-                modelos_dir = Path(__file__).parent / "modelos"
-                modelo_custom = modelos_dir / "queda_custom.pt"
-                if modelo_custom.exists():
-                    detector_queda_custom = DetectorQuedaCustomizado(
-                        modelo_path=str(modelo_custom),
-                        conf_threshold=0.05  # Threshold baixo para modelo customizado
-                    )
-                    logger.info("✅ Detector customizado de quedas carregado")
+                sys.path.insert(0, str(Path(__file__).parent / "datasets" / "quedas"))
+                from inferencia_quedas import DetectorQuedaCustomizado
+                detector_queda_custom = DetectorQuedaCustomizado(
+                    modelo_path=str(modelo_custom),
+                    conf_threshold=0.05  # Threshold baixo para modelo customizado
+                )
+                logger.info("✅ Detector customizado de quedas carregado")
             except Exception as e:
                 logger.warning(f"⚠️ Erro ao carregar detector customizado: {e}")
         
+        estado_modelo = 'pronto'
         return True
     except Exception as e:
         logger.error(f"❌ Erro ao carregar modelo: {e}")
+        estado_modelo = 'erro'
         return False
 
 
-def inicializar_captura():
-    """Inicializa captura RTSP."""
-    global cap
-    
-    if cap is not None:
-        try:
-            cap.release()
-        except Exception:
-            pass
+def iniciar_carga_modelo():
+    """Carrega o modelo em segundo plano; até lá, o stream sai sem detecções."""
+    def carregar():
+        if not inicializar_modelo():
+            logger.warning("⚠️ Continuando sem modelo YOLO")
     
-    try:
-        logger.info(f"🎥 Conectando ao stream RTSP: {RTSP_URL}")
-        cap = cv2.VideoCapture(RTSP_URL)
-        
-        if not cap.isOpened():
-            logger.error(f"❌ Não foi possível abrir stream: {RTSP_URL}")
-            return False
-        
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        logger.info("✅ Stream RTSP conectado")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Erro ao conectar: {e}")
-        return False
-
-
-def reconectar():
-    """Tenta reconectar ao stream."""
-    for attempt in range(MAX_RECONNECT_ATTEMPTS):
-        logger.info(f"🔄 Tentativa {attempt + 1}/{MAX_RECONNECT_ATTEMPTS}")
-        if inicializar_captura():
-            return True
-        if attempt < MAX_RECONNECT_ATTEMPTS - 1:
-            time.sleep(RECONNECT_DELAY)
-    return False
+    threading.Thread(target=carregar, name="carga-modelo", daemon=True).start()
 
 
-def centro_box_na_area(box_xyxy, area):
-    """Verifica se centro da bbox está na área."""
-    x1, y1, x2, y2 = box_xyxy
-    centro_x = (x1 + x2) / 2
-    centro_y = (y1 + y2) / 2
-    ax1, ay1, ax2, ay2 = area
-    return ax1 <= centro_x <= ax2 and ay1 <= centro_y <= ay2
+def obter_leitor_rtsp():
+    """Leitor do stream RTSP (último frame vence), iniciado no primeiro uso."""
+    global leitor_rtsp
+    
+    with leitor_rtsp_lock:
+        if leitor_rtsp is None:
+            logger.info(f"🎥 Conectando ao stream RTSP: {RTSP_URL}")
+            leitor = LeitorUltimoFrame(RTSP_URL, atraso_reconexao=RECONNECT_DELAY, nome="rtsp")
+            metricas.expor('erros_leitura_total', lambda: leitor.erros_leitura, tipo='counter',
+                           ajuda="Falhas ao ler frame do stream")
+            metricas.expor('frames_nao_consumidos_total', lambda: leitor.frames_nao_consumidos,
+                           tipo='counter', ajuda="Frames decodificados e substituídos antes de serem lidos")
+            metricas.expor('reconexoes_total', lambda: leitor.reconexoes, tipo='counter',
+                           ajuda="Reconexões ao stream RTSP")
+            leitor.iniciar()
+            leitor_rtsp = leitor
+        return leitor_rtsp
+
+
+def chave_frame(fonte, seq, geracao=0.0):
+    """
+    Retorna a chave do frame lido: (fonte, geracao, seq).
+    
+    Clientes que recebem o mesmo frame (mesma fonte e mesmo `seq`) recebem a
+    mesma chave, e a análise do frame roda uma vez. Anel e leitor RTSP têm
+    sequências independentes, por isso a fonte faz parte da chave; a do anel
+    recomeça em 0 quando o pipeline reinicia e recria o bloco, por isso a
+    geração (instante de criação do anel) também faz.
+    """
+    global frames_lidos, ultima_chave_frame
+    chave = (fonte, geracao, seq)
+    with frame_seq_lock:
+        # Conta só frames novos (um cliente atrasado não recoloca um frame antigo)
+        if ultima_chave_frame is None or chave[:2] != ultima_chave_frame[:2] or seq > ultima_chave_frame[2]:
+            frames_lidos += 1
+            ultima_chave_frame = chave
+    return chave
 
 
-def processar_frame_com_deteccoes(frame):
-    """Processa frame com YOLO e retorna frame anotado."""
-    global frame_count, room_people_count, bathroom_people
+def analisar_frame(frame):
+    """
+    Inferência e estado de um frame: detecções, ids, quarto, banheiro e quedas.
     
-    if model is None:
-        return frame  # Retornar frame original se modelo não disponível
+    Chamada pelo memo_analise, uma vez por frame: o rastreador, o tracking do
+    modelo e os cronômetros do banheiro avançam um passo por frame, não um por
+    cliente conectado.
     
-    try:
-        # Inferência YOLO
-        if TRACKING_ENABLED:
+    Returns:
+        Dicionário com caixas, ids, caixas de queda e contagens do frame
+    """
+    global frame_count, room_people_count, execucoes_modelo_queda
+    
+    # Inferência YOLO
+    with metricas.medir('inferencia'):
+        if TRACKING_ENABLED and rastreador is None:
             results = model.track(
                 frame,
                 conf=CONFIDENCE_THRESHOLD,
@@ -183,138 +218,74 @@ def processar_frame_com_deteccoes(frame):
                 verbose=False,
                 stream=False
             )
+    inicio_pos = time.perf_counter()
+    
+    # Pós-processamento vetorizado (pessoas, zonas, ids)
+    deteccoes = extrair_deteccoes(
+        results,
+        altura_frame=frame.shape[0],
+        classe_pessoa=PERSON_CLASS_ID,
+        conf_threshold=CONFIDENCE_THRESHOLD,
+        usar_area_quarto=ROOM_USE_AREA,
+        usar_tracking=TRACKING_ENABLED,
+        zonas=mapa_zonas.mascara(frame.shape[1], frame.shape[0]),
+        rastreador=rastreador
+    )
+    pessoas_detectadas = len(deteccoes)
+    current_time = time.time()
+    
+    # Contagem quarto
+    pessoas_quarto = set(deteccoes.chaves(deteccoes.no_quarto)) if ROOM_COUNT_ENABLED else set()
+    
+    # Monitoramento banheiro
+    pessoas_banheiro_atual = {}
+    if BATHROOM_MONITORING_ENABLED:
+        for track_id in deteccoes.chaves(deteccoes.no_banheiro, prefixo="temp_"):
+            bathroom_people.tocar(track_id, current_time)
+        # Quem não foi visto além da tolerância saiu do banheiro
+        bathroom_people.expirar(current_time)
+        for registro in bathroom_people.registros():
+            pessoas_banheiro_atual[registro.chave] = registro.entrada
+    
+    # Detecção de queda (detector customizado; overlay e /status usam o resultado memorizado)
+    tem_queda, quedas = False, []
+    if FALL_DETECTION_ENABLED and detector_queda_custom and pessoas_detectadas:
+        tem_queda, quedas = detector_queda_custom.detectar(frame, anotar=False)[:2]
+        execucoes_modelo_queda += 1
+    caixas_queda = [det['bbox'] for det in quedas] if tem_queda else []
+    
+    room_people_count = len(pessoas_quarto)
+    frame_count += 1
+    metricas.observar('posprocessamento', time.perf_counter() - inicio_pos)
+    
+    return {
+        'xyxy': deteccoes.xyxy,
+        'ids': deteccoes.ids,
+        'caixas_queda': np.array(caixas_queda).reshape(-1, 4),
+        'tem_queda': bool(tem_queda),
+        'quedas': quedas,
+        'pessoas_quarto': room_people_count,
+        'pessoas_banheiro': len(pessoas_banheiro_atual),
+    }
+
+
+def processar_frame_com_deteccoes(frame, frame_seq):
+    """Processa frame com YOLO e retorna frame anotado."""
+    if model is None:
+        return frame  # Retornar frame original se modelo não disponível
+    
+    try:
+        # O primeiro cliente a ler o frame o analisa; os demais (mesmo
+        # frame_seq) esperam no lock do memo e reaproveitam o resultado
+        analise = memo_analise.obter(frame_seq, lambda: analisar_frame(frame))
         
-        # Anotar frame com detecções
-        annotated = results[0].plot()
-        
-        # Desenhar áreas
-        if ROOM_USE_AREA:
-            cv2.rectangle(
-                annotated,
-                (room_area_px[0], room_area_px[1]),
-                (room_area_px[2], room_area_px[3]),
-                (0, 255, 0),
-                2
-            )
-            cv2.putText(
-                annotated,
-                "Quarto",
-                (room_area_px[0] + 5, room_area_px[1] + 25),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 255, 0),
-                2
-            )
-        
-        cv2.rectangle(
-            annotated,
-            (bathroom_area_px[0], bathroom_area_px[1]),
-            (bathroom_area_px[2], bathroom_area_px[3]),
-            (255, 0, 0),
-            2
-        )
-        cv2.putText(
-            annotated,
-            "Banheiro",
-            (bathroom_area_px[0] + 5, bathroom_area_px[1] + 25),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (255, 0, 0),
-            2
-        )
-        
-        # Contar pessoas no quarto
-        pessoas_quarto = set()
-        pessoas_banheiro_atual = {}
-        queda_detectada = False
-        current_time = time.time()
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is None or len(boxes) == 0:
-                continue
-            
-            for box in boxes:
-                cls = int(box.cls[0])
-                if cls != PERSON_CLASS_ID:
-                    continue
-                
-                conf = float(box.conf[0])
-                if conf < CONFIDENCE_THRESHOLD:
-                    continue
-                
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                
-                # Detecção de queda (usar detector customizado se disponível)
-                if FALL_DETECTION_ENABLED:
-                    if detector_queda_custom:
-                        tem_queda, _, _ = detector_queda_custom.detectar(frame)
-                        if tem_queda:
-                            queda_detectada = True
-                            cv2.putText(
-                                annotated,
-                                "QUEDA DETECTADA!",
-                                (10, 90),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                1,
-                                (0, 0, 255),
-                                3
-                            )
-                
-                # Contagem quarto
-                if ROOM_COUNT_ENABLED:
-                    if not ROOM_USE_AREA or centro_box_na_area((x1, y1, x2, y2), room_area_px):
-                        if TRACKING_ENABLED and hasattr(box, 'id') and box.id is not None:
-                            track_id = int(box.id[0])
-                            pessoas_quarto.add(track_id)
-                        else:
-                            pos_id = f"{int(x1/10)}_{int(y1/10)}"
-                            pessoas_quarto.add(pos_id)
-                
-                # Monitoramento banheiro
-                if BATHROOM_MONITORING_ENABLED:
-                    if centro_box_na_area((x1, y1, x2, y2), bathroom_area_px):
-                        if TRACKING_ENABLED and hasattr(box, 'id') and box.id is not None:
-                            track_id = int(box.id[0])
-                        else:
-                            track_id = f"temp_{int(x1/10)}_{int(y1/10)}"
-                        
-                        if track_id not in bathroom_people:
-                            bathroom_people[track_id] = current_time
-                        
-                        pessoas_banheiro_atual[track_id] = bathroom_people[track_id]
-        
-        # Remover pessoas que saíram do banheiro
-        pessoas_sairam = set(bathroom_people.keys()) - set(pessoas_banheiro_atual.keys())
-        for track_id in pessoas_sairam:
-            del bathroom_people[track_id]
-        
-        room_people_count = len(pessoas_quarto)
-        
-        # Adicionar informações no frame
-        cv2.putText(
-            annotated,
-            f"Pessoas no Quarto: {room_people_count}",
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (0, 255, 0),
-            2
-        )
-        
-        cv2.putText(
-            annotated,
-            f"Pessoas no Banheiro: {len(pessoas_banheiro_atual)}",
-            (10, 60),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (255, 0, 0),
-            2
-        )
-        
-        frame_count += 1
-        
-        return annotated
+        # Overlay: zonas e contadores em camadas cacheadas, caixas desenhadas no
+        # próprio frame (cópia do cliente); o lock mantém textos e caixas do mesmo frame
+        with metricas.medir('renderizacao'), renderizacao_lock:
+            renderizador.definir_textos(textos_contadores(
+                analise['pessoas_quarto'], analise['pessoas_banheiro'], queda=analise['tem_queda']
+            ))
+            return renderizador.renderizar(frame, analise['xyxy'], analise['ids'], analise['caixas_queda'])
         
     except Exception as e:
         logger.error(f"❌ Erro ao processar frame: {e}")
@@ -322,45 +293,41 @@ def processar_frame_com_deteccoes(frame):
 
 
 def gerar_frames():
-    """Generator que produz frames MJPEG com detecções."""
-    global cap
-    
-    if not inicializar_captura():
-        logger.error("❌ Falha ao inicializar captura")
-        yield None
-        return
-    
-    frames_erro = 0
-    MAX_FRAMES_ERRO = 10
+    """Generator que produz frames MJPEG com detecções (sempre do frame mais recente)."""
+    # Na mesma máquina do pipeline, os frames vêm da memória compartilhada; só
+    # do anel cru: o anel anotado já traz as caixas e contadores do pipeline
+    leitor = LeitorAnelFrames(SHM_RAW_FRAMES_NAME) if SHM_RAW_FRAMES_ENABLED else None
+    seq = 0
     
     while True:
         try:
-            if cap is None or not cap.isOpened():
-                logger.warning("⚠️ Stream desconectado. Reconectando...")
-                if not reconectar():
-                    break
-                frames_erro = 0
-            
-            sucesso, frame = cap.read()
-            
-            if not sucesso:
-                frames_erro += 1
-                if frames_erro >= MAX_FRAMES_ERRO:
-                    if not reconectar():
-                        break
-                    frames_erro = 0
-                time.sleep(0.1)
-                continue
-            
-            frames_erro = 0
+            if leitor and leitor.disponivel():
+                frame = leitor.ler(aguardar=1.0)
+                if frame is None:
+                    continue
+                instante = leitor.ultimo_timestamp  # publicação pelo pipeline
+                frame_seq = chave_frame('shm', leitor.ultimo_seq, leitor.geracao)
+            else:
+                with metricas.medir('leitura_rtsp'):
+                    lido = obter_leitor_rtsp().ler(seq, aguardar=1.0)
+                if lido is None:
+                    continue  # sem frame novo (ou reconectando)
+                frame, seq, instante = lido
+                # O overlay desenha no frame: cópia própria deste cliente
+                frame = frame.copy()
+                frame_seq = chave_frame('rtsp', seq)
             
             # Processar frame com detecções
-            frame_processado = processar_frame_com_deteccoes(frame)
+            frame_processado = processar_frame_com_deteccoes(frame, frame_seq)
+            # Idade do frame ao fim da inferência (o atraso que o cliente vê)
+            metricas.observar('atraso_frame', max(0.0, time.time() - instante))
             
             # Codificar como JPEG
             try:
-                _, buffer = cv2.imencode('.jpg', frame_processado, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                frame_bytes = buffer.tobytes()
+                with metricas.medir('codificacao'):
+                    _, buffer = cv2.imencode('.jpg', frame_processado, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                    frame_bytes = buffer.tobytes()
+                metricas.contar('frames_enviados_total', ajuda="Frames JPEG entregues aos clientes")
                 
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
@@ -372,23 +339,37 @@ def gerar_frames():
         except Exception as e:
             logger.error(f"❌ Erro no generator: {e}")
             time.sleep(1)
-            if not reconectar():
-                break
 
 
 @app.route('/video')
 def video():
     """Endpoint para streaming MJPEG com detecções."""
     return Response(
-        gerar_frames(),
+        contar_cliente(gerar_frames()),
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+def contar_cliente(frames):
+    """Mantém o medidor de clientes conectados enquanto o stream estiver aberto."""
+    global clientes_conectados
+    clientes_conectados += 1
+    try:
+        yield from frames
+    finally:
+        clientes_conectados -= 1
+
+
+@app.route('/metrics')
+def metrics():
+    """Métricas de latência/vazão no formato Prometheus."""
+    return Response(metricas.texto_prometheus(), content_type=CONTENT_TYPE_PROMETHEUS)
+
+
 @app.route('/status')
 def status():
     """Endpoint para obter status atual."""
-    global cap, room_people_count, bathroom_people, frame_count
+    global room_people_count, bathroom_people, frame_count
     
     status_banheiro = {
         'pessoas_no_banheiro': len(bathroom_people),
@@ -396,19 +377,35 @@ def status():
     }
     
     current_time = time.time()
-    for track_id, entry_time in bathroom_people.items():
-        tempo = current_time - entry_time
+    for registro in bathroom_people.registros():
+        tempo = current_time - registro.entrada
         status_banheiro['pessoas'].append({
-            'track_id': str(track_id),
+            'track_id': str(registro.chave),
             'tempo_segundos': int(tempo),
             'alerta': tempo > BATHROOM_TIME_LIMIT_SECONDS
         })
     
+    # Último resultado do detector customizado (sem nova inferência)
+    ultima_analise = memo_analise.ultimo()
+    estatisticas_analise = memo_analise.estatisticas()
+    fonte_frame, _, ultimo_frame_seq = estatisticas_analise['ultimo_frame_seq'] or (None, None, None)
+    deteccao_queda = {
+        'queda_detectada': ultima_analise['tem_queda'] if ultima_analise else False,
+        'deteccoes': ultima_analise['quedas'] if ultima_analise else [],
+        'ultimo_frame_seq': ultimo_frame_seq,
+        'fonte_frame': fonte_frame,
+        'execucoes_modelo_queda': execucoes_modelo_queda,
+        'reutilizacoes_memo': estatisticas_analise['reutilizacoes'],
+        'frames_lidos': frames_lidos
+    }
+    
     return jsonify({
-        'stream_connected': cap.isOpened() if cap else False,
+        'stream_connected': bool(leitor_rtsp and leitor_rtsp.conectado),
         'model_loaded': model is not None,
+        'model_state': estado_modelo,
         'pessoas_quarto': room_people_count,
         'status_banheiro': status_banheiro,
+        'deteccao_queda': deteccao_queda,
         'frame_count': frame_count,
         'timestamp': datetime.now().isoformat()
     })
@@ -416,13 +413,30 @@ def status():
 
 @app.route('/health')
 def health():
-    """Health check."""
-    global cap, model
+    """
+    Health check.
+    
+    Enquanto o modelo carrega, responde 200 com status "starting": um
+    reinício do servidor não aparece como queda para o monitoramento.
+    """
+    global model
+    memoria = bool(leitor_status and leitor_status.disponivel())
+    conectado = memoria or bool(leitor_rtsp and leitor_rtsp.conectado)
+    carregando = estado_modelo == 'carregando'
+    if conectado and model:
+        situacao = 'healthy'
+    elif carregando:
+        situacao = 'starting'
+    else:
+        situacao = 'unhealthy'
     return jsonify({
-        'status': 'healthy' if (cap and cap.isOpened() and model) else 'unhealthy',
-        'stream_connected': cap.isOpened() if cap else False,
-        'model_loaded': model is not None
-    }), 200 if (cap and cap.isOpened()) else 503
+        'status': situacao,
+        'stream_connected': conectado,
+        'memoria_compartilhada': memoria,
+        'model_loaded': model is not None,
+        'model_state': estado_modelo,
+        'leitor_rtsp': leitor_rtsp.estatisticas() if leitor_rtsp else None
+    }), 200 if (conectado or carregando) else 503
 
 
 @app.route('/')
@@ -447,6 +461,7 @@ def index():
             <p>Stream disponível em: <a href="/video">/video</a></p>
             <p>Status: <a href="/status">/status</a></p>
             <p>Health: <a href="/health">/health</a></p>
+            <p>Métricas: <a href="/metrics">/metrics</a></p>
             <hr>
             <h2>Stream ao vivo com detecções:</h2>
             <img src="/video" alt="Stream de vídeo">
@@ -463,7 +478,8 @@ def index():
                         Modelo: ${data.model_loaded ? '✅ Carregado' : '❌ Não carregado'}<br>
                         Pessoas no Quarto: ${data.pessoas_quarto}<br>
                         Pessoas no Banheiro: ${data.status_banheiro.pessoas_no_banheiro}<br>
-                        Frames processados: ${data.frame_count}
+                        Frames processados: ${data.frame_count}<br>
+                        Execuções do modelo de queda: ${data.deteccao_queda.execucoes_modelo_queda}
                     `;
                 } catch (e) {
                     document.getElementById('status').innerHTML = 'Erro ao carregar status';
@@ -479,9 +495,12 @@ def index():
 if __name__ == "__main__":
     logger.info("🚀 Iniciando servidor MJPEG com detecções YOLO...")
     
-    # Inicializar modelo
-    if not inicializar_modelo():
-        logger.warning("⚠️ Continuando sem modelo YOLO")
+    # O modelo carrega em segundo plano: /health e /video respondem desde já
+    iniciar_carga_modelo()
+    
+    # Sem o anel do pipeline nesta máquina, o RTSP já começa a ser lido
+    if not (leitor_status and leitor_status.disponivel()):
+        obter_leitor_rtsp()
     
     logger.info(f"🌐 Servidor em {MJPEG_HOST}:{MJPEG_PORT}")
     logger.info(f"📡 Stream RTSP: {RTSP_URL}")
@@ -497,6 +516,6 @@ if __name__ == "__main__":
         logger.critical(f"❌ Erro ao iniciar servidor: {e}")
         sys.exit(1)
     finally:
-        if cap:
-            cap.release()
+        if leitor_rtsp:
+            leitor_rtsp.parar()
 
@@ -68,6 +68,14 @@ except ImportError:
     DB_ENABLED = False
     DB_AVAILABLE = False
 
+# Frames direto da memória compartilhada do pipeline (sem JPEG em disco)
+try:
+    from config import SHM_FRAMES_ENABLED, SHM_FRAMES_NAME
+    from pipeline.memoria_compartilhada import LeitorAnelFrames
+    SHM_AVAILABLE = SHM_FRAMES_ENABLED
+except ImportError:
+    SHM_AVAILABLE = False
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -210,8 +218,19 @@ if 'eventos' not in st.session_state:
     st.session_state.eventos = deque(maxlen=50)
 
 
+@st.cache_resource
+def obter_leitor_frames():
+    """Leitor do anel de frames em memória compartilhada (um por processo do painel)."""
+    return LeitorAnelFrames(SHM_FRAMES_NAME)
+
+
 def ler_frame():
-    """Lê o último frame salvo."""
+    """Lê o último frame (memória compartilhada do pipeline ou JPEG salvo)."""
+    if SHM_AVAILABLE:
+        frame = obter_leitor_frames().ler_mais_recente()
+        if frame is not None:
+            return frame[:, :, ::-1]  # BGR → RGB
+    
     if not os.path.exists(FRAME_PATH):
         return None
     
@@ -243,6 +262,8 @@ def ler_status():
 
 def obter_ultima_modificacao_frame():
     """Retorna o timestamp da última modificação do frame."""
+    if SHM_AVAILABLE and obter_leitor_frames().ultimo_timestamp:
+        return obter_leitor_frames().ultimo_timestamp
     if os.path.exists(FRAME_PATH):
         try:
             return os.path.getmtime(FRAME_PATH)
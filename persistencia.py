@@ -188,6 +188,32 @@ class PersistenciaManager:
         except Exception as e:
             logger.error(f"❌ Erro ao salvar ocupação do banheiro: {e}")
     
+    def salvar_deteccao_queda(self, confianca: float = None, posicao_x: float = None,
+                              posicao_y: float = None, metadata: Dict = None, clip_path: str = None):
+        """
+        Salva uma detecção de queda (uma linha por evento).
+        
+        Args:
+            confianca: Confiança da detecção
+            posicao_x: Posição X
+            posicao_y: Posição Y
+            metadata: Dados adicionais
+            clip_path: Clipe pré/pós-evento da queda
+        """
+        if not self.db_enabled or not self.db_manager:
+            return
+        
+        try:
+            self.db_manager.inserir_deteccao_queda(
+                confianca=confianca,
+                posicao_x=posicao_x,
+                posicao_y=posicao_y,
+                metadata=metadata,
+                clip_path=clip_path
+            )
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar detecção de queda: {e}")
+    
     def salvar_metrica(self, tipo: str, valor: float, unidade: str = None, metadata: Dict = None):
         """
         Salva uma métrica genérica.
@@ -0,0 +1,71 @@
+"""
+Pipeline de Inferência IASenior
+Componentes reutilizáveis do caminho captura → inferência → renderização → publicação,
+compartilhados pelo stream RTSP e pelos servidores MJPEG.
+
+Os nomes abaixo são importados sob demanda (PEP 562): `import pipeline.trilhas`
+ou `from pipeline import ArmazemTrilhas` carregam só o submódulo necessário,
+sem OpenCV, multiprocessing ou servidores HTTP dos demais.
+"""
+
+import importlib
+
+# Nome exportado -> submódulo que o define
+_EXPORTACOES = {
+    'Estagio': '.estagios',
+    'PipelineEstagios': '.estagios',
+    'FIM': '.estagios',
+    'DeteccoesFrame': '.posprocessamento',
+    'extrair_deteccoes': '.posprocessamento',
+    'GatilhoCascataQueda': '.cascata_queda',
+    'MemoPorFrame': '.memo_frame',
+    'MonitorCamera': '.monitoramento',
+    'DetectorMovimento': '.movimento',
+    'RastreadorSORT': '.rastreador',
+    'PropagadorCaixas': '.propagacao',
+    'RecorteZonas': '.roi',
+    'carregar_modelo': '.backends',
+    'exportar': '.backends',
+    'CapturaTela': '.captura',
+    'PublicadorFFmpeg': '.publicador_ffmpeg',
+    'PublicadorPyAV': '.publicador_pyav',
+    'PublicadorEstado': '.publicador_estado',
+    'escrever_atomico': '.publicador_estado',
+    'AnelFramesCompartilhado': '.memoria_compartilhada',
+    'LeitorAnelFrames': '.memoria_compartilhada',
+    'RenderizadorOverlay': '.overlay',
+    'LeitorUltimoFrame': '.leitor_rtsp',
+    'GravadorClipes': '.gravador_clipes',
+    'FonteReplay': '.replay',
+    'ResumoExecucao': '.replay',
+    'RegistroMetricas': '.metricas',
+    'ServidorMetricas': '.metricas',
+    'ArmazemTrilhas': '.trilhas',
+    'RegistroTrilha': '.trilhas',
+    'Zona': '.zonas',
+    'MapaZonas': '.zonas',
+    'MascaraZonas': '.zonas',
+    'carregar_zonas': '.zonas',
+    'salvar_zonas': '.zonas',
+    'PoolInferencia': '.pool_inferencia',
+    'ResultadoLeve': '.pool_inferencia',
+    'AlvoTroca': '.troca_modelo',
+    'GerenciadorTrocaModelo': '.troca_modelo',
+    'MotorMultiCamera': '.multicamera',
+    'CameraMonitorada': '.multicamera',
+}
+
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo, __name__), nome)
+    globals()[nome] = valor  # próximas consultas não passam por aqui
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
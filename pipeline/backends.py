@@ -0,0 +1,153 @@
+"""
+Backends de Inferência - IASenior
+Carrega o modelo YOLO a partir do runtime configurado em INFERENCE_BACKEND
+(PyTorch, ONNX Runtime, OpenVINO ou ONNX quantizado em INT8) e exporta os
+artefatos a partir dos pesos `.pt`, guardando-os ao lado deles.
+"""
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('pytorch', 'onnx', 'openvino', 'onnx_int8')
+
+
+def caminho_artefato(modelo_pt: Union[str, Path], backend: str) -> Path:
+    """
+    Caminho do artefato de um backend, ao lado dos pesos.
+
+    Exemplo para modelos/queda_custom.pt:
+    - onnx: modelos/queda_custom.onnx
+    - onnx_int8: modelos/queda_custom_int8.onnx
+    - openvino: modelos/queda_custom_openvino_model/
+    """
+    modelo_pt = Path(modelo_pt)
+    if backend == 'pytorch':
+        return modelo_pt
+    if backend == 'onnx':
+        return modelo_pt.with_suffix('.onnx')
+    if backend == 'onnx_int8':
+        return modelo_pt.with_name(f"{modelo_pt.stem}_int8.onnx")
+    if backend == 'openvino':
+        # Mesmo nome que o export do Ultralytics gera
+        return modelo_pt.with_name(f"{modelo_pt.stem}_openvino_model")
+    raise ValueError(f"Backend desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+
+
+def artefato_atualizado(modelo_pt: Union[str, Path], backend: str) -> bool:
+    """True se o artefato existe e é mais novo que os pesos `.pt`."""
+    modelo_pt = Path(modelo_pt)
+    artefato = caminho_artefato(modelo_pt, backend)
+    if not artefato.exists():
+        return False
+    if not modelo_pt.exists():
+        return True
+    return artefato.stat().st_mtime >= modelo_pt.stat().st_mtime
+
+
+def exportar(modelo_pt: Union[str, Path], backend: str, imgsz: int = 640,
+             forcar: bool = False) -> Path:
+    """
+    Exporta os pesos `.pt` para o backend indicado (usa o cache se atualizado).
+
+    Args:
+        modelo_pt: Caminho dos pesos PyTorch
+        backend: Um de BACKENDS
+        imgsz: Tamanho de entrada usado no export
+        forcar: Se True, exporta mesmo com artefato atualizado
+
+    Returns:
+        Caminho do artefato
+    """
+    modelo_pt = Path(modelo_pt)
+    artefato = caminho_artefato(modelo_pt, backend)
+    if backend == 'pytorch':
+        return artefato
+    if not forcar and artefato_atualizado(modelo_pt, backend):
+        logger.info(f"✅ Artefato {backend} em cache: {artefato}")
+        return artefato
+    if not modelo_pt.exists():
+        raise FileNotFoundError(f"Pesos não encontrados: {modelo_pt}")
+
+    from ultralytics import YOLO
+
+    logger.info(f"📦 Exportando {modelo_pt.name} para {backend} (imgsz={imgsz})...")
+    if backend == 'onnx':
+        # Lote dinâmico para servir também o motor multi-câmera
+        gerado = YOLO(str(modelo_pt)).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+        gerado = Path(gerado)
+        if gerado != artefato:
+            gerado.replace(artefato)
+
+    elif backend == 'openvino':
+        gerado = Path(YOLO(str(modelo_pt)).export(format='openvino', imgsz=imgsz, dynamic=True))
+        if gerado != artefato:
+            if artefato.exists():
+                shutil.rmtree(artefato)
+            gerado.replace(artefato)
+
+    elif backend == 'onnx_int8':
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            raise ImportError("onnxruntime não instalado (pip install onnxruntime)")
+
+        modelo_onnx = exportar(modelo_pt, 'onnx', imgsz=imgsz, forcar=forcar)
+        quantize_dynamic(str(modelo_onnx), str(artefato), weight_type=QuantType.QUInt8)
+
+    logger.info(f"✅ Artefato {backend} salvo em {artefato}")
+    return artefato
+
+
+def carregar_modelo(modelo_path: Union[str, Path], backend: Optional[str] = None,
+                    imgsz: Optional[int] = None, exportar_se_ausente: Optional[bool] = None):
+    """
+    Carrega o modelo YOLO no backend configurado.
+
+    Para backends diferentes de PyTorch, usa o artefato ao lado dos pesos e
+    o exporta na primeira vez (se BACKEND_AUTO_EXPORT). Se o export falhar,
+    volta para PyTorch para não deixar o monitoramento sem modelo.
+
+    Args:
+        modelo_path: Caminho dos pesos `.pt` (ou de um artefato já exportado)
+        backend: Um de BACKENDS (None = INFERENCE_BACKEND)
+        imgsz: Tamanho de entrada do export (None = INFERENCE_IMGSZ)
+        exportar_se_ausente: Exportar se o artefato não existir (None = BACKEND_AUTO_EXPORT)
+
+    Returns:
+        Instância ultralytics.YOLO
+    """
+    from config import INFERENCE_BACKEND, INFERENCE_IMGSZ, BACKEND_AUTO_EXPORT
+    from ultralytics import YOLO
+
+    backend = (backend or INFERENCE_BACKEND).lower()
+    imgsz = imgsz or INFERENCE_IMGSZ
+    exportar_se_ausente = BACKEND_AUTO_EXPORT if exportar_se_ausente is None else exportar_se_ausente
+    modelo_path = Path(modelo_path)
+
+    if backend == 'pytorch':
+        return YOLO(str(modelo_path))
+
+    # Caminho já aponta para um artefato exportado
+    if modelo_path.suffix != '.pt':
+        return YOLO(str(modelo_path), task='detect')
+
+    artefato = caminho_artefato(modelo_path, backend)
+    if not artefato_atualizado(modelo_path, backend):
+        if not exportar_se_ausente:
+            logger.warning(
+                f"⚠️ Artefato {backend} ausente ou desatualizado ({artefato}). "
+                f"Rode scripts/exportar_modelo.py. Usando PyTorch."
+            )
+            return YOLO(str(modelo_path))
+        try:
+            artefato = exportar(modelo_path, backend, imgsz=imgsz)
+        except Exception as e:
+            logger.error(f"❌ Falha ao exportar para {backend}: {e}. Usando PyTorch.")
+            return YOLO(str(modelo_path))
+
+    logger.info(f"🧠 Backend de inferência: {backend} ({artefato})")
+    return YOLO(str(artefato), task='detect')
@@ -0,0 +1,113 @@
+"""
+Captura de Tela sem Cópias - IASenior
+Envolve o buffer bruto do mss sem copiá-lo e converte BGRA→BGR (e
+redimensiona) direto para buffers pré-alocados e reutilizados.
+"""
+
+import logging
+import threading
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CapturaTela:
+    """
+    Captura de um monitor (ou de um sub-retângulo dele) via mss.
+
+    Os frames retornados por `ler()` vêm de um anel de `num_buffers` arrays
+    pré-alocados: cada frame continua válido até `num_buffers - 1` capturas
+    depois. Quem precisa guardar um frame por mais tempo deve copiá-lo.
+
+    O mss precisa ser usado na thread que o criou; se `ler()` for chamado de
+    outra thread (ex.: estágio de captura do pipeline), ele é reaberto lá.
+    """
+
+    def __init__(self, monitor_idx: int, largura: int, altura: int,
+                 regiao: Optional[Sequence[float]] = None, num_buffers: int = 2):
+        """
+        Inicializa a captura.
+
+        Args:
+            monitor_idx: Índice do monitor no mss
+            largura: Largura do frame de saída
+            altura: Altura do frame de saída
+            regiao: Sub-retângulo do monitor em coordenadas normalizadas
+                (x1, y1, x2, y2) de 0.0 a 1.0 (None = monitor inteiro)
+            num_buffers: Quantidade de buffers de saída no anel
+        """
+        self.monitor_idx = monitor_idx
+        self.largura = largura
+        self.altura = altura
+        self.regiao = regiao
+        self.num_buffers = max(1, num_buffers)
+
+        self.sct = None
+        self.monitor = None
+        self._thread_id = None
+        self._buffers = [
+            np.empty((altura, largura, 3), dtype=np.uint8) for _ in range(self.num_buffers)
+        ]
+        self._buffer_bgra = None  # Intermediário quando há redimensionamento
+        self._indice = 0
+
+    def abrir(self):
+        """Abre o mss e calcula a área capturada."""
+        import mss
+
+        self.fechar()
+        self.sct = mss.mss()
+        self._thread_id = threading.get_ident()
+        if self.monitor_idx >= len(self.sct.monitors):
+            raise ValueError(
+                f"Monitor {self.monitor_idx} inválido. "
+                f"Monitores disponíveis: {len(self.sct.monitors) - 1}"
+            )
+
+        monitor = self.sct.monitors[self.monitor_idx]
+        if self.regiao:
+            x1, y1, x2, y2 = self.regiao
+            monitor = {
+                'left': monitor['left'] + int(x1 * monitor['width']),
+                'top': monitor['top'] + int(y1 * monitor['height']),
+                'width': max(1, int((x2 - x1) * monitor['width'])),
+                'height': max(1, int((y2 - y1) * monitor['height'])),
+            }
+        self.monitor = monitor
+
+        if (monitor['width'], monitor['height']) != (self.largura, self.altura):
+            self._buffer_bgra = np.empty((self.altura, self.largura, 4), dtype=np.uint8)
+
+        logger.debug(
+            f"📐 Área capturada: {monitor['width']}x{monitor['height']} "
+            f"em ({monitor['left']}, {monitor['top']}) → {self.largura}x{self.altura}"
+        )
+
+    def ler(self) -> np.ndarray:
+        """Captura um frame BGR no próximo buffer do anel."""
+        if self.sct is None or self._thread_id != threading.get_ident():
+            self.abrir()
+        shot = self.sct.grab(self.monitor)
+
+        # View sobre o buffer do mss (sem cópia)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+        saida = self._buffers[self._indice]
+        self._indice = (self._indice + 1) % self.num_buffers
+
+        if self._buffer_bgra is not None:
+            # Redimensiona antes de converter: menos pixels a converter
+            cv2.resize(bgra, (self.largura, self.altura), dst=self._buffer_bgra)
+            cv2.cvtColor(self._buffer_bgra, cv2.COLOR_BGRA2BGR, dst=saida)
+        else:
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=saida)
+        return saida
+
+    def fechar(self):
+        """Libera o mss."""
+        if self.sct:
+            self.sct.close()
+            self.sct = None
@@ -0,0 +1,116 @@
+"""
+Cascata de Detecção de Quedas - IASenior
+Decide, a partir das caixas do modelo principal, quando vale a pena rodar o
+modelo customizado de quedas (segundo estágio) e sobre quais pessoas.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .posprocessamento import DeteccoesFrame
+
+
+class GatilhoCascataQueda:
+    """
+    Gatilho do segundo estágio da detecção de quedas.
+
+    O modelo customizado só roda quando alguma pessoa é candidata a queda:
+    - proporção altura/largura baixa (pessoa deitada ou se curvando)
+    - centro da caixa na faixa inferior do frame
+    - queda brusca da altura da caixa de um track em relação ao seu máximo recente
+
+    Além disso, um "batimento" periódico força a execução sobre todas as
+    pessoas (ou sobre o frame inteiro se ninguém foi detectado), cobrindo o
+    caso em que o modelo principal deixa de ver a pessoa caída.
+    """
+
+    def __init__(self, proporcao_max: float = 1.0, posicao_min: float = 0.8,
+                 queda_altura: float = 0.35, janela_altura: float = 1.5,
+                 intervalo_batimento: float = 5.0):
+        """
+        Inicializa o gatilho.
+
+        Args:
+            proporcao_max: Proporção altura/largura abaixo da qual a pessoa é candidata
+            posicao_min: Fração da altura do frame abaixo da qual (centro) a pessoa é candidata
+            queda_altura: Redução relativa da altura do track que dispara o gatilho
+            janela_altura: Janela (s) usada para o máximo recente da altura de cada track
+            intervalo_batimento: Intervalo (s) máximo entre execuções (0 = sem batimento)
+        """
+        self.proporcao_max = proporcao_max
+        self.posicao_min = posicao_min
+        self.queda_altura = queda_altura
+        self.janela_altura = janela_altura
+        self.intervalo_batimento = intervalo_batimento
+
+        # {track_id: (altura_maxima_recente, timestamp_do_maximo, ultimo_visto)}
+        self._alturas: Dict[int, Tuple[float, float, float]] = {}
+        self._ultima_execucao = 0.0
+
+        # Estatísticas
+        self.avaliacoes = 0
+        self.disparos = {'proporcao': 0, 'posicao': 0, 'altura': 0, 'batimento': 0}
+
+    def _quedas_de_altura(self, deteccoes: DeteccoesFrame, agora: float) -> np.ndarray:
+        """Atualiza o histórico de alturas por track e retorna a máscara de quedas bruscas."""
+        mascara = np.zeros(len(deteccoes), dtype=bool)
+        if not deteccoes.tem_tracking:
+            return mascara
+
+        for i, (track_id, altura) in enumerate(zip(deteccoes.ids.tolist(), deteccoes.alturas.tolist())):
+            maxima, t_maxima, _ = self._alturas.get(track_id, (altura, agora, agora))
+            if altura >= maxima or agora - t_maxima > self.janela_altura:
+                maxima, t_maxima = altura, agora
+            elif maxima > 0 and (maxima - altura) / maxima >= self.queda_altura:
+                mascara[i] = True
+            self._alturas[track_id] = (maxima, t_maxima, agora)
+
+        # Esquecer tracks que sumiram
+        limite = agora - self.janela_altura * 4
+        for track_id in [t for t, (_, _, visto) in self._alturas.items() if visto < limite]:
+            del self._alturas[track_id]
+
+        return mascara
+
+    def avaliar(self, deteccoes: DeteccoesFrame,
+                agora: Optional[float] = None) -> Tuple[Optional[str], np.ndarray]:
+        """
+        Decide se o segundo estágio deve rodar neste frame.
+
+        Returns:
+            (motivo, mascara): motivo é None quando o modelo deve ser pulado;
+            mascara seleciona as pessoas cujos recortes devem ser inferidos
+            (vazia no batimento sem pessoas = inferir o frame inteiro)
+        """
+        agora = time.time() if agora is None else agora
+        self.avaliacoes += 1
+
+        por_proporcao = deteccoes.proporcoes < self.proporcao_max
+        por_posicao = deteccoes.centros[:, 1] > deteccoes.altura_frame * self.posicao_min
+        por_altura = self._quedas_de_altura(deteccoes, agora)
+        candidatos = por_proporcao | por_posicao | por_altura
+
+        motivo = None
+        if candidatos.any():
+            if por_altura.any():
+                motivo = 'altura'
+            elif por_proporcao.any():
+                motivo = 'proporcao'
+            else:
+                motivo = 'posicao'
+        elif self.intervalo_batimento > 0 and agora - self._ultima_execucao >= self.intervalo_batimento:
+            motivo = 'batimento'
+            candidatos = np.ones(len(deteccoes), dtype=bool)
+
+        if motivo is not None:
+            self.disparos[motivo] += 1
+            self._ultima_execucao = agora
+        return motivo, candidatos
+
+    def taxa_execucao(self) -> float:
+        """Fração dos frames avaliados em que o segundo estágio rodou."""
+        if not self.avaliacoes:
+            return 0.0
+        return sum(self.disparos.values()) / self.avaliacoes
@@ -0,0 +1,253 @@
+"""
+Pipeline em Estágios - IASenior
+Executa captura, inferência, renderização e codificação em workers separados,
+ligados por filas limitadas, para que os estágios se sobreponham no tempo.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinela que percorre o pipeline sinalizando o fim do fluxo
+FIM = object()
+
+
+class Estagio:
+    """
+    Estágio do pipeline executado em uma thread própria.
+
+    Um estágio sem fila de entrada é uma fonte: chama `funcao()` repetidamente
+    até receber FIM (None significa "nada neste ciclo"). Os demais chamam
+    `funcao(item)` para cada item da fila de entrada; retornar None descarta
+    o item (não segue adiante).
+    """
+
+    def __init__(self, nome: str, funcao: Callable,
+                 entrada: Optional[queue.Queue] = None,
+                 saida: Optional[queue.Queue] = None,
+                 descartar_se_cheia: bool = False):
+        """
+        Inicializa o estágio.
+
+        Args:
+            nome: Nome do estágio (usado em logs e relatórios de ocupação)
+            funcao: Função executada para cada item
+            entrada: Fila de entrada (None = estágio fonte)
+            saida: Fila de saída (None = último estágio)
+            descartar_se_cheia: Se True, descarta o item mais antigo da fila de
+                saída quando ela está cheia em vez de bloquear
+        """
+        self.nome = nome
+        self.funcao = funcao
+        self.entrada = entrada
+        self.saida = saida
+        self.descartar_se_cheia = descartar_se_cheia
+
+        self.parar_evento = threading.Event()
+        self.thread = None
+
+        # Estatísticas de ocupação
+        self.itens_processados = 0
+        self.itens_descartados = 0
+        self.erros = 0
+        self.tempo_ocupado = 0.0
+        self.inicio = None
+
+    def iniciar(self, parar_evento: threading.Event = None):
+        """Inicia a thread do estágio."""
+        if parar_evento is not None:
+            self.parar_evento = parar_evento
+        self.inicio = time.time()
+        self.thread = threading.Thread(
+            target=self._loop, name=f"estagio-{self.nome}", daemon=True
+        )
+        self.thread.start()
+
+    def _enviar(self, item):
+        """Coloca um item na fila de saída respeitando a política de descarte."""
+        if self.saida is None:
+            return
+
+        if item is FIM:
+            # O fim do fluxo nunca é descartado
+            while True:
+                try:
+                    self.saida.put(FIM, timeout=0.1)
+                    return
+                except queue.Full:
+                    try:
+                        self.saida.get_nowait()
+                        self.itens_descartados += 1
+                    except queue.Empty:
+                        pass
+
+        if self.descartar_se_cheia:
+            while True:
+                try:
+                    self.saida.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.saida.get_nowait()
+                        self.itens_descartados += 1
+                    except queue.Empty:
+                        pass
+        else:
+            while not self.parar_evento.is_set():
+                try:
+                    self.saida.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+    def _executar(self, *args):
+        """Executa a função do estágio contabilizando tempo ocupado e erros."""
+        inicio = time.perf_counter()
+        try:
+            return self.funcao(*args)
+        except Exception as e:
+            self.erros += 1
+            logger.error(f"❌ Erro no estágio '{self.nome}': {e}", exc_info=True)
+            return None
+        finally:
+            self.tempo_ocupado += time.perf_counter() - inicio
+
+    def _loop(self):
+        """Loop principal do estágio."""
+        try:
+            if self.entrada is None:
+                while not self.parar_evento.is_set():
+                    item = self._executar()
+                    if item is FIM:
+                        break
+                    if item is None:
+                        continue
+                    self.itens_processados += 1
+                    self._enviar(item)
+            else:
+                while True:
+                    try:
+                        item = self.entrada.get(timeout=0.1)
+                    except queue.Empty:
+                        if self.parar_evento.is_set():
+                            break
+                        continue
+
+                    if item is FIM:
+                        break
+
+                    resultado = self._executar(item)
+                    self.itens_processados += 1
+                    if resultado is not None:
+                        self._enviar(resultado)
+        finally:
+            self._enviar(FIM)
+            logger.info(f"🛑 Estágio '{self.nome}' finalizado")
+
+    def ocupacao(self) -> Dict[str, Any]:
+        """
+        Retorna a ocupação atual do estágio.
+
+        Returns:
+            Dicionário com fração de tempo ocupado, tamanho da fila de entrada,
+            itens processados, descartados e erros
+        """
+        decorrido = time.time() - self.inicio if self.inicio else 0.0
+        fila = self.entrada.qsize() if self.entrada is not None else 0
+        capacidade = self.entrada.maxsize if self.entrada is not None else 0
+        return {
+            'ocupacao': self.tempo_ocupado / decorrido if decorrido > 0 else 0.0,
+            'fila': fila,
+            'capacidade_fila': capacidade,
+            'processados': self.itens_processados,
+            'descartados': self.itens_descartados,
+            'erros': self.erros,
+            'latencia_media_ms': (
+                self.tempo_ocupado / self.itens_processados * 1000
+                if self.itens_processados else 0.0
+            ),
+        }
+
+
+class PipelineEstagios:
+    """
+    Encadeia estágios com filas limitadas.
+
+    Cada estágio roda em sua própria thread, então captura e codificação
+    se sobrepõem à inferência. A ordem dos frames é preservada porque cada
+    estágio tem um único worker.
+    """
+
+    def __init__(self, tamanho_fila: int = 2):
+        """
+        Inicializa o pipeline.
+
+        Args:
+            tamanho_fila: Capacidade de cada fila entre estágios
+        """
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.estagios: List[Estagio] = []
+        self.parar_evento = threading.Event()
+
+    def adicionar_estagio(self, nome: str, funcao: Callable,
+                          descartar_se_cheia: bool = False) -> Estagio:
+        """
+        Adiciona um estágio ao final do pipeline.
+
+        O primeiro estágio adicionado é a fonte. `descartar_se_cheia` se aplica
+        à fila de saída do estágio (útil na captura, onde o frame mais novo é
+        mais valioso que um frame antigo parado na fila).
+        """
+        entrada = None
+        if self.estagios:
+            anterior = self.estagios[-1]
+            entrada = queue.Queue(maxsize=self.tamanho_fila)
+            anterior.saida = entrada
+
+        estagio = Estagio(nome, funcao, entrada=entrada,
+                          descartar_se_cheia=descartar_se_cheia)
+        self.estagios.append(estagio)
+        return estagio
+
+    def iniciar(self):
+        """Inicia todos os estágios (do último para o primeiro)."""
+        self.parar_evento.clear()
+        for estagio in reversed(self.estagios):
+            estagio.iniciar(self.parar_evento)
+        logger.info(
+            f"🚀 Pipeline iniciado com {len(self.estagios)} estágios: "
+            f"{' → '.join(e.nome for e in self.estagios)}"
+        )
+
+    def parar(self):
+        """Solicita a parada de todos os estágios."""
+        self.parar_evento.set()
+
+    def ativo(self) -> bool:
+        """Retorna True enquanto algum estágio estiver em execução."""
+        return any(e.thread is not None and e.thread.is_alive() for e in self.estagios)
+
+    def aguardar(self, timeout: float = None):
+        """Aguarda o término de todos os estágios."""
+        for estagio in self.estagios:
+            if estagio.thread is not None:
+                estagio.thread.join(timeout)
+
+    def ocupacao(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna a ocupação de cada estágio, indexada pelo nome."""
+        return {e.nome: e.ocupacao() for e in self.estagios}
+
+    def resumo_ocupacao(self) -> str:
+        """Resumo de ocupação em uma linha, para logs periódicos."""
+        partes = []
+        for nome, dados in self.ocupacao().items():
+            partes.append(
+                f"{nome}: {dados['ocupacao'] * 100:.0f}% "
+                f"fila {dados['fila']}/{dados['capacidade_fila']} "
+                f"desc {dados['descartados']}"
+            )
+        return " | ".join(partes)
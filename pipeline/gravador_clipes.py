@@ -0,0 +1,195 @@
+"""
+Gravador de Clipes Pré-Evento - IASenior
+Anel em memória com os últimos segundos de uma câmera em JPEG (não arrays
+crus): 10s a 5 FPS em 720p ocupam poucos MB, enquanto os mesmos frames crus
+passariam de 130 MB por câmera. Em uma queda ou alerta de banheiro, o anel é
+congelado, recebe os segundos seguintes ao evento e vira um clipe .avi
+escrito por uma thread própria, fora do caminho dos frames.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FrameCodificado = Tuple[float, bytes]  # (instante, JPEG)
+
+
+class _ClipeEmGravacao:
+    """Clipe disparado aguardando os segundos pós-evento."""
+
+    __slots__ = ('caminho', 'motivo', 'fim', 'frames')
+
+    def __init__(self, caminho: Path, motivo: str, fim: float, frames: List[FrameCodificado]):
+        self.caminho = caminho
+        self.motivo = motivo
+        self.fim = fim
+        self.frames = frames
+
+
+class GravadorClipes:
+    """
+    Anel de frames JPEG de uma câmera, descarregado em clipe quando há evento.
+
+    `adicionar()` é chamado a cada frame e codifica no máximo `fps` frames por
+    segundo; `disparar()` é chamado pela lógica de monitoramento. Podem vir de
+    threads diferentes (modo em estágios).
+    """
+
+    def __init__(self, diretorio: str, nome: str = "camera", segundos_antes: float = 10.0,
+                 segundos_depois: float = 5.0, fps: float = 5.0, qualidade_jpeg: int = 70,
+                 max_bytes: int = 32 * 1024 * 1024):
+        """
+        Inicializa o gravador.
+
+        Args:
+            diretorio: Pasta dos clipes
+            nome: Nome da câmera (prefixo dos arquivos e logs)
+            segundos_antes: Segundos guardados antes do evento
+            segundos_depois: Segundos gravados depois do evento
+            fps: Frames por segundo guardados no anel (e no clipe)
+            qualidade_jpeg: Qualidade JPEG dos frames guardados
+            max_bytes: Teto de memória do anel (o mais antigo sai primeiro)
+        """
+        self.diretorio = Path(diretorio)
+        self.nome = nome
+        self.segundos_antes = segundos_antes
+        self.segundos_depois = segundos_depois
+        self.fps = fps
+        self.qualidade_jpeg = qualidade_jpeg
+        self.max_bytes = max_bytes
+
+        self._anel: Deque[FrameCodificado] = deque()
+        self._bytes_anel = 0
+        self._ultimo_instante = 0.0
+        self._clipe: Optional[_ClipeEmGravacao] = None
+        self._escritores: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        # Estatísticas
+        self.clipes_gravados = 0
+        self.erros_gravacao = 0
+
+    def adicionar(self, frame: np.ndarray, instante: Optional[float] = None) -> bool:
+        """
+        Codifica o frame no anel, respeitando o FPS do gravador.
+
+        Returns:
+            True se o frame foi guardado
+        """
+        instante = time.time() if instante is None else instante
+        # Folga de 10%: com a fonte a 20 FPS e o gravador a 5, o jitter do
+        # relógio não deve fazer guardar um frame a cada 0,25s em vez de 0,2s
+        if instante - self._ultimo_instante < 0.9 / self.fps:
+            return False
+        self._ultimo_instante = instante
+
+        # Codificação fora do lock: é a parte cara e não toca estado compartilhado
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.qualidade_jpeg])
+        if not ok:
+            return False
+        item = (instante, jpeg.tobytes())
+
+        concluido = None
+        with self._lock:
+            self._anel.append(item)
+            self._bytes_anel += len(item[1])
+            limite = instante - self.segundos_antes
+            while self._anel and (self._anel[0][0] < limite or self._bytes_anel > self.max_bytes):
+                self._bytes_anel -= len(self._anel.popleft()[1])
+
+            if self._clipe is not None:
+                self._clipe.frames.append(item)
+                if instante >= self._clipe.fim:
+                    concluido, self._clipe = self._clipe, None
+
+        if concluido is not None:
+            self._escrever_em_segundo_plano(concluido)
+        return True
+
+    def disparar(self, motivo: str, instante: Optional[float] = None) -> str:
+        """
+        Congela o anel atual como início de um clipe.
+
+        Se já há um clipe aguardando os segundos pós-evento, o evento entra
+        nele e o mesmo caminho é retornado.
+
+        Returns:
+            Caminho do clipe (o arquivo aparece ao fim dos segundos pós-evento)
+        """
+        instante = time.time() if instante is None else instante
+        with self._lock:
+            if self._clipe is not None:
+                return str(self._clipe.caminho)
+            carimbo = datetime.fromtimestamp(instante).strftime('%Y%m%d_%H%M%S')
+            caminho = self.diretorio / f"{self.nome}_{motivo}_{carimbo}.avi"
+            self._clipe = _ClipeEmGravacao(caminho, motivo, instante + self.segundos_depois, list(self._anel))
+        logger.info(f"🎬 [{self.nome}] Clipe de {motivo} disparado: {caminho}")
+        return str(caminho)
+
+    def _escrever_em_segundo_plano(self, clipe: _ClipeEmGravacao):
+        self._escritores = [t for t in self._escritores if t.is_alive()]
+        escritor = threading.Thread(
+            target=self._escrever, args=(clipe,), name=f"clipe-{self.nome}", daemon=True
+        )
+        self._escritores.append(escritor)
+        escritor.start()
+
+    def _escrever(self, clipe: _ClipeEmGravacao):
+        """Decodifica os JPEGs e grava o clipe (arquivo parcial + rename atômico)."""
+        if not clipe.frames:
+            return
+        parcial = clipe.caminho.with_name(clipe.caminho.stem + '.parcial.avi')
+        writer = None
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            duracao = clipe.frames[-1][0] - clipe.frames[0][0]
+            fps = (len(clipe.frames) - 1) / duracao if duracao > 0 else self.fps
+            for _, jpeg in clipe.frames:
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    altura, largura = frame.shape[:2]
+                    writer = cv2.VideoWriter(str(parcial), cv2.VideoWriter_fourcc(*'MJPG'), fps, (largura, altura))
+                writer.write(frame)
+            writer.release()
+            writer = None
+            os.replace(parcial, clipe.caminho)
+            self.clipes_gravados += 1
+            logger.info(
+                f"✅ [{self.nome}] Clipe de {clipe.motivo} salvo: {clipe.caminho} "
+                f"({len(clipe.frames)} frames, {duracao:.1f}s)"
+            )
+        except Exception as e:
+            self.erros_gravacao += 1
+            logger.error(f"❌ [{self.nome}] Erro ao gravar clipe {clipe.caminho}: {e}")
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def parar(self, timeout: float = 10.0):
+        """Grava o clipe pendente com o que houver e aguarda os escritores."""
+        with self._lock:
+            pendente, self._clipe = self._clipe, None
+        if pendente is not None:
+            self._escrever_em_segundo_plano(pendente)
+        for escritor in self._escritores:
+            escritor.join(timeout=timeout)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'frames_anel': len(self._anel),
+                'bytes_anel': self._bytes_anel,
+                'gravando': self._clipe is not None,
+                'clipes_gravados': self.clipes_gravados,
+                'erros_gravacao': self.erros_gravacao,
+            }
@@ -0,0 +1,191 @@
+"""
+Leitor RTSP "último frame vence" - IASenior
+Uma thread por fonte decodifica continuamente e expõe apenas o frame mais
+recente, com o instante de captura. Consumidores lentos (inferência, clientes
+MJPEG) pegam sempre o frame atual em vez de consumir a fila interna do
+decodificador, que com o backend FFmpeg ignora CAP_PROP_BUFFERSIZE e faz o
+vídeo servido ficar segundos atrás do tempo real.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FrameLido = Tuple[np.ndarray, int, float]  # (frame, seq, instante de captura)
+
+
+class LeitorUltimoFrame:
+    """
+    Leitura contínua de uma fonte cv2.VideoCapture, guardando só o último frame.
+
+    Vários consumidores podem ler a mesma fonte: cada um informa o último `seq`
+    que já processou e recebe o próximo frame mais recente (frames
+    intermediários são descartados). Sem consumidores recentes, a thread só
+    avança o decodificador (`grab`), sem converter os frames para BGR.
+    """
+
+    def __init__(self, url: str, largura: Optional[int] = None, altura: Optional[int] = None,
+                 atraso_reconexao: float = 5.0, falhas_para_reconectar: int = 10,
+                 ocioso_apos: float = 2.0, nome: Optional[str] = None):
+        """
+        Inicializa o leitor (a thread só sobe em `iniciar()`).
+
+        Args:
+            url: URL RTSP/HTTP ou arquivo de vídeo
+            largura: Largura de saída (None = a da fonte)
+            altura: Altura de saída (None = a da fonte)
+            atraso_reconexao: Segundos entre tentativas de abrir a fonte
+            falhas_para_reconectar: Leituras seguidas com falha até reabrir a fonte
+            ocioso_apos: Segundos sem leitura até parar de converter frames
+            nome: Nome da thread/logs (padrão: a URL)
+        """
+        self.url = url
+        self.largura = largura
+        self.altura = altura
+        self.atraso_reconexao = atraso_reconexao
+        self.falhas_para_reconectar = max(1, falhas_para_reconectar)
+        self.ocioso_apos = ocioso_apos
+        self.nome = nome or url
+
+        self._frame: Optional[np.ndarray] = None
+        self._seq = 0
+        self._instante = 0.0
+        self._seq_entregue = 0
+        self._ultima_demanda = 0.0
+        self._condicao = threading.Condition()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.conectado = False
+
+        # Estatísticas
+        self.frames_decodificados = 0
+        self.frames_nao_consumidos = 0
+        self.erros_leitura = 0
+        self.reconexoes = 0
+
+    def iniciar(self):
+        """Sobe a thread de leitura (idempotente)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"leitor-{self.nome}", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        with self._condicao:
+            self._condicao.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _abrir(self) -> Optional[cv2.VideoCapture]:
+        cap = cv2.VideoCapture(self.url)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # onde o backend respeitar
+        return cap
+
+    def _loop(self):
+        cap = None
+        falhas = 0
+        # Com falhas_para_reconectar=1 (arquivo em loop), reabrir é o fluxo normal
+        nivel_reabertura = logging.WARNING if self.falhas_para_reconectar > 1 else logging.DEBUG
+        while not self._parar.is_set():
+            if cap is None:
+                cap = self._abrir()
+                if cap is None:
+                    self.conectado = False
+                    logger.warning(
+                        f"⚠️ Não foi possível abrir {self.nome}. Nova tentativa em {self.atraso_reconexao}s"
+                    )
+                    self._parar.wait(self.atraso_reconexao)
+                    continue
+                if self.frames_decodificados:
+                    self.reconexoes += 1
+                    logger.log(nivel_reabertura, f"✅ Fonte reconectada: {self.nome}")
+                else:
+                    logger.info(f"✅ Fonte conectada: {self.nome}")
+                self.conectado = True
+                falhas = 0
+
+            # Sem consumidores: só avança o decodificador, sem conversão
+            ocioso = time.monotonic() - self._ultima_demanda > self.ocioso_apos
+            if ocioso:
+                sucesso, frame = cap.grab(), None
+            else:
+                sucesso, frame = cap.read()
+            instante = time.time()
+
+            if not sucesso:
+                falhas += 1
+                self.erros_leitura += 1
+                if falhas >= self.falhas_para_reconectar:
+                    logger.log(nivel_reabertura, f"⚠️ {falhas} falhas de leitura em {self.nome}. Reabrindo...")
+                    cap.release()
+                    cap = None
+                    self.conectado = False
+                else:
+                    self._parar.wait(0.05)
+                continue
+
+            falhas = 0
+            self.frames_decodificados += 1
+            if frame is None:
+                continue
+            if self.largura and self.altura and (frame.shape[1], frame.shape[0]) != (self.largura, self.altura):
+                frame = cv2.resize(frame, (self.largura, self.altura))
+
+            with self._condicao:
+                if self._seq_entregue < self._seq:
+                    self.frames_nao_consumidos += 1
+                self._frame = frame
+                self._seq += 1
+                self._instante = instante
+                self._condicao.notify_all()
+
+        if cap is not None:
+            cap.release()
+        self.conectado = False
+
+    def ler(self, ultimo_seq: int = 0, aguardar: float = 1.0) -> Optional[FrameLido]:
+        """
+        Frame mais recente posterior a `ultimo_seq`.
+
+        O frame é compartilhado entre consumidores: copie antes de desenhar nele.
+
+        Args:
+            ultimo_seq: Último seq já processado por este consumidor
+            aguardar: Segundos de espera por um frame novo (0 = não esperar)
+
+        Returns:
+            (frame, seq, instante_captura) ou None se não chegou frame novo
+        """
+        self._ultima_demanda = time.monotonic()
+        with self._condicao:
+            if self._seq <= ultimo_seq and aguardar > 0:
+                self._condicao.wait_for(lambda: self._seq > ultimo_seq or self._parar.is_set(), aguardar)
+            if self._frame is None or self._seq <= ultimo_seq:
+                return None
+            self._seq_entregue = self._seq
+            return self._frame, self._seq, self._instante
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            'conectado': self.conectado,
+            'frames_decodificados': self.frames_decodificados,
+            'frames_nao_consumidos': self.frames_nao_consumidos,
+            'erros_leitura': self.erros_leitura,
+            'reconexoes': self.reconexoes,
+            'idade_ultimo_frame': round(time.time() - self._instante, 3) if self._instante else None,
+        }
+
+    def __repr__(self):
+        return self.nome
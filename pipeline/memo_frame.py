@@ -0,0 +1,68 @@
+"""
+Memo por Frame - IASenior
+Guarda o resultado de um cálculo caro (ex.: modelo customizado de quedas)
+associado ao número de sequência do frame, para que todos os consumidores
+do mesmo frame compartilhem uma única execução.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class MemoPorFrame:
+    """
+    Memo de um único resultado, indexado pelo número de sequência do frame.
+
+    `obter(seq, calcular)` executa `calcular()` no máximo uma vez por `seq`;
+    chamadas seguintes com o mesmo `seq` reaproveitam o resultado. `seq` pode
+    ser qualquer valor comparável (ex.: (fonte, seq) com várias fontes).
+
+    Com `mais_antigo`, um cliente atrasado que pede um frame anterior ao
+    último calculado recebe o último resultado em vez de recalcular: cálculos
+    com estado (rastreador, cronômetros) nunca voltam no tempo.
+    """
+
+    def __init__(self, mais_antigo: Optional[Callable[[Hashable, Hashable], bool]] = None):
+        """
+        Inicializa o memo.
+
+        Args:
+            mais_antigo: mais_antigo(seq, ultimo_seq) -> True se `seq` é anterior
+                a `ultimo_seq` (None = todo seq diferente é recalculado)
+        """
+        self.mais_antigo = mais_antigo
+        self._lock = threading.Lock()
+        self.seq = None
+        self.resultado = None
+
+        # Contadores (expostos em /status)
+        self.execucoes = 0
+        self.reutilizacoes = 0
+
+    def obter(self, seq: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Retorna o resultado do frame `seq`, calculando-o se necessário."""
+        with self._lock:
+            if seq == self.seq or (
+                self.mais_antigo is not None and self.seq is not None and self.mais_antigo(seq, self.seq)
+            ):
+                self.reutilizacoes += 1
+                return self.resultado
+
+            self.resultado = calcular()
+            self.seq = seq
+            self.execucoes += 1
+            return self.resultado
+
+    def ultimo(self) -> Any:
+        """Último resultado calculado (None se nunca calculou)."""
+        with self._lock:
+            return self.resultado
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores do memo."""
+        with self._lock:
+            return {
+                'ultimo_frame_seq': self.seq,
+                'execucoes': self.execucoes,
+                'reutilizacoes': self.reutilizacoes,
+            }
@@ -0,0 +1,311 @@
+"""
+Anel de Frames em Memória Compartilhada - IASenior
+O pipeline publica os frames anotados crus (BGR) em um anel de
+`multiprocessing.shared_memory`; servidores MJPEG, painel e calibração na
+mesma máquina os leem direto da memória, sem JPEG em disco nem RTSP.
+
+Layout do bloco:
+- cabeçalho global: magic, versão, nº de slots, altura/largura/canais
+  máximos, o número de sequência do último frame publicado e o instante de
+  criação do bloco (geração: a sequência recomeça a cada criação);
+- N slots, cada um com cabeçalho (seq, timestamp, altura, largura, canais)
+  seguido dos pixels.
+
+Cada slot funciona como um seqlock: o escritor zera o `seq` do slot antes de
+copiar os pixels e o grava por último; o leitor confere o `seq` antes e
+depois da cópia e descarta a leitura se ele mudou.
+"""
+
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x49415346  # "IASF"
+VERSAO = 2
+
+# magic, versao, num_slots, altura, largura, canais (uint32) + seq_atual (uint64)
+# + instante de criação (float64)
+_CABECALHO_GLOBAL = np.dtype([
+    ('magic', '<u4'), ('versao', '<u4'), ('num_slots', '<u4'),
+    ('altura', '<u4'), ('largura', '<u4'), ('canais', '<u4'),
+    ('seq', '<u8'), ('criado', '<f8'),
+])
+_CABECALHO_SLOT = np.dtype([
+    ('seq', '<u8'), ('timestamp', '<f8'),
+    ('altura', '<u4'), ('largura', '<u4'), ('canais', '<u4'), ('_pad', '<u4'),
+])
+
+
+def _abrir_sem_rastreamento(nome: str) -> shared_memory.SharedMemory:
+    """
+    Anexa a um bloco existente sem registrá-lo no resource_tracker.
+
+    Até o Python 3.12 o resource_tracker remove o bloco quando um processo
+    que apenas o anexou termina, derrubando o anel para os demais.
+    """
+    try:
+        return shared_memory.SharedMemory(name=nome, create=False, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=nome, create=False)
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class AnelFramesCompartilhado:
+    """
+    Anel de frames crus em memória compartilhada (um escritor, N leitores).
+
+    Use `criar()` no processo que publica e `anexar()` nos leitores.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, escritor: bool):
+        self.shm = shm
+        self.escritor = escritor
+        self.cabecalho = np.ndarray((), dtype=_CABECALHO_GLOBAL, buffer=shm.buf)
+        self.num_slots = int(self.cabecalho['num_slots'])
+        self.forma_max = (
+            int(self.cabecalho['altura']), int(self.cabecalho['largura']), int(self.cabecalho['canais'])
+        )
+        self._tamanho_pixels = int(np.prod(self.forma_max))
+        self._tamanho_slot = _CABECALHO_SLOT.itemsize + self._tamanho_pixels
+
+        self._slots = []
+        for i in range(self.num_slots):
+            inicio = _CABECALHO_GLOBAL.itemsize + i * self._tamanho_slot
+            cab = np.ndarray((), dtype=_CABECALHO_SLOT, buffer=shm.buf, offset=inicio)
+            pixels = np.ndarray(
+                (self._tamanho_pixels,), dtype=np.uint8, buffer=shm.buf,
+                offset=inicio + _CABECALHO_SLOT.itemsize
+            )
+            if not escritor:
+                pixels.flags.writeable = False
+            self._slots.append((cab, pixels))
+
+        # Estatísticas
+        self.frames_publicados = 0
+        self.leituras_descartadas = 0
+
+    @classmethod
+    def criar(cls, nome: str, largura: int, altura: int, canais: int = 3,
+              num_slots: int = 4) -> 'AnelFramesCompartilhado':
+        """
+        Cria o anel (substitui um bloco com o mesmo nome deixado por uma execução anterior).
+
+        Args:
+            nome: Nome do bloco de memória compartilhada
+            largura: Largura máxima dos frames
+            altura: Altura máxima dos frames
+            canais: Canais dos frames
+            num_slots: Quantidade de frames no anel
+        """
+        tamanho = _CABECALHO_GLOBAL.itemsize + num_slots * (
+            _CABECALHO_SLOT.itemsize + largura * altura * canais
+        )
+        try:
+            shm = shared_memory.SharedMemory(name=nome, create=True, size=tamanho)
+        except FileExistsError:
+            antigo = _abrir_sem_rastreamento(nome)
+            antigo.close()
+            antigo.unlink()
+            shm = shared_memory.SharedMemory(name=nome, create=True, size=tamanho)
+
+        cabecalho = np.ndarray((), dtype=_CABECALHO_GLOBAL, buffer=shm.buf)
+        cabecalho['num_slots'] = num_slots
+        cabecalho['altura'] = altura
+        cabecalho['largura'] = largura
+        cabecalho['canais'] = canais
+        cabecalho['seq'] = 0
+        cabecalho['criado'] = time.time()
+        cabecalho['versao'] = VERSAO
+        cabecalho['magic'] = MAGIC  # por último: marca o bloco como pronto
+        del cabecalho
+        logger.info(f"🧠 Anel de frames em memória compartilhada: {nome} ({num_slots} x {largura}x{altura})")
+        return cls(shm, escritor=True)
+
+    @classmethod
+    def anexar(cls, nome: str) -> Optional['AnelFramesCompartilhado']:
+        """Anexa a um anel existente, só para leitura (None se não existir ou for inválido)."""
+        try:
+            shm = _abrir_sem_rastreamento(nome)
+        except (FileNotFoundError, OSError):
+            return None
+
+        cabecalho = np.ndarray((), dtype=_CABECALHO_GLOBAL, buffer=shm.buf)
+        valido = int(cabecalho['magic']) == MAGIC and int(cabecalho['versao']) == VERSAO
+        del cabecalho
+        if not valido:
+            shm.close()
+            return None
+        return cls(shm, escritor=False)
+
+    @property
+    def seq_atual(self) -> int:
+        """Sequência do último frame publicado (0 = nenhum)."""
+        return int(self.cabecalho['seq'])
+
+    @property
+    def geracao(self) -> float:
+        """Instante de criação do bloco: identifica a sequência (que recomeça em 0 a cada criação)."""
+        return float(self.cabecalho['criado'])
+
+    def publicar(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """
+        Copia um frame para o próximo slot do anel.
+
+        Returns:
+            Número de sequência do frame publicado
+        """
+        if not self.escritor:
+            raise RuntimeError("Anel anexado apenas para leitura")
+        altura, largura = frame.shape[:2]
+        canais = frame.shape[2] if frame.ndim == 3 else 1
+        if altura * largura * canais > self._tamanho_pixels:
+            raise ValueError(f"Frame {frame.shape} maior que o slot {self.forma_max}")
+
+        seq = self.seq_atual + 1
+        cab, pixels = self._slots[seq % self.num_slots]
+
+        cab['seq'] = 0  # slot em escrita
+        np.copyto(pixels[:altura * largura * canais].reshape(frame.shape), frame)
+        cab['timestamp'] = time.time() if timestamp is None else timestamp
+        cab['altura'] = altura
+        cab['largura'] = largura
+        cab['canais'] = canais
+        cab['seq'] = seq
+        self.cabecalho['seq'] = seq
+        self.frames_publicados += 1
+        return seq
+
+    def ler_ultimo(self, ultimo_seq: int = 0,
+                   destino: Optional[np.ndarray] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Copia o frame mais recente, se for mais novo que `ultimo_seq`.
+
+        Args:
+            ultimo_seq: Sequência do último frame já lido pelo consumidor
+            destino: Array reutilizado para a cópia (None = aloca um novo)
+
+        Returns:
+            (seq, timestamp, frame) ou None se não há frame novo
+        """
+        for _ in range(3):
+            seq = self.seq_atual
+            if seq == 0 or seq == ultimo_seq:
+                return None
+
+            cab, pixels = self._slots[seq % self.num_slots]
+            if int(cab['seq']) != seq:
+                continue  # escritor já está sobrescrevendo este slot
+            forma = (int(cab['altura']), int(cab['largura']), int(cab['canais']))
+            timestamp = float(cab['timestamp'])
+
+            if destino is None or destino.shape != forma:
+                destino = np.empty(forma, dtype=np.uint8)
+            np.copyto(destino, pixels[:int(np.prod(forma))].reshape(forma))
+
+            if int(cab['seq']) == seq:
+                return seq, timestamp, destino
+            self.leituras_descartadas += 1
+        return None
+
+    def fechar(self):
+        """Solta o bloco (o escritor também o remove do sistema)."""
+        # Views sobre o buffer precisam ser liberadas antes do close
+        self._slots = []
+        self.cabecalho = None
+        try:
+            self.shm.close()
+            if self.escritor:
+                self.shm.unlink()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao fechar memória compartilhada: {e}")
+
+
+class LeitorAnelFrames:
+    """
+    Leitor para consumidores que podem iniciar antes (ou sobreviver a) o pipeline.
+
+    Anexa ao anel sob demanda (no máximo a cada `intervalo_tentativa`
+    segundos), guarda a sequência do último frame entregue e, se o anel
+    parar de receber frames por `tempo_inativo` segundos (pipeline parado ou
+    reiniciado com um bloco novo), solta o bloco e volta a tentar anexar.
+    """
+
+    def __init__(self, nome: str, intervalo_tentativa: float = 2.0, tempo_inativo: float = 5.0):
+        self.nome = nome
+        self.intervalo_tentativa = intervalo_tentativa
+        self.tempo_inativo = tempo_inativo
+        self.anel: Optional[AnelFramesCompartilhado] = None
+        self.ultimo_seq = 0
+        self.ultimo_timestamp = 0.0
+        self.geracao = 0.0  # geração do anel anexado (ultimo_seq só é comparável dentro dela)
+        self._ultima_tentativa = 0.0
+        self._seq_visto = 0
+        self._ultimo_avanco = 0.0
+
+    def disponivel(self) -> bool:
+        """True se o anel está anexado e recebendo frames (tenta anexar se preciso)."""
+        agora = time.time()
+        if self.anel is not None:
+            seq = self.anel.seq_atual
+            if seq != self._seq_visto:
+                self._seq_visto = seq
+                self._ultimo_avanco = agora
+            elif agora - self._ultimo_avanco > self.tempo_inativo:
+                logger.warning(f"⚠️ Memória compartilhada {self.nome} sem frames novos. Reanexando...")
+                self.fechar()
+
+        if self.anel is None and agora - self._ultima_tentativa >= self.intervalo_tentativa:
+            self._ultima_tentativa = agora
+            self.anel = AnelFramesCompartilhado.anexar(self.nome)
+            if self.anel:
+                logger.info(f"🧠 Lendo frames da memória compartilhada: {self.nome}")
+                self.ultimo_seq = 0
+                self.geracao = self.anel.geracao
+                self._seq_visto = self.anel.seq_atual
+                self._ultimo_avanco = agora
+        return self.anel is not None
+
+    def ler(self, aguardar: float = 0.0) -> Optional[np.ndarray]:
+        """
+        Retorna o próximo frame novo (BGR) ou None.
+
+        Args:
+            aguardar: Tempo máximo (s) esperando um frame novo
+        """
+        if not self.disponivel():
+            return None
+        limite = time.time() + aguardar
+        while True:
+            lido = self.anel.ler_ultimo(self.ultimo_seq)
+            if lido is not None:
+                self.ultimo_seq, self.ultimo_timestamp, frame = lido
+                return frame
+            if time.time() >= limite:
+                return None
+            time.sleep(0.005)
+
+    def ler_mais_recente(self) -> Optional[np.ndarray]:
+        """Retorna o frame mais recente, mesmo que já tenha sido entregue."""
+        if not self.disponivel():
+            return None
+        lido = self.anel.ler_ultimo(0)
+        if lido is None:
+            return None
+        self.ultimo_seq, self.ultimo_timestamp, frame = lido
+        return frame
+
+    def fechar(self):
+        if self.anel:
+            self.anel.fechar()
+            self.anel = None
@@ -0,0 +1,275 @@
+"""
+Métricas de Desempenho - IASenior
+Latência por estágio em janela móvel (p50/p95/p99), contadores (frames,
+descartes, erros) e medidores (profundidade de filas) expostos no formato
+texto do Prometheus, em um endpoint HTTP próprio ou em uma rota Flask.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+QUANTIS = (0.5, 0.95, 0.99)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def _rotulos(rotulos: Dict[str, str]) -> Rotulos:
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _formatar_rotulos(rotulos: Rotulos) -> str:
+    if not rotulos:
+        return ''
+    partes = []
+    for chave, valor in rotulos:
+        valor = valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{chave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+class JanelaLatencias:
+    """
+    Últimas N amostras de latência de um estágio, em um anel pré-alocado.
+
+    Guarda também o instante de cada amostra (vazão na janela) e os totais
+    acumulados desde o início (`_sum`/`_count` do Prometheus).
+    """
+
+    def __init__(self, tamanho: int = 1024):
+        self.valores = np.zeros(max(1, tamanho), dtype=np.float64)
+        self.instantes = np.zeros(max(1, tamanho), dtype=np.float64)
+        self.total = 0
+        self.soma = 0.0
+
+    def registrar(self, segundos: float, agora: float):
+        i = self.total % len(self.valores)
+        self.valores[i] = segundos
+        self.instantes[i] = agora
+        self.total += 1
+        self.soma += segundos
+
+    def _preenchidos(self) -> int:
+        return min(self.total, len(self.valores))
+
+    def percentis(self, quantis=QUANTIS) -> Optional[np.ndarray]:
+        """Percentis da janela (segundos) ou None sem amostras."""
+        n = self._preenchidos()
+        if n == 0:
+            return None
+        return np.quantile(self.valores[:n], quantis)
+
+    def taxa(self) -> float:
+        """Amostras por segundo dentro da janela."""
+        n = self._preenchidos()
+        if n < 2:
+            return 0.0
+        instantes = self.instantes[:n]
+        duracao = float(instantes.max() - instantes.min())
+        return (n - 1) / duracao if duracao > 0 else 0.0
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas de um processo (seguro entre threads).
+
+    - `medir(estagio)` / `observar(estagio, s)`: latência por estágio;
+    - `contar(nome, **rotulos)`: contadores incrementados pelo código;
+    - `expor(nome, funcao, **rotulos)`: valores lidos na hora da coleta
+      (profundidade de filas, contadores mantidos por outros componentes).
+    """
+
+    def __init__(self, prefixo: str = 'iasenior', janela: int = 1024):
+        """
+        Inicializa o registro.
+
+        Args:
+            prefixo: Prefixo dos nomes das métricas
+            janela: Amostras por estágio usadas nos percentis
+        """
+        self.prefixo = prefixo
+        self.janela = janela
+        self._lock = threading.Lock()
+        self._latencias: Dict[str, JanelaLatencias] = {}
+        self._contadores: Dict[Tuple[str, Rotulos], float] = {}
+        self._expostos: Dict[Tuple[str, Rotulos], Tuple[Callable[[], float], str]] = {}
+        self._ajudas: Dict[str, str] = {}
+        self._falhas_avisadas: Set[Tuple[str, Rotulos]] = set()
+
+    def observar(self, estagio: str, segundos: float):
+        """Registra a duração de uma execução do estágio."""
+        with self._lock:
+            janela = self._latencias.get(estagio)
+            if janela is None:
+                janela = self._latencias[estagio] = JanelaLatencias(self.janela)
+            janela.registrar(segundos, time.monotonic())
+
+    @contextmanager
+    def medir(self, estagio: str):
+        """Mede o bloco como uma execução do estágio (também quando ele levanta exceção)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(estagio, time.perf_counter() - inicio)
+
+    def contar(self, nome: str, valor: float = 1, ajuda: str = '', **rotulos):
+        """Incrementa um contador."""
+        chave = (nome, _rotulos(rotulos))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+            if ajuda:
+                self._ajudas[nome] = ajuda
+
+    def expor(self, nome: str, funcao: Callable[[], float], tipo: str = 'gauge',
+              ajuda: str = '', **rotulos):
+        """
+        Expõe um valor calculado na hora da coleta.
+
+        Args:
+            nome: Nome da métrica (sem prefixo)
+            funcao: Função sem argumentos que retorna o valor atual
+            tipo: 'gauge' ou 'counter'
+            ajuda: Descrição da métrica
+            **rotulos: Rótulos da série
+        """
+        with self._lock:
+            self._expostos[(nome, _rotulos(rotulos))] = (funcao, tipo)
+            if ajuda:
+                self._ajudas[nome] = ajuda
+
+    def percentis_ms(self, estagio: str) -> Optional[Tuple[float, float, float]]:
+        """(p50, p95, p99) do estágio em milissegundos, ou None sem amostras."""
+        with self._lock:
+            janela = self._latencias.get(estagio)
+            valores = janela.percentis() if janela else None
+        if valores is None:
+            return None
+        return tuple(float(v) * 1000 for v in valores)
+
+    def taxa(self, estagio: str) -> float:
+        """Execuções por segundo do estágio na janela recente."""
+        with self._lock:
+            janela = self._latencias.get(estagio)
+            return janela.taxa() if janela else 0.0
+
+    def resumo_latencias(self) -> str:
+        """p50/p95/p99 de cada estágio em uma linha, para logs periódicos."""
+        partes = []
+        for estagio in list(self._latencias):
+            p = self.percentis_ms(estagio)
+            if p:
+                partes.append(f"{estagio} {p[0]:.1f}/{p[1]:.1f}/{p[2]:.1f}")
+        return " | ".join(partes)
+
+    def texto_prometheus(self) -> str:
+        """Todas as métricas no formato de exposição em texto do Prometheus."""
+        linhas = []
+        nome = f"{self.prefixo}_latencia_estagio_segundos"
+        with self._lock:
+            latencias = {
+                estagio: (janela.percentis(), janela.soma, janela.total, janela.taxa())
+                for estagio, janela in self._latencias.items()
+            }
+            contadores = dict(self._contadores)
+            expostos = dict(self._expostos)
+
+        if latencias:
+            linhas.append(f"# HELP {nome} Latência por estágio (quantis na janela das últimas {self.janela} execuções)")
+            linhas.append(f"# TYPE {nome} summary")
+            for estagio, (percentis, soma, total, _) in latencias.items():
+                rotulos = (('estagio', estagio),)
+                if percentis is not None:
+                    for q, valor in zip(QUANTIS, percentis):
+                        linhas.append(f"{nome}{_formatar_rotulos(rotulos + (('quantile', str(q)),))} {valor:.6f}")
+                linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {soma:.6f}")
+                linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {total}")
+
+            nome_taxa = f"{self.prefixo}_vazao_estagio_por_segundo"
+            linhas.append(f"# HELP {nome_taxa} Execuções por segundo na janela recente")
+            linhas.append(f"# TYPE {nome_taxa} gauge")
+            for estagio, (_, _, _, taxa) in latencias.items():
+                linhas.append(f"{nome_taxa}{_formatar_rotulos((('estagio', estagio),))} {taxa:.3f}")
+
+        series: Dict[str, list] = {}
+        for (metrica, rotulos), valor in contadores.items():
+            series.setdefault(metrica, ['counter', []])[1].append((rotulos, valor))
+        for (metrica, rotulos), (funcao, tipo) in expostos.items():
+            try:
+                valor = float(funcao())
+            except Exception as e:
+                # Aviso na primeira falha de cada série; as repetições ficam em debug
+                if (metrica, rotulos) not in self._falhas_avisadas:
+                    self._falhas_avisadas.add((metrica, rotulos))
+                    logger.warning(f"⚠️ Métrica {metrica} indisponível: {e}")
+                else:
+                    logger.debug(f"Métrica {metrica} indisponível: {e}")
+                continue
+            series.setdefault(metrica, [tipo, []])[1].append((rotulos, valor))
+
+        for metrica, (tipo, valores) in series.items():
+            completo = f"{self.prefixo}_{metrica}"
+            if metrica in self._ajudas:
+                linhas.append(f"# HELP {completo} {self._ajudas[metrica]}")
+            linhas.append(f"# TYPE {completo} {tipo}")
+            for rotulos, valor in valores:
+                linhas.append(f"{completo}{_formatar_rotulos(rotulos)} {valor:g}")
+
+        return "\n".join(linhas) + "\n"
+
+
+class ServidorMetricas:
+    """Endpoint HTTP mínimo (GET /metrics) em uma thread daemon."""
+
+    def __init__(self, registro: RegistroMetricas, porta: int, host: str = '127.0.0.1'):
+        self.registro = registro
+        self.porta = porta
+        self.host = host
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> bool:
+        """Sobe o servidor. Retorna False se a porta não pôde ser aberta."""
+        registro = self.registro
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                corpo = registro.texto_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE_PROMETHEUS)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass  # coletas periódicas não vão para o log
+
+        try:
+            self._servidor = ThreadingHTTPServer((self.host, self.porta), Handler)
+        except OSError as e:
+            logger.warning(f"⚠️ Endpoint de métricas indisponível em {self.host}:{self.porta}: {e}")
+            return False
+        self._servidor.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._servidor.serve_forever, name="servidor-metricas", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"📈 Métricas Prometheus em http://{self.host}:{self.porta}/metrics")
+        return True
+
+    def parar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
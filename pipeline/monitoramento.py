@@ -0,0 +1,264 @@
+"""
+Monitoramento por Câmera - IASenior
+Estado de uma câmera (contagem do quarto, pessoas no banheiro, alertas e
+controle de spam de notificações) alimentado pelas detecções pós-processadas.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .posprocessamento import DeteccoesFrame
+from .trilhas import ArmazemTrilhas
+
+logger = logging.getLogger(__name__)
+
+# Intervalos mínimos entre notificações repetidas
+INTERVALO_NOTIFICACAO_QUEDA = 300  # 5 minutos
+INTERVALO_NOTIFICACAO_BANHEIRO = 600  # 10 minutos para o mesmo track_id
+
+# Quedas separadas por menos que isto são o mesmo evento (uma linha, um clipe)
+INTERVALO_NOVA_QUEDA = 30
+
+
+class MonitorCamera:
+    """
+    Estado de monitoramento de uma câmera.
+
+    Um objeto por câmera: o stream RTSP de câmera única usa um, o motor
+    multi-câmera usa um por fonte.
+    """
+
+    def __init__(self, nome: str = "", limite_banheiro_segundos: float = 600,
+                 contagem_quarto_habilitada: bool = True,
+                 monitoramento_banheiro_habilitado: bool = True,
+                 notificacao_manager=None, tolerancia_saida_segundos: float = 0.0,
+                 max_trilhas: int = 256, gravador_clipes=None, persistencia=None):
+        """
+        Inicializa o monitor.
+
+        Args:
+            nome: Nome da câmera (prefixo dos logs)
+            limite_banheiro_segundos: Tempo no banheiro que gera alerta
+            contagem_quarto_habilitada: Se False, contagem do quarto é sempre 0
+            monitoramento_banheiro_habilitado: Se False, banheiro não é monitorado
+            notificacao_manager: Gerenciador de notificações (None = sem notificações)
+            tolerancia_saida_segundos: Tempo sem detecção até considerar que a pessoa
+                saiu do banheiro (0 = sai no primeiro frame sem ela)
+            max_trilhas: Máximo de pessoas guardadas em cada estado
+            gravador_clipes: GravadorClipes da câmera (None = sem clipes de evento)
+            persistencia: PersistenciaManager para registrar quedas (None = não registra)
+        """
+        self.nome = nome
+        self.limite_banheiro_segundos = limite_banheiro_segundos
+        self.contagem_quarto_habilitada = contagem_quarto_habilitada
+        self.monitoramento_banheiro_habilitado = monitoramento_banheiro_habilitado
+        self.notificacao_manager = notificacao_manager
+        self.gravador_clipes = gravador_clipes
+        self.persistencia = persistencia
+
+        # Pessoas atualmente no banheiro (registro.entrada = hora de entrada)
+        self.bathroom_people = ArmazemTrilhas(ttl=tolerancia_saida_segundos, max_itens=max_trilhas)
+
+        # Contador de pessoas no quarto
+        self.room_people_count = 0
+
+        # Controle de spam de notificações: a entrada só importa durante o intervalo
+        self._notificacoes_banheiro = ArmazemTrilhas(
+            ttl=INTERVALO_NOTIFICACAO_BANHEIRO, max_itens=max_trilhas
+        )
+        self._ultima_notificacao_queda = 0
+
+        # Evento de queda atual (frames consecutivos com queda formam um evento)
+        self._ultima_queda_vista = 0.0
+        self._clipe_queda: Optional[str] = None
+
+    @property
+    def _prefixo(self) -> str:
+        return f"[{self.nome}] " if self.nome else ""
+
+    def contar_pessoas_quarto(self, deteccoes: DeteccoesFrame) -> int:
+        """Conta pessoas detectadas no quarto."""
+        if not self.contagem_quarto_habilitada:
+            return 0
+
+        # Usa track_id se disponível, senão usa posição como identificador temporário
+        self.room_people_count = len(set(deteccoes.chaves(deteccoes.no_quarto)))
+        return self.room_people_count
+
+    def monitorar_banheiro(self, deteccoes: DeteccoesFrame,
+                           current_time: Optional[float] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Monitora pessoas no banheiro e detecta tempo > limite.
+
+        Returns:
+            (pessoas_banheiro_atual, alertas)
+        """
+        if not self.monitoramento_banheiro_habilitado:
+            return {}, []
+
+        try:
+            pessoas_banheiro_atual = {}
+            alertas = []
+            current_time = time.time() if current_time is None else current_time
+
+            # Primeiro, verifica pessoas detectadas no banheiro
+            for track_id in deteccoes.chaves(deteccoes.no_banheiro, prefixo="temp_"):
+                _, nova = self.bathroom_people.tocar(track_id, current_time)
+                if nova:
+                    logger.info(f"🚿 {self._prefixo}Pessoa {track_id} entrou no banheiro")
+
+            # Pessoas não vistas além da tolerância saíram do banheiro
+            for registro in self.bathroom_people.expirar(current_time):
+                tempo_no_banheiro = registro.visto - registro.entrada
+                logger.info(f"🚿 {self._prefixo}Pessoa {registro.chave} saiu do banheiro após {tempo_no_banheiro:.1f}s")
+
+            for registro in self.bathroom_people.registros():
+                pessoas_banheiro_atual[registro.chave] = registro.entrada
+
+            # Verifica alertas de tempo excedido
+            for track_id, entry_time in pessoas_banheiro_atual.items():
+                tempo_no_banheiro = current_time - entry_time
+
+                if tempo_no_banheiro > self.limite_banheiro_segundos:
+                    minutos = int(tempo_no_banheiro // 60)
+                    segundos = int(tempo_no_banheiro % 60)
+                    alerta = {
+                        'track_id': track_id,
+                        'tempo_minutos': minutos,
+                        'tempo_segundos': segundos,
+                        'timestamp': datetime.now().isoformat()
+                    }
+                    if self.nome:
+                        alerta['camera'] = self.nome
+                    clipe = self._clipe_banheiro(track_id, current_time)
+                    if clipe:
+                        alerta['clip_path'] = clipe
+                    alertas.append(alerta)
+
+                    if len(alertas) == 1:  # Log apenas uma vez por ciclo
+                        logger.warning(
+                            f"⚠️ {self._prefixo}ALERTA: Pessoa {track_id} no banheiro há {minutos}min {segundos}s "
+                            f"(limite: {int(self.limite_banheiro_segundos)//60}min)"
+                        )
+                        self._notificar_banheiro(track_id, minutos, segundos)
+
+            return pessoas_banheiro_atual, alertas
+
+        except Exception as e:
+            logger.warning(f"⚠️ {self._prefixo}Erro ao monitorar banheiro: {e}")
+            return {}, []
+
+    def _clipe_banheiro(self, track_id, agora: float) -> Optional[str]:
+        """Clipe do alerta de banheiro, disparado uma vez por permanência."""
+        registro = self.bathroom_people.obter(track_id)
+        if registro is None or self.gravador_clipes is None:
+            return None
+        if registro.clipe is None:
+            registro.clipe = self.gravador_clipes.disparar('banheiro', agora)
+        return registro.clipe
+
+    def registrar_queda(self, queda: bool, metadata: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Trata o resultado de queda de um frame: clipe, registro no banco e notificação.
+
+        Frames com queda a menos de INTERVALO_NOVA_QUEDA do anterior pertencem
+        ao mesmo evento: só o primeiro dispara o clipe e grava a linha em
+        deteccoes_queda.
+
+        Returns:
+            Caminho do clipe do evento atual (None sem queda ou sem gravador)
+        """
+        if not queda:
+            return None
+
+        agora = time.time()
+        metadata = dict(metadata or {})
+        if self.nome:
+            metadata.setdefault('camera', self.nome)
+
+        if agora - self._ultima_queda_vista > INTERVALO_NOVA_QUEDA:
+            self._clipe_queda = self.gravador_clipes.disparar('queda', agora) if self.gravador_clipes else None
+            if self._clipe_queda:
+                metadata['clip_path'] = self._clipe_queda
+            if self.persistencia:
+                # Banco fora do caminho dos frames
+                threading.Thread(
+                    target=self._persistir_queda, args=(dict(metadata), self._clipe_queda),
+                    name="persistir-queda", daemon=True
+                ).start()
+        elif self._clipe_queda:
+            metadata['clip_path'] = self._clipe_queda
+        self._ultima_queda_vista = agora
+
+        self.notificar_queda(metadata=metadata)
+        return self._clipe_queda
+
+    def _persistir_queda(self, metadata: Dict[str, Any], clip_path: Optional[str]):
+        try:
+            self.persistencia.salvar_deteccao_queda(metadata=metadata, clip_path=clip_path)
+        except Exception as e:
+            logger.error(f"❌ {self._prefixo}Erro ao registrar queda: {e}")
+
+    def _notificar_banheiro(self, track_id, minutos: int, segundos: int):
+        """Envia notificação por email, evitando spam para o mesmo track_id."""
+        if not self.notificacao_manager:
+            return
+
+        try:
+            agora = time.time()
+            # Entradas com mais de INTERVALO_NOTIFICACAO_BANHEIRO já não bloqueiam nada
+            self._notificacoes_banheiro.expirar(agora)
+
+            if track_id not in self._notificacoes_banheiro:
+                self.notificacao_manager.notificar_banheiro_tempo(
+                    track_id=track_id,
+                    tempo_minutos=minutos,
+                    tempo_segundos=segundos
+                )
+                # A entrada vence INTERVALO_NOTIFICACAO_BANHEIRO depois do envio
+                self._notificacoes_banheiro.tocar(track_id, agora)
+        except Exception as e:
+            logger.error(f"Erro ao enviar notificação de banheiro: {e}")
+
+    def notificar_queda(self, metadata: Dict[str, Any] = None):
+        """Envia notificação de queda, no máximo uma a cada 5 minutos."""
+        if not self.notificacao_manager:
+            return
+
+        try:
+            tempo_desde_ultima = time.time() - self._ultima_notificacao_queda
+            if tempo_desde_ultima > INTERVALO_NOTIFICACAO_QUEDA:
+                metadata = dict(metadata or {})
+                if self.nome:
+                    metadata.setdefault('camera', self.nome)
+                self.notificacao_manager.notificar_queda(metadata=metadata)
+                self._ultima_notificacao_queda = time.time()
+        except Exception as e:
+            logger.error(f"Erro ao enviar notificação de queda: {e}")
+
+    def status_banheiro(self, pessoas_banheiro: Dict, alertas: List[Dict],
+                        current_time: Optional[float] = None) -> Dict[str, Any]:
+        """Monta o status do banheiro no formato lido pelo painel."""
+        current_time = time.time() if current_time is None else current_time
+        status = {
+            'pessoas_no_banheiro': len(pessoas_banheiro),
+            'alertas': alertas,
+            'pessoas': []
+        }
+
+        for track_id, entry_time in pessoas_banheiro.items():
+            tempo_decorrido = current_time - entry_time
+            minutos = int(tempo_decorrido // 60)
+            segundos = int(tempo_decorrido % 60)
+
+            status['pessoas'].append({
+                'track_id': str(track_id),
+                'tempo_minutos': minutos,
+                'tempo_segundos': segundos,
+                'alerta': tempo_decorrido > self.limite_banheiro_segundos
+            })
+
+        return status
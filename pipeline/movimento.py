@@ -0,0 +1,96 @@
+"""
+Portão de Movimento - IASenior
+Diferença de frames em escala de cinza reduzida contra um fundo móvel.
+Quando a cena está parada, o modelo pode ser pulado e as últimas
+detecções reaproveitadas.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class DetectorMovimento:
+    """
+    Detector de atividade barato que fica na frente do modelo YOLO.
+
+    Cada frame é reduzido (ex.: 160 px de largura), convertido para cinza e
+    comparado com um fundo atualizado por média móvel. Se a fração de pixels
+    alterados passa do limiar, há movimento. Mesmo sem movimento, uma
+    inferência é forçada a cada `intervalo_forcado` segundos por segurança.
+    """
+
+    def __init__(self, limiar_atividade: float = 0.002, limiar_pixel: int = 25,
+                 largura: int = 160, alpha: float = 0.05, intervalo_forcado: float = 5.0):
+        """
+        Inicializa o detector.
+
+        Args:
+            limiar_atividade: Fração mínima de pixels alterados para considerar movimento
+            limiar_pixel: Diferença mínima de intensidade (0-255) para um pixel contar como alterado
+            largura: Largura da imagem reduzida usada na comparação
+            alpha: Taxa de atualização do fundo (0-1)
+            intervalo_forcado: Intervalo máximo (s) sem inferência
+        """
+        self.limiar_atividade = limiar_atividade
+        self.limiar_pixel = limiar_pixel
+        self.largura = largura
+        self.alpha = alpha
+        self.intervalo_forcado = intervalo_forcado
+
+        self._fundo: Optional[np.ndarray] = None
+        self._ultima_inferencia = 0.0
+        self.atividade = 0.0
+
+        # Estatísticas
+        self.frames_avaliados = 0
+        self.inferencias_puladas = 0
+
+    def _reduzir(self, frame: np.ndarray) -> np.ndarray:
+        """Reduz e converte o frame para cinza suavizado."""
+        altura = max(1, int(frame.shape[0] * self.largura / frame.shape[1]))
+        pequeno = cv2.resize(frame, (self.largura, altura), interpolation=cv2.INTER_AREA)
+        cinza = cv2.cvtColor(pequeno, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(cinza, (5, 5), 0)
+
+    def medir_atividade(self, frame: np.ndarray) -> float:
+        """Atualiza o fundo e retorna a fração de pixels alterados."""
+        cinza = self._reduzir(frame)
+        if self._fundo is None or self._fundo.shape != cinza.shape:
+            self._fundo = cinza.astype(np.float32)
+            self.atividade = 1.0
+            return self.atividade
+
+        diferenca = cv2.absdiff(cinza, cv2.convertScaleAbs(self._fundo))
+        self.atividade = np.count_nonzero(diferenca > self.limiar_pixel) / diferenca.size
+        cv2.accumulateWeighted(cinza, self._fundo, self.alpha)
+        return self.atividade
+
+    def deve_inferir(self, frame: np.ndarray, agora: Optional[float] = None) -> Tuple[bool, str]:
+        """
+        Decide se o modelo deve rodar neste frame.
+
+        Returns:
+            (inferir, motivo): motivo é 'movimento', 'forcado' ou 'parado'
+        """
+        agora = time.time() if agora is None else agora
+        self.frames_avaliados += 1
+
+        if self.medir_atividade(frame) >= self.limiar_atividade:
+            motivo = 'movimento'
+        elif agora - self._ultima_inferencia >= self.intervalo_forcado:
+            motivo = 'forcado'
+        else:
+            self.inferencias_puladas += 1
+            return False, 'parado'
+
+        self._ultima_inferencia = agora
+        return True, motivo
+
+    def taxa_pulos(self) -> float:
+        """Fração dos frames avaliados em que o modelo foi pulado."""
+        if not self.frames_avaliados:
+            return 0.0
+        return self.inferencias_puladas / self.frames_avaliados
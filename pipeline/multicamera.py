@@ -0,0 +1,384 @@
+"""
+Motor Multi-Câmera - IASenior
+Coleta o frame mais recente de N câmeras a cada ciclo, executa um único
+`predict` em lote e devolve cada resultado ao estado (zonas, banheiro,
+quedas) da câmera de origem.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .captura import CapturaTela
+from .leitor_rtsp import LeitorUltimoFrame
+from .cascata_queda import GatilhoCascataQueda
+from .monitoramento import MonitorCamera
+from .posprocessamento import extrair_deteccoes
+from .rastreador import RastreadorSORT
+from .zonas import TIPO_BANHEIRO, TIPO_QUARTO, MapaZonas, zonas_retangulares
+from .publicador_estado import escrever_atomico
+
+logger = logging.getLogger(__name__)
+
+
+class FonteTela:
+    """Fonte de frames a partir de um monitor (captura de tela via mss)."""
+
+    def __init__(self, monitor_idx: int, largura: int, altura: int):
+        self.monitor_idx = monitor_idx
+        self.captura = CapturaTela(monitor_idx, largura, altura)
+
+    def abrir(self):
+        """Abre a captura."""
+        self.captura.abrir()
+
+    def ler(self) -> Optional[np.ndarray]:
+        """Captura o frame atual (buffer reutilizado a cada duas leituras)."""
+        return self.captura.ler()
+
+    def fechar(self):
+        self.captura.fechar()
+
+    def __repr__(self):
+        return f"monitor:{self.monitor_idx}"
+
+
+class FonteCaptura:
+    """
+    Fonte de frames via cv2.VideoCapture (RTSP, HTTP ou arquivo).
+
+    Uma thread (LeitorUltimoFrame) lê continuamente e mantém apenas o frame
+    mais recente, para que o ciclo do motor nunca bloqueie esperando uma
+    câmera lenta.
+    """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(self, url: str, largura: int, altura: int):
+        self.url = url
+        self.largura = largura
+        self.altura = altura
+        self.leitor = LeitorUltimoFrame(
+            url, largura, altura, atraso_reconexao=self.RECONNECT_DELAY, falhas_para_reconectar=1
+        )
+        self._seq_lido = 0
+
+    def abrir(self):
+        """Inicia a thread de leitura."""
+        self.leitor.iniciar()
+
+    def ler(self) -> Optional[np.ndarray]:
+        """Retorna o frame mais recente ainda não consumido (None se não houver)."""
+        lido = self.leitor.ler(self._seq_lido, aguardar=0)
+        if lido is None:
+            return None
+        frame, self._seq_lido, _ = lido
+        return frame
+
+    def fechar(self):
+        self.leitor.parar()
+
+    def __repr__(self):
+        return self.url
+
+
+def criar_fonte(especificacao: str, largura: int, altura: int):
+    """Cria a fonte a partir de "monitor:N" ou de uma URL/arquivo."""
+    if especificacao.startswith("monitor:"):
+        return FonteTela(int(especificacao.split(":", 1)[1]), largura, altura)
+    return FonteCaptura(especificacao, largura, altura)
+
+
+def parse_cameras(texto: str) -> List[Tuple[str, str]]:
+    """
+    Interpreta a configuração de câmeras.
+
+    Formato: "nome=fonte,nome2=fonte2" (o nome é opcional; padrão camN).
+    Exemplo: "quarto1=monitor:3,quarto2=rtsp://10.0.0.5:554/stream"
+    """
+    cameras = []
+    for i, item in enumerate(p.strip() for p in texto.split(",")):
+        if not item:
+            continue
+        nome, sep, fonte = item.partition("=")
+        if not sep or "://" in nome:
+            nome, fonte = f"cam{i + 1}", item
+        cameras.append((nome.strip(), fonte.strip()))
+    return cameras
+
+
+class CameraMonitorada:
+    """Uma câmera do motor: fonte, áreas e estado de monitoramento próprios."""
+
+    def __init__(self, nome: str, fonte, largura: int, altura: int,
+                 area_quarto: Sequence[float], area_banheiro: Sequence[float],
+                 monitor: MonitorCamera, gatilho_queda: Optional[GatilhoCascataQueda] = None,
+                 zonas: Optional[MapaZonas] = None, rastreador: Optional[RastreadorSORT] = None):
+        self.nome = nome
+        self.fonte = fonte
+        self.largura = largura
+        self.altura = altura
+        self.monitor = monitor
+        self.gatilho_queda = gatilho_queda
+        self.rastreador = rastreador
+
+        # Zonas da câmera (polígonos do arquivo de zonas ou as áreas retangulares)
+        self.zonas = zonas or MapaZonas(zonas_retangulares(area_quarto, area_banheiro))
+        self.mascara_zonas = self.zonas.mascara(largura, altura)
+        self.room_area_px = self.zonas.retangulo_tipo(TIPO_QUARTO, largura, altura)
+        self.bathroom_area_px = self.zonas.retangulo_tipo(TIPO_BANHEIRO, largura, altura)
+
+        self.frames_processados = 0
+        self.ultimo_estado: Dict[str, Any] = {}
+
+
+class MotorMultiCamera:
+    """
+    Inferência em lote para várias câmeras em um único processo.
+
+    A cada ciclo o motor pega o frame mais recente de cada câmera, executa
+    `model.predict` uma única vez sobre o lote e distribui os resultados.
+    O tracking do Ultralytics (`model.track(persist=True)`) mantém um único
+    estado por modelo e não serve para lotes de câmeras diferentes, por isso
+    o motor usa `predict`; os ids vêm do RastreadorSORT de cada câmera (sem
+    rastreador, identificadores por posição).
+
+    Com um PoolInferencia, cada câmera vira uma tarefa no pool (todas
+    submetidas antes de coletar os resultados), e as inferências das câmeras
+    rodam em paralelo nos processos workers.
+    """
+
+    def __init__(self, model, cameras: List[CameraMonitorada], conf_threshold: float,
+                 classe_pessoa: int = 0, usar_area_quarto: bool = False,
+                 tamanho_lote: int = 8, detector_queda=None,
+                 queda_habilitada: bool = True, status_path: Optional[Path] = None,
+                 pool=None):
+        """
+        Inicializa o motor.
+
+        Args:
+            model: Modelo YOLO carregado (None com pool)
+            cameras: Câmeras monitoradas
+            conf_threshold: Confiança mínima
+            classe_pessoa: Id da classe pessoa
+            usar_area_quarto: Se False, toda pessoa conta como no quarto
+            tamanho_lote: Máximo de frames por chamada de predict
+            detector_queda: DetectorQuedaCustomizado opcional (segundo estágio)
+            queda_habilitada: Se False, não detecta quedas
+            status_path: Arquivo JSON com o status de todas as câmeras
+            pool: PoolInferencia opcional (inferência em processos workers)
+        """
+        self.model = model
+        self.cameras = cameras
+        self.conf_threshold = conf_threshold
+        self.classe_pessoa = classe_pessoa
+        self.usar_area_quarto = usar_area_quarto
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.detector_queda = detector_queda
+        self.queda_habilitada = queda_habilitada
+        self.status_path = status_path
+        self.pool = pool
+
+        self.running = False
+        self.ciclos = 0
+        self.frames_inferidos = 0
+        self.tempo_inferencia = 0.0
+        self._ultimo_status_salvo = 0.0
+
+    def abrir(self):
+        """Abre todas as fontes."""
+        for camera in self.cameras:
+            camera.fonte.abrir()
+            logger.info(f"📺 Câmera '{camera.nome}' aberta: {camera.fonte}")
+
+    def fechar(self):
+        """Fecha todas as fontes e grava os clipes de evento pendentes."""
+        for camera in self.cameras:
+            try:
+                camera.fonte.fechar()
+            except Exception as e:
+                logger.error(f"❌ Erro ao fechar câmera '{camera.nome}': {e}")
+            if camera.monitor.gravador_clipes:
+                camera.monitor.gravador_clipes.parar()
+
+    def coletar(self) -> List[Tuple[CameraMonitorada, np.ndarray]]:
+        """Coleta o frame mais recente de cada câmera (ignora as sem frame novo)."""
+        lote = []
+        for camera in self.cameras:
+            try:
+                frame = camera.fonte.ler()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao ler câmera '{camera.nome}': {e}")
+                continue
+            if frame is not None:
+                lote.append((camera, frame))
+        return lote
+
+    def detectar_queda(self, camera: CameraMonitorada, deteccoes, frame) -> bool:
+        """Heurística de queda, confirmada pelo segundo estágio quando disponível."""
+        if not self.queda_habilitada:
+            return False
+
+        if self.detector_queda and camera.gatilho_queda:
+            motivo, candidatos = camera.gatilho_queda.avaliar(deteccoes)
+            if motivo is not None:
+                try:
+                    tem_queda, _ = self.detector_queda.detectar_recortes(frame, deteccoes.xyxy[candidatos])
+                    if tem_queda:
+                        return True
+                except Exception as e:
+                    logger.warning(f"⚠️ [{camera.nome}] Erro no detector customizado: {e}")
+
+        return bool(deteccoes.candidatos_queda.any())
+
+    def processar_resultado(self, camera: CameraMonitorada, result, frame) -> Dict[str, Any]:
+        """Aplica pós-processamento e monitoramento ao resultado de uma câmera."""
+        deteccoes = extrair_deteccoes(
+            [result],
+            altura_frame=camera.altura,
+            classe_pessoa=self.classe_pessoa,
+            conf_threshold=self.conf_threshold,
+            usar_area_quarto=self.usar_area_quarto,
+            usar_tracking=False,
+            zonas=camera.mascara_zonas,
+            rastreador=camera.rastreador
+        )
+
+        gravador = camera.monitor.gravador_clipes
+        if gravador:
+            gravador.adicionar(frame)
+
+        queda = self.detectar_queda(camera, deteccoes, frame)
+        camera.monitor.registrar_queda(queda, metadata={'frame_count': camera.frames_processados})
+
+        contagem_quarto = camera.monitor.contar_pessoas_quarto(deteccoes)
+        pessoas_banheiro, alertas = camera.monitor.monitorar_banheiro(deteccoes)
+
+        camera.frames_processados += 1
+        camera.ultimo_estado = {
+            'status': "queda" if queda else "ok",
+            'contagem_quarto': contagem_quarto,
+            'status_banheiro': camera.monitor.status_banheiro(pessoas_banheiro, alertas),
+            'frames_processados': camera.frames_processados,
+            'timestamp': time.time()
+        }
+        return camera.ultimo_estado
+
+    def tick(self) -> int:
+        """
+        Executa um ciclo: coleta, inferência em lote e distribuição.
+
+        Returns:
+            Número de frames inferidos neste ciclo
+        """
+        lote = self.coletar()
+        if self.pool:
+            self._inferir_no_pool(lote)
+            self.ciclos += 1
+            self.frames_inferidos += len(lote)
+            return len(lote)
+
+        for inicio in range(0, len(lote), self.tamanho_lote):
+            parte = lote[inicio:inicio + self.tamanho_lote]
+
+            t0 = time.perf_counter()
+            results = self.model.predict(
+                [frame for _, frame in parte],
+                conf=self.conf_threshold,
+                verbose=False
+            )
+            self.tempo_inferencia += time.perf_counter() - t0
+
+            for (camera, frame), result in zip(parte, results):
+                try:
+                    self.processar_resultado(camera, result, frame)
+                except Exception as e:
+                    logger.error(f"❌ [{camera.nome}] Erro ao processar resultado: {e}", exc_info=True)
+
+        self.ciclos += 1
+        self.frames_inferidos += len(lote)
+        return len(lote)
+
+    def _inferir_no_pool(self, lote: List[Tuple[CameraMonitorada, np.ndarray]]):
+        """Submete todas as câmeras ao pool e processa os resultados na ordem do lote."""
+        t0 = time.perf_counter()
+        pendentes = []
+        for camera, frame in lote:
+            try:
+                futuro = self.pool.submeter(frame, chave=camera.nome, conf=self.conf_threshold)
+            except Exception as e:
+                logger.warning(f"⚠️ [{camera.nome}] Erro ao enviar frame ao pool: {e}")
+                continue
+            pendentes.append((camera, frame, futuro))
+
+        for camera, frame, futuro in pendentes:
+            try:
+                result = futuro.result(timeout=self.pool.tempo_limite * 2)[0]
+            except Exception as e:
+                logger.warning(f"⚠️ [{camera.nome}] Inferência falhou: {e}")
+                continue
+            try:
+                self.processar_resultado(camera, result, frame)
+            except Exception as e:
+                logger.error(f"❌ [{camera.nome}] Erro ao processar resultado: {e}", exc_info=True)
+        self.tempo_inferencia += time.perf_counter() - t0
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Último estado de cada câmera, indexado pelo nome."""
+        return {camera.nome: camera.ultimo_estado for camera in self.cameras}
+
+    def salvar_status(self, intervalo: float = 1.0):
+        """Salva o status de todas as câmeras no máximo uma vez por intervalo."""
+        if not self.status_path or time.time() - self._ultimo_status_salvo < intervalo:
+            return
+        try:
+            escrever_atomico(
+                self.status_path,
+                json.dumps(self.status(), ensure_ascii=False, default=str).encode('utf-8')
+            )
+            self._ultimo_status_salvo = time.time()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar status das câmeras: {e}")
+
+    def executar(self, fps: float):
+        """Loop principal do motor."""
+        self.abrir()
+        self.running = True
+        frame_time = 1.0 / fps
+        inicio = time.time()
+        ultimo_log = inicio
+
+        logger.info(f"🚀 Motor multi-câmera iniciado: {len(self.cameras)} câmeras @ {fps}fps")
+        try:
+            while self.running:
+                loop_start = time.time()
+                self.tick()
+                self.salvar_status()
+
+                # Log periódico
+                if time.time() - ultimo_log >= 5:
+                    ultimo_log = time.time()
+                    decorrido = ultimo_log - inicio
+                    media_ms = (self.tempo_inferencia / self.ciclos * 1000) if self.ciclos else 0
+                    resumo = " | ".join(
+                        f"{c.nome}: {c.ultimo_estado.get('status', '-')}/"
+                        f"{c.ultimo_estado.get('contagem_quarto', 0)}p"
+                        for c in self.cameras
+                    )
+                    logger.info(
+                        f"✅ {self.frames_inferidos} frames | "
+                        f"{self.frames_inferidos / decorrido:.1f} frames/s no total | "
+                        f"inferência média por lote: {media_ms:.0f}ms | {resumo}"
+                    )
+
+                # Controlar FPS
+                sleep_time = frame_time - (time.time() - loop_start)
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+        finally:
+            self.running = False
+            self.fechar()
@@ -0,0 +1,205 @@
+"""
+Renderização de Overlay em Camadas - IASenior
+Substitui `results[0].plot()` + desenho das áreas a cada frame por:
+- camadas estáticas (zonas, rótulos, contadores) pré-desenhadas e guardadas
+  como pixels esparsos, refeitas só quando o conteúdo muda;
+- uma camada dinâmica mínima com as caixas de pessoas e de quedas.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+COR_QUARTO = (0, 255, 0)
+COR_BANHEIRO = (255, 0, 0)
+COR_PESSOA = (0, 200, 255)
+COR_QUEDA = (0, 0, 255)
+FONTE = cv2.FONT_HERSHEY_SIMPLEX
+
+# (x1, y1, x2, y2) ou polígono [(x, y), ...] em pixels, rótulo, cor
+Zona = Tuple[Sequence, str, Tuple[int, int, int]]
+# texto, (x, y), escala, cor, espessura
+Texto = Tuple[str, Tuple[int, int], float, Tuple[int, int, int], int]
+
+
+class CamadaEstatica:
+    """
+    Camada pré-desenhada guardada como índices dos pixels pintados + cores.
+
+    Aplicar a camada custa proporcional aos pixels desenhados (contornos e
+    texto), não ao tamanho do frame.
+    """
+
+    def __init__(self, largura: int, altura: int):
+        self.largura = largura
+        self.altura = altura
+        self.chave = None
+        self._desenhar = None
+        self._linhas = None
+        self.indices = np.zeros(0, dtype=np.intp)
+        self.cores = np.zeros((0, 3), dtype=np.uint8)
+
+    def reconstruir(self, chave, desenhar, linhas: Optional[int] = None):
+        """
+        Redesenha a camada com `desenhar(canvas)` se a chave mudou.
+
+        `linhas` limita o canvas às primeiras linhas do frame (ex.: textos no
+        topo), deixando a reconstrução proporcional à faixa usada.
+        """
+        if chave == self.chave:
+            return
+        self._desenhar = desenhar
+        self._linhas = linhas
+        linhas = self.altura if linhas is None else min(linhas, self.altura)
+        canvas = np.zeros((linhas, self.largura, 3), dtype=np.uint8)
+        desenhar(canvas)
+        pintados = canvas.reshape(-1, 3).any(axis=1)
+        self.indices = np.flatnonzero(pintados)
+        self.cores = canvas.reshape(-1, 3)[self.indices]
+        self.chave = chave
+
+    def aplicar(self, frame: np.ndarray):
+        """Copia os pixels da camada para o frame (contíguo)."""
+        if frame.shape[:2] != (self.altura, self.largura) and self._desenhar is not None:
+            # Frame de outro tamanho (ex.: stream com resolução diferente)
+            self.altura, self.largura = frame.shape[:2]
+            chave, self.chave = self.chave, None
+            self.reconstruir(chave, self._desenhar, self._linhas)
+        if len(self.indices):
+            frame.reshape(-1, 3)[self.indices] = self.cores
+
+
+class RenderizadorOverlay:
+    """
+    Desenha zonas, contadores e caixas sobre os frames.
+
+    Com `num_buffers > 0`, o frame é copiado para um anel de buffers próprios
+    antes do desenho (o frame de entrada não é alterado); cada saída continua
+    válida até `num_buffers - 1` renderizações depois. Com `num_buffers=0`, o
+    desenho é feito no próprio frame de entrada.
+    """
+
+    def __init__(self, largura: int, altura: int, num_buffers: int = 0):
+        """
+        Inicializa o renderizador.
+
+        Args:
+            largura: Largura dos frames
+            altura: Altura dos frames
+            num_buffers: Buffers de saída no anel (0 = desenhar no frame de entrada)
+        """
+        self.largura = largura
+        self.altura = altura
+        self.camada_zonas = CamadaEstatica(largura, altura)
+        self.camada_textos = CamadaEstatica(largura, altura)
+        self._buffers = [
+            np.empty((altura, largura, 3), dtype=np.uint8) for _ in range(num_buffers)
+        ]
+        self._indice = 0
+
+        # Estatísticas
+        self.frames_renderizados = 0
+
+    def definir_zonas(self, zonas: Sequence[Zona]):
+        """Define as zonas (retângulos ou polígonos) desenhadas; a camada só é refeita se mudarem."""
+        normalizadas = []
+        for area, rotulo, cor in zonas:
+            pontos = np.asarray(area, dtype=np.int32)
+            if pontos.ndim == 1:
+                x1, y1, x2, y2 = pontos
+                pontos = np.array([(x1, y1), (x2, y1), (x2, y2), (x1, y2)], dtype=np.int32)
+            normalizadas.append((tuple(map(tuple, pontos.reshape(-1, 2).tolist())), rotulo, tuple(cor)))
+        zonas = tuple(normalizadas)
+
+        def desenhar(canvas):
+            for pontos, rotulo, cor in zonas:
+                poligono = np.array(pontos, dtype=np.int32)
+                cv2.polylines(canvas, [poligono], True, cor, 2)
+                # Rótulo junto ao vértice mais acima (à esquerda, em empate)
+                x, y = min(pontos, key=lambda p: (p[1], p[0]))
+                cv2.putText(canvas, rotulo, (x + 5, y + 25), FONTE, 0.7, cor, 2)
+
+        self.camada_zonas.reconstruir(zonas, desenhar)
+
+    def definir_textos(self, textos: Sequence[Texto]):
+        """Define os textos fixos do frame (contadores, alertas); refeitos só se mudarem."""
+        textos = tuple(textos)
+
+        def desenhar(canvas):
+            for texto, posicao, escala, cor, espessura in textos:
+                cv2.putText(canvas, texto, posicao, FONTE, escala, cor, espessura)
+
+        # Textos ficam no topo: basta uma faixa um pouco abaixo da última linha
+        linhas = max((posicao[1] for _, posicao, _, _, _ in textos), default=0) + 20
+        self.camada_textos.reconstruir(textos, desenhar, linhas)
+
+    def _saida(self, frame: np.ndarray) -> np.ndarray:
+        if not self._buffers:
+            return frame
+        saida = self._buffers[self._indice]
+        if saida.shape != frame.shape:
+            saida = self._buffers[self._indice] = np.empty_like(frame)
+        self._indice = (self._indice + 1) % len(self._buffers)
+        np.copyto(saida, frame)
+        return saida
+
+    def renderizar(self, frame: np.ndarray, pessoas: Optional[np.ndarray] = None,
+                   ids: Optional[np.ndarray] = None,
+                   quedas: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Desenha as camadas e as caixas sobre o frame.
+
+        Args:
+            frame: Frame BGR
+            pessoas: (N, 4) caixas de pessoas em pixels
+            ids: (N,) ids de tracking (-1 = sem id)
+            quedas: (M, 4) caixas de quedas em pixels
+
+        Returns:
+            Frame anotado
+        """
+        saida = self._saida(frame)
+        self.camada_zonas.aplicar(saida)
+
+        if pessoas is not None:
+            for i, (x1, y1, x2, y2) in enumerate(pessoas.astype(int)):
+                cv2.rectangle(saida, (x1, y1), (x2, y2), COR_PESSOA, 2)
+                if ids is not None and ids[i] >= 0:
+                    cv2.putText(saida, f"id {int(ids[i])}", (x1, max(y1 - 5, 12)),
+                                FONTE, 0.5, COR_PESSOA, 1)
+
+        if quedas is not None and len(quedas):
+            for x1, y1, x2, y2 in np.asarray(quedas).astype(int):
+                cv2.rectangle(saida, (x1, y1), (x2, y2), COR_QUEDA, 3)
+
+        self.camada_textos.aplicar(saida)
+        self.frames_renderizados += 1
+        return saida
+
+
+def zonas_padrao(area_quarto: Optional[Tuple[int, int, int, int]],
+                 area_banheiro: Optional[Tuple[int, int, int, int]]) -> list:
+    """Zonas quarto/banheiro com os rótulos e cores usados em todo o sistema."""
+    zonas = []
+    if area_quarto is not None:
+        zonas.append((area_quarto, "Quarto", COR_QUARTO))
+    if area_banheiro is not None:
+        zonas.append((area_banheiro, "Banheiro", COR_BANHEIRO))
+    return zonas
+
+
+def textos_contadores(pessoas_quarto: int, pessoas_banheiro: int, alertas_banheiro: int = 0,
+                      limite_banheiro_minutos: int = 0, queda: bool = False) -> list:
+    """Textos de contadores, alertas do banheiro e aviso de queda."""
+    textos = [
+        (f"Pessoas no Quarto: {pessoas_quarto}", (10, 30), 0.7, COR_QUARTO, 2),
+        (f"Pessoas no Banheiro: {pessoas_banheiro}", (10, 60), 0.7, COR_BANHEIRO, 2),
+    ]
+    y = 90
+    for _ in range(alertas_banheiro):
+        textos.append((f"ALERTA: Pessoa no banheiro > {limite_banheiro_minutos}min!", (10, y), 0.7, COR_QUEDA, 2))
+        y += 30
+    if queda:
+        textos.append(("QUEDA DETECTADA!", (10, y), 1.0, COR_QUEDA, 3))
+    return textos
@@ -0,0 +1,407 @@
+"""
+Pool de Processos de Inferência - IASenior
+Roda o modelo YOLO em processos dedicados, fora do GIL do processo principal
+(captura, desenho, Flask). Os frames são entregues por memória compartilhada
+(um slot por frame em voo) e só as caixas voltam pela fila de resultados.
+
+Cada worker limita as threads do PyTorch/OpenMP (`torch.set_num_threads`),
+para que N workers dividam os núcleos em vez de disputá-los. Um supervisor
+reinicia workers que morrerem ou travarem, falhando as tarefas que estavam
+com eles.
+
+O tracking do Ultralytics guarda estado no modelo: frames de uma mesma
+`chave` (câmera) vão sempre para o mesmo worker, que mantém um modelo de
+tracking por chave.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CaixasLeves:
+    """Subconjunto de `Results.boxes` lido pelo pós-processamento (só `data`)."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class ResultadoLeve:
+    """Resultado de inferência vindo de um worker, compatível com extrair_deteccoes."""
+
+    __slots__ = ('boxes', 'duracao')
+
+    def __init__(self, data: np.ndarray, duracao: float = 0.0):
+        self.boxes = CaixasLeves(data)
+        self.duracao = duracao
+
+
+def _loop_worker(indice: int, modelo_path: str, backend: Optional[str], imgsz: Optional[int],
+                 threads: int, nome_shm: str, tamanho_slot: int, tarefas, resultados):
+    """Processo worker: carrega o modelo e atende tarefas até receber None."""
+    # Antes de qualquer import pesado: limita OpenMP/BLAS deste processo
+    for variavel in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[variavel] = str(threads)
+
+    import cv2
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    from .backends import carregar_modelo
+
+    # Workers criados por spawn compartilham o resource_tracker do processo
+    # principal, que é quem remove o bloco em parar(): anexar normalmente
+    shm = shared_memory.SharedMemory(name=nome_shm, create=False)
+    try:
+        modelo = carregar_modelo(modelo_path, backend=backend, imgsz=imgsz)
+        # Estado de tracking por chave. A primeira chave adota o modelo já
+        # carregado; só chaves seguintes (ou um predict depois disso) carregam
+        # outra cópia dos pesos. No uso normal o worker só rastreia (stream) ou
+        # só prediz (multi-câmera): uma cópia por worker
+        modelos_tracking: Dict[str, Any] = {}
+        # Aquecimento: a primeira chamada aloca buffers e compila kernels
+        modelo.predict(np.zeros((64, 64, 3), dtype=np.uint8), imgsz=imgsz or 640, verbose=False)
+        resultados.put(('pronto', indice, os.getpid()))
+
+        while True:
+            tarefa = tarefas.get()
+            if tarefa is None:
+                break
+            id_tarefa, slot, forma, chave, rastrear, kwargs = tarefa
+            inicio = time.perf_counter()
+            try:
+                frame = np.ndarray(forma, dtype=np.uint8, buffer=shm.buf, offset=slot * tamanho_slot)
+                if rastrear:
+                    modelo_chave = modelos_tracking.get(chave)
+                    if modelo_chave is None:
+                        if modelo is not None:
+                            modelo_chave, modelo = modelo, None
+                        else:
+                            modelo_chave = carregar_modelo(modelo_path, backend=backend, imgsz=imgsz)
+                        modelos_tracking[chave] = modelo_chave
+                    saida = modelo_chave.track(frame, persist=True, verbose=False, **kwargs)
+                else:
+                    if modelo is None:
+                        # O modelo original virou de tracking: predict não pode mexer no estado dele
+                        modelo = carregar_modelo(modelo_path, backend=backend, imgsz=imgsz)
+                    saida = modelo.predict(frame, verbose=False, **kwargs)
+                del frame
+
+                blocos = []
+                for result in saida:
+                    boxes = result.boxes
+                    if boxes is None or len(boxes) == 0:
+                        continue
+                    data = boxes.data
+                    blocos.append(data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data))
+                if blocos:
+                    dados = np.concatenate(blocos).astype(np.float32)
+                else:
+                    dados = np.zeros((0, 7 if rastrear else 6), dtype=np.float32)
+                resultados.put(('ok', id_tarefa, dados, time.perf_counter() - inicio))
+            except Exception as e:
+                resultados.put(('erro', id_tarefa, repr(e), time.perf_counter() - inicio))
+    finally:
+        shm.close()
+
+
+class _Worker:
+    """Estado de um worker no processo principal."""
+
+    def __init__(self, indice: int):
+        self.indice = indice
+        self.processo: Optional[mp.Process] = None
+        self.tarefas = None
+        self.pronto = threading.Event()
+        self.pendentes: Dict[int, float] = {}  # id_tarefa -> instante de envio
+        self.reinicios = 0
+        self.proxima_tentativa = 0.0
+
+
+class PoolInferencia:
+    """
+    Pool de processos de inferência com supervisor.
+
+    `submeter()` copia o frame para um slot livre da memória compartilhada e
+    devolve um Future com a lista de ResultadoLeve; `inferir()` é a versão
+    bloqueante, com a mesma interface de retorno de `model.predict/track`.
+    """
+
+    def __init__(self, modelo_path: str, num_workers: int = 2, threads_por_worker: int = 2,
+                 largura_max: int = 1920, altura_max: int = 1080, backend: Optional[str] = None,
+                 imgsz: Optional[int] = None, slots_por_worker: int = 2,
+                 tempo_limite: float = 30.0, tempo_inicio: float = 120.0):
+        """
+        Inicializa o pool (os processos só sobem em `iniciar()`).
+
+        Args:
+            modelo_path: Caminho dos pesos do modelo
+            num_workers: Processos de inferência
+            threads_por_worker: Threads do PyTorch/OpenMP em cada worker
+            largura_max: Largura máxima dos frames enviados
+            altura_max: Altura máxima dos frames enviados
+            backend: Backend de inferência (None = INFERENCE_BACKEND)
+            imgsz: Tamanho de entrada da inferência
+            slots_por_worker: Frames em voo por worker
+            tempo_limite: Segundos de uma tarefa até o worker ser considerado travado
+            tempo_inicio: Segundos para o worker carregar o modelo
+        """
+        self.modelo_path = str(modelo_path)
+        self.backend = backend
+        self.imgsz = imgsz
+        self.threads_por_worker = max(1, threads_por_worker)
+        self.tempo_limite = tempo_limite
+        self.tempo_inicio = tempo_inicio
+
+        self.tamanho_slot = largura_max * altura_max * 3
+        self.num_slots = max(1, num_workers) * max(1, slots_por_worker)
+        self._contexto = mp.get_context('spawn')  # fork herdaria threads/estado do PyTorch
+        self.shm: Optional[shared_memory.SharedMemory] = None
+
+        self.workers = [_Worker(i) for i in range(max(1, num_workers))]
+        self._resultados = self._contexto.Queue()
+        self._slots_livres: List[int] = list(range(self.num_slots))
+        self._slots_disponiveis = threading.Semaphore(self.num_slots)
+        self._lock = threading.Lock()
+        self._futuros: Dict[int, Tuple[Future, int, int]] = {}  # id -> (future, slot, worker)
+        self._proximo_id = 0
+        self._proximo_worker = 0
+        self._parar = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        # Estatísticas
+        self.tarefas_concluidas = 0
+        self.tarefas_com_erro = 0
+
+    # ---------------------------------------------------------------- ciclo de vida
+
+    def iniciar(self, aguardar: bool = True):
+        """Cria a memória compartilhada, sobe os workers e o supervisor."""
+        self.shm = shared_memory.SharedMemory(create=True, size=self.num_slots * self.tamanho_slot)
+        for worker in self.workers:
+            self._iniciar_worker(worker)
+
+        self._parar.clear()
+        for nome, alvo in (("pool-resultados", self._loop_resultados),
+                           ("pool-supervisor", self._loop_supervisor)):
+            thread = threading.Thread(target=alvo, name=nome, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(
+            f"🧵 Pool de inferência: {len(self.workers)} workers x "
+            f"{self.threads_por_worker} threads, {self.num_slots} slots"
+        )
+        if aguardar:
+            limite = time.time() + self.tempo_inicio
+            for worker in self.workers:
+                if not worker.pronto.wait(max(0.0, limite - time.time())):
+                    logger.warning(f"⚠️ Worker {worker.indice} ainda não carregou o modelo")
+
+    def _iniciar_worker(self, worker: _Worker):
+        worker.pronto.clear()
+        worker.tarefas = self._contexto.Queue()
+        worker.processo = self._contexto.Process(
+            target=_loop_worker,
+            args=(worker.indice, self.modelo_path, self.backend, self.imgsz,
+                  self.threads_por_worker, self.shm.name, self.tamanho_slot,
+                  worker.tarefas, self._resultados),
+            name=f"inferencia-{worker.indice}",
+            daemon=True
+        )
+        worker.processo.start()
+
+    def parar(self):
+        """Encerra workers, threads auxiliares e a memória compartilhada."""
+        self._parar.set()
+        for worker in self.workers:
+            try:
+                worker.tarefas.put(None)
+            except Exception:
+                pass
+        for worker in self.workers:
+            if worker.processo is not None:
+                worker.processo.join(timeout=5)
+                if worker.processo.is_alive():
+                    worker.processo.kill()
+                    worker.processo.join()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+        with self._lock:
+            futuros, self._futuros = self._futuros, {}
+        for futuro, _, _ in futuros.values():
+            futuro.set_exception(RuntimeError("Pool de inferência encerrado"))
+
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        logger.info("✅ Pool de inferência encerrado.")
+
+    # ---------------------------------------------------------------- tarefas
+
+    def _escolher_worker(self, chave: Optional[str]) -> _Worker:
+        if chave:
+            # Afinidade estável: a mesma câmera sempre no mesmo worker
+            return self.workers[zlib.crc32(chave.encode()) % len(self.workers)]
+        with self._lock:
+            vivos = [w for w in self.workers if w.pronto.is_set()] or self.workers
+            worker = min(vivos, key=lambda w: (len(w.pendentes), (w.indice - self._proximo_worker) % len(self.workers)))
+            self._proximo_worker = (worker.indice + 1) % len(self.workers)
+        return worker
+
+    def submeter(self, frame: np.ndarray, chave: Optional[str] = None, rastrear: bool = False,
+                 timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Envia um frame para inferência.
+
+        Args:
+            frame: Frame BGR (uint8, até largura_max x altura_max)
+            chave: Câmera/fluxo do frame (afinidade de worker; obrigatória com tracking)
+            rastrear: Usar model.track(persist=True) em vez de predict
+            timeout: Espera máxima por um slot livre (None = sem limite)
+            **kwargs: Repassados a predict/track (conf, imgsz, ...)
+
+        Returns:
+            Future com a lista de ResultadoLeve
+        """
+        if frame.dtype != np.uint8 or frame.nbytes > self.tamanho_slot:
+            raise ValueError(f"Frame {frame.shape}/{frame.dtype} não cabe no slot do pool")
+        if not self._slots_disponiveis.acquire(timeout=timeout):
+            raise TimeoutError("Nenhum slot livre no pool de inferência")
+
+        with self._lock:
+            slot = self._slots_livres.pop()
+            id_tarefa = self._proximo_id
+            self._proximo_id += 1
+
+        destino = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf,
+                             offset=slot * self.tamanho_slot)
+        np.copyto(destino, frame)
+        del destino
+
+        worker = self._escolher_worker(chave if rastrear else None)
+        futuro: Future = Future()
+        with self._lock:
+            self._futuros[id_tarefa] = (futuro, slot, worker.indice)
+            worker.pendentes[id_tarefa] = time.time()
+        worker.tarefas.put((id_tarefa, slot, frame.shape, chave or '', rastrear, kwargs))
+        return futuro
+
+    def inferir(self, frame: np.ndarray, chave: Optional[str] = None, rastrear: bool = False,
+                timeout: Optional[float] = None, **kwargs) -> List[ResultadoLeve]:
+        """Versão bloqueante de `submeter()`."""
+        return self.submeter(frame, chave=chave, rastrear=rastrear, **kwargs).result(
+            timeout=timeout if timeout is not None else self.tempo_limite * 2
+        )
+
+    def _concluir(self, id_tarefa: int) -> Optional[Future]:
+        """Libera o slot e os registros da tarefa. Retorna o Future (None se já concluída)."""
+        with self._lock:
+            registro = self._futuros.pop(id_tarefa, None)
+            if registro is None:
+                return None
+            futuro, slot, indice = registro
+            self.workers[indice].pendentes.pop(id_tarefa, None)
+            self._slots_livres.append(slot)
+        self._slots_disponiveis.release()
+        return futuro
+
+    def _loop_resultados(self):
+        while not self._parar.is_set():
+            try:
+                mensagem = self._resultados.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            tipo = mensagem[0]
+            if tipo == 'pronto':
+                _, indice, pid = mensagem
+                self.workers[indice].pronto.set()
+                logger.info(f"✅ Worker de inferência {indice} pronto (pid {pid})")
+                continue
+
+            _, id_tarefa, carga, duracao = mensagem
+            futuro = self._concluir(id_tarefa)
+            if futuro is None:
+                continue  # tarefa já falhada pelo supervisor
+            if tipo == 'ok':
+                self.tarefas_concluidas += 1
+                futuro.set_result([ResultadoLeve(carga, duracao)])
+            else:
+                self.tarefas_com_erro += 1
+                futuro.set_exception(RuntimeError(f"Erro no worker de inferência: {carga}"))
+
+    def _falhar_pendentes(self, worker: _Worker, motivo: str):
+        for id_tarefa in list(worker.pendentes):
+            futuro = self._concluir(id_tarefa)
+            if futuro is not None:
+                self.tarefas_com_erro += 1
+                futuro.set_exception(RuntimeError(motivo))
+
+    def _loop_supervisor(self):
+        while not self._parar.wait(1.0):
+            agora = time.time()
+            for worker in self.workers:
+                processo = worker.processo
+                travado = worker.pronto.is_set() and any(
+                    agora - enviado > self.tempo_limite for enviado in list(worker.pendentes.values())
+                )
+                if processo is not None and processo.is_alive() and not travado:
+                    continue
+
+                if processo is not None:
+                    if travado:
+                        logger.error(f"❌ Worker de inferência {worker.indice} travado. Encerrando...")
+                        processo.kill()
+                    processo.join(timeout=5)
+                    logger.error(
+                        f"❌ Worker de inferência {worker.indice} encerrou (código {processo.exitcode})"
+                    )
+                    worker.processo = None
+                    worker.pronto.clear()
+                    self._falhar_pendentes(worker, f"Worker {worker.indice} reiniciado")
+                    # Espera crescente entre reinícios seguidos
+                    worker.proxima_tentativa = agora + min(2 ** worker.reinicios, 60)
+
+                if agora >= worker.proxima_tentativa:
+                    worker.reinicios += 1
+                    logger.info(f"🔄 Reiniciando worker de inferência {worker.indice} (reinício {worker.reinicios})")
+                    self._iniciar_worker(worker)
+
+    # ---------------------------------------------------------------- estado
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores do pool."""
+        return {
+            'workers_prontos': sum(w.pronto.is_set() for w in self.workers),
+            'em_voo': len(self._futuros),
+            'concluidas': self.tarefas_concluidas,
+            'erros': self.tarefas_com_erro,
+            'reinicios': sum(w.reinicios for w in self.workers),
+        }
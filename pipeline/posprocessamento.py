@@ -0,0 +1,215 @@
+"""
+Pós-processamento Vetorizado de Detecções - IASenior
+Extrai as caixas de um resultado YOLO em um único array NumPy por frame e
+calcula, com operações vetorizadas, tudo o que os consumidores precisam
+(filtro de pessoas, zonas, proporções e candidatos a queda).
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .zonas import TIPO_BANHEIRO, TIPO_QUARTO, MascaraZonas
+
+# Proporção altura/largura abaixo da qual a pessoa é considerada deitada
+PROPORCAO_QUEDA = 0.7
+
+# Colunas do array de detecções
+COL_X1, COL_Y1, COL_X2, COL_Y2, COL_CONF, COL_CLS = range(6)
+
+
+def _mascara_area(centros: np.ndarray, area: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+    """Retorna a máscara dos centros dentro de uma área retangular (x1, y1, x2, y2)."""
+    if area is None:
+        return np.zeros(len(centros), dtype=bool)
+    x1, y1, x2, y2 = area
+    return (
+        (centros[:, 0] >= x1) & (centros[:, 0] <= x2) &
+        (centros[:, 1] >= y1) & (centros[:, 1] <= y2)
+    )
+
+
+class DeteccoesFrame:
+    """
+    Detecções de pessoas de um frame, já filtradas e com atributos derivados.
+
+    Todos os atributos são arrays alinhados (uma linha por pessoa detectada):
+    - xyxy: (N, 4) caixas em pixels
+    - conf: (N,) confiança
+    - ids: (N,) id de tracking (-1 quando não há tracking)
+    - centros: (N, 2) centro das caixas
+    - proporcoes: (N,) altura/largura (inf quando largura == 0)
+    - no_quarto / no_banheiro: (N,) pertencimento às áreas
+    - bits_zonas: (N,) zonas poligonais que contêm cada centro (um bit por zona)
+    - candidatos_queda: (N,) pessoas deitadas na metade inferior do frame
+    """
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, ids: np.ndarray,
+                 altura_frame: int, area_quarto=None, area_banheiro=None,
+                 usar_area_quarto: bool = False, zonas: Optional[MascaraZonas] = None):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.ids = ids
+        self.altura_frame = altura_frame
+        self.area_quarto = area_quarto
+        self.area_banheiro = area_banheiro
+        self.usar_area_quarto = usar_area_quarto
+
+        larguras = xyxy[:, 2] - xyxy[:, 0]
+        alturas = xyxy[:, 3] - xyxy[:, 1]
+        self.centros = np.stack(
+            [(xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2], axis=1
+        ) if len(xyxy) else np.zeros((0, 2), dtype=np.float32)
+        self.alturas = alturas
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.proporcoes = np.where(larguras > 0, alturas / larguras, np.inf)
+
+        # Pertencimento às áreas: com zonas poligonais, uma indexação na máscara
+        # rasterizada responde todas as zonas de uma vez
+        self.zonas = zonas
+        if zonas is not None:
+            self.bits_zonas = zonas.bits_em(self.centros)
+            if usar_area_quarto:
+                self.no_quarto = zonas.contem(self.bits_zonas, TIPO_QUARTO)
+            else:
+                self.no_quarto = np.ones(len(xyxy), dtype=bool)
+            self.no_banheiro = zonas.contem(self.bits_zonas, TIPO_BANHEIRO)
+        else:
+            self.bits_zonas = np.zeros(len(xyxy), dtype=np.uint8)
+            if usar_area_quarto:
+                self.no_quarto = _mascara_area(self.centros, area_quarto)
+            else:
+                self.no_quarto = np.ones(len(xyxy), dtype=bool)
+            self.no_banheiro = _mascara_area(self.centros, area_banheiro)
+
+        # Heurística de queda: pessoa deitada na parte inferior do frame
+        self.candidatos_queda = (
+            (self.proporcoes < PROPORCAO_QUEDA) & (self.centros[:, 1] > altura_frame / 2)
+        )
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
+
+    def mover(self, xyxy: np.ndarray) -> "DeteccoesFrame":
+        """Mesmas pessoas (confiança e ids) em novas caixas, com zonas recalculadas."""
+        return DeteccoesFrame(
+            xyxy, self.conf, self.ids, self.altura_frame,
+            area_quarto=self.area_quarto, area_banheiro=self.area_banheiro,
+            usar_area_quarto=self.usar_area_quarto, zonas=self.zonas
+        )
+
+    def na_zona(self, nome: str) -> np.ndarray:
+        """Máscara (N,) das pessoas cujo centro está na zona poligonal com esse nome."""
+        if self.zonas is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.zonas.na_zona(self.bits_zonas, nome)
+
+    @property
+    def tem_tracking(self) -> bool:
+        """True se as detecções possuem ids de tracking."""
+        return bool(len(self.ids)) and bool((self.ids >= 0).all())
+
+    def chaves(self, mascara: Optional[np.ndarray] = None, prefixo: str = "") -> List:
+        """
+        Identificadores das pessoas selecionadas pela máscara.
+
+        Usa o track_id quando disponível; caso contrário, a posição aproximada
+        (canto superior esquerdo / 10) como identificador temporário.
+        """
+        indices = np.flatnonzero(mascara) if mascara is not None else range(len(self))
+        chaves = []
+        for i in indices:
+            track_id = int(self.ids[i])
+            if track_id >= 0:
+                chaves.append(track_id)
+            else:
+                x1, y1 = self.xyxy[i, 0], self.xyxy[i, 1]
+                chaves.append(f"{prefixo}{int(x1 / 10)}_{int(y1 / 10)}")
+        return chaves
+
+
+def vazio(altura_frame: int) -> DeteccoesFrame:
+    """Cria um DeteccoesFrame sem detecções."""
+    return DeteccoesFrame(
+        np.zeros((0, 4), dtype=np.float32),
+        np.zeros(0, dtype=np.float32),
+        np.zeros(0, dtype=np.int64),
+        altura_frame
+    )
+
+
+def dados_do_resultado(results: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Copia as caixas dos resultados YOLO para a CPU em uma única transferência.
+
+    Returns:
+        (dados, ids): dados (N, 6) com [x1, y1, x2, y2, conf, cls] e ids (N,)
+        com o track_id ou -1
+    """
+    blocos = []
+    blocos_ids = []
+    for result in results:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            continue
+
+        data = boxes.data
+        data = data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)
+
+        # Com tracking, boxes.data tem 7 colunas: xyxy, id, conf, cls
+        if data.shape[1] == 7:
+            blocos_ids.append(data[:, 4].astype(np.int64))
+            data = data[:, [0, 1, 2, 3, 5, 6]]
+        else:
+            blocos_ids.append(np.full(len(data), -1, dtype=np.int64))
+        blocos.append(data)
+
+    if not blocos:
+        return np.zeros((0, 6), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    return np.concatenate(blocos), np.concatenate(blocos_ids)
+
+
+def extrair_deteccoes(results: Sequence, altura_frame: int, classe_pessoa: int = 0,
+                      conf_threshold: float = 0.0, area_quarto=None, area_banheiro=None,
+                      usar_area_quarto: bool = False, usar_tracking: bool = True,
+                      deslocamento: Tuple[int, int] = (0, 0),
+                      zonas: Optional[MascaraZonas] = None, rastreador=None) -> DeteccoesFrame:
+    """
+    Etapa única de pós-processamento de um frame.
+
+    Args:
+        results: Resultado de model.predict/model.track
+        altura_frame: Altura do frame em pixels
+        classe_pessoa: Id da classe pessoa
+        conf_threshold: Confiança mínima
+        area_quarto: Área do quarto em pixels (x1, y1, x2, y2)
+        area_banheiro: Área do banheiro em pixels (x1, y1, x2, y2)
+        usar_area_quarto: Se False, toda pessoa conta como no quarto
+        usar_tracking: Se False, ignora os ids de tracking
+        deslocamento: (dx, dy) somado às caixas quando a inferência foi feita
+            sobre um recorte do frame
+        zonas: Zonas poligonais rasterizadas na resolução do frame (substituem
+            area_quarto/area_banheiro no pertencimento)
+        rastreador: RastreadorSORT da câmera; quando dado, os ids vêm dele
+            (e não do model.track)
+
+    Returns:
+        DeteccoesFrame compartilhado por todos os consumidores do frame
+    """
+    dados, ids = dados_do_resultado(results)
+    pessoas = (dados[:, COL_CLS] == classe_pessoa) & (dados[:, COL_CONF] >= conf_threshold)
+
+    ids = ids[pessoas] if usar_tracking else np.full(int(pessoas.sum()), -1, dtype=np.int64)
+    xyxy = dados[pessoas, :4]
+    if deslocamento != (0, 0):
+        dx, dy = deslocamento
+        xyxy = xyxy + np.array([dx, dy, dx, dy], dtype=xyxy.dtype)
+    conf = dados[pessoas, COL_CONF]
+    if rastreador is not None:
+        ids = rastreador.atualizar(xyxy, conf)
+    return DeteccoesFrame(
+        xyxy, conf, ids, altura_frame,
+        area_quarto=area_quarto, area_banheiro=area_banheiro,
+        usar_area_quarto=usar_area_quarto, zonas=zonas
+    )
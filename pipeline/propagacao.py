@@ -0,0 +1,188 @@
+"""
+Propagação de Caixas entre Keyframes - IASenior
+Entre duas inferências completas, as caixas do último keyframe são movidas
+por um filtro de Kalman (velocidade constante) corrigido pelo fluxo óptico
+esparso (Lucas-Kanade) de pontos dentro de cada caixa. Contagens, cronômetros
+do banheiro e overlay seguem atualizando a cada frame, enquanto o modelo roda
+só a cada k frames.
+"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Fator de escala máximo por frame estimado pelo fluxo (pessoa se aproximando/afastando)
+ESCALA_MAX_FRAME = 0.1
+
+
+class PropagadorCaixas:
+    """
+    Move as caixas de um keyframe pelos frames seguintes.
+
+    O fluxo é calculado uma vez por frame para todos os pontos de todas as
+    caixas (uma chamada de calcOpticalFlowPyrLK) sobre o frame em cinza
+    reduzido. A mediana do deslocamento dos pontos de uma caixa é a medição
+    do Kalman; caixas sem pontos suficientes seguem só a predição, com a
+    velocidade amortecida.
+    """
+
+    def __init__(self, largura_fluxo: int = 320, max_pontos_caixa: int = 20,
+                 min_pontos_caixa: int = 4, ruido_processo: float = 1.0,
+                 ruido_medicao: float = 4.0):
+        """
+        Inicializa o propagador.
+
+        Args:
+            largura_fluxo: Largura do frame reduzido usado no fluxo óptico
+            max_pontos_caixa: Pontos rastreados por caixa
+            min_pontos_caixa: Pontos válidos mínimos para medir o deslocamento
+            ruido_processo: Variância do ruído de processo do Kalman (px² reduzidos)
+            ruido_medicao: Variância da medição do fluxo (px² reduzidos)
+        """
+        self.largura_fluxo = largura_fluxo
+        self.max_pontos_caixa = max_pontos_caixa
+        self.min_pontos_caixa = min_pontos_caixa
+        self.ruido_processo = ruido_processo
+        self.ruido_medicao = ruido_medicao
+
+        self._escala = 1.0
+        self._cinza: Optional[np.ndarray] = None
+        # Estado por caixa, em coordenadas do frame reduzido
+        self._posicao = np.zeros((0, 2), dtype=np.float32)    # centro (x, y)
+        self._velocidade = np.zeros((0, 2), dtype=np.float32)
+        self._tamanho = np.zeros((0, 2), dtype=np.float32)    # (largura, altura)
+        self._covariancia = np.zeros((0, 2, 2), dtype=np.float32)  # [pos, vel], igual nos dois eixos
+        self._pontos = np.zeros((0, 1, 2), dtype=np.float32)
+        self._dono = np.zeros(0, dtype=np.int64)  # caixa de cada ponto
+
+        # Estatísticas
+        self.keyframes = 0
+        self.frames_propagados = 0
+
+    def _reduzir(self, frame: np.ndarray) -> np.ndarray:
+        self._escala = min(1.0, self.largura_fluxo / frame.shape[1])
+        if self._escala < 1.0:
+            altura = max(1, int(round(frame.shape[0] * self._escala)))
+            frame = cv2.resize(frame, (self.largura_fluxo, altura), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def reiniciar(self, frame: np.ndarray, xyxy: np.ndarray):
+        """Keyframe: adota as caixas da inferência e semeia pontos dentro delas."""
+        self._cinza = self._reduzir(frame)
+        caixas = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4) * self._escala
+        self._posicao = np.stack([(caixas[:, 0] + caixas[:, 2]) / 2, (caixas[:, 1] + caixas[:, 3]) / 2], axis=1)
+        self._tamanho = np.stack([caixas[:, 2] - caixas[:, 0], caixas[:, 3] - caixas[:, 1]], axis=1)
+        self._velocidade = np.zeros_like(self._posicao)
+        self._covariancia = np.tile(
+            np.diag([self.ruido_medicao, 10.0 * self.ruido_medicao]).astype(np.float32), (len(caixas), 1, 1)
+        )
+        self._pontos = np.zeros((0, 1, 2), dtype=np.float32)
+        self._dono = np.zeros(0, dtype=np.int64)
+        self._semear(range(len(caixas)))
+        self.keyframes += 1
+
+    def _caixas_reduzidas(self) -> np.ndarray:
+        meio = self._tamanho / 2
+        return np.concatenate([self._posicao - meio, self._posicao + meio], axis=1)
+
+    def _semear(self, indices):
+        """Procura cantos dentro das caixas indicadas e os adiciona aos pontos rastreados."""
+        altura, largura = self._cinza.shape
+        caixas = self._caixas_reduzidas()
+        novos, donos = [self._pontos], [self._dono]
+        for i in indices:
+            x1, y1, x2, y2 = caixas[i]
+            x1, y1 = max(0, int(x1)), max(0, int(y1))
+            x2, y2 = min(largura, int(np.ceil(x2))), min(altura, int(np.ceil(y2)))
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            cantos = cv2.goodFeaturesToTrack(
+                self._cinza[y1:y2, x1:x2], maxCorners=self.max_pontos_caixa,
+                qualityLevel=0.01, minDistance=3
+            )
+            if cantos is None:
+                continue
+            novos.append(cantos.astype(np.float32) + np.array([x1, y1], dtype=np.float32))
+            donos.append(np.full(len(cantos), i, dtype=np.int64))
+        self._pontos = np.concatenate(novos)
+        self._dono = np.concatenate(donos)
+
+    def propagar(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Move as caixas do último keyframe para este frame.
+
+        Returns:
+            (N, 4) caixas xyxy em pixels do frame, na ordem do keyframe
+        """
+        cinza = self._reduzir(frame)
+        n = len(self._posicao)
+        if self._cinza is None or n == 0:
+            self._cinza = cinza
+            return np.zeros((0, 4), dtype=np.float32)
+        self.frames_propagados += 1
+
+        # Predição (velocidade constante, um frame)
+        transicao = np.array([[1, 1], [0, 1]], dtype=np.float32)
+        self._posicao += self._velocidade
+        self._covariancia = transicao @ self._covariancia @ transicao.T
+        self._covariancia += np.diag([self.ruido_processo, self.ruido_processo]).astype(np.float32)
+
+        # Medição: deslocamento mediano dos pontos de cada caixa
+        medido = np.zeros(n, dtype=bool)
+        medicao = np.zeros((n, 2), dtype=np.float32)
+        if len(self._pontos):
+            anteriores = self._pontos
+            atuais, status, _ = cv2.calcOpticalFlowPyrLK(
+                self._cinza, cinza, anteriores, None, winSize=(15, 15), maxLevel=2
+            )
+            validos = status.ravel() == 1
+            anteriores, atuais = anteriores[validos, 0], atuais[validos, 0]
+            dono = self._dono[validos]
+            deslocamento = atuais - anteriores
+            for i in range(n):
+                sel = dono == i
+                if np.count_nonzero(sel) < self.min_pontos_caixa:
+                    continue
+                medido[i] = True
+                desl = np.median(deslocamento[sel], axis=0)
+                medicao[i] = self._posicao[i] - self._velocidade[i] + desl  # centro anterior + fluxo
+
+                # Escala: razão mediana das distâncias ao centroide dos pontos
+                antes = np.linalg.norm(anteriores[sel] - anteriores[sel].mean(axis=0), axis=1)
+                depois = np.linalg.norm(atuais[sel] - atuais[sel].mean(axis=0), axis=1)
+                uteis = antes > 1.0
+                if np.count_nonzero(uteis) >= self.min_pontos_caixa:
+                    escala = float(np.median(depois[uteis] / antes[uteis]))
+                    self._tamanho[i] *= np.clip(escala, 1 - ESCALA_MAX_FRAME, 1 + ESCALA_MAX_FRAME)
+            self._pontos = atuais.reshape(-1, 1, 2).astype(np.float32)
+            self._dono = dono
+
+        # Atualização vetorizada (mesmo ganho nos dois eixos)
+        if medido.any():
+            p = self._covariancia[medido]
+            ganho = p[:, :, 0] / (p[:, 0, 0] + self.ruido_medicao)[:, None]  # (M, 2)
+            inovacao = medicao[medido] - self._posicao[medido]
+            self._posicao[medido] += ganho[:, 0:1] * inovacao
+            self._velocidade[medido] += ganho[:, 1:2] * inovacao
+            self._covariancia[medido] = p - ganho[:, :, None] * p[:, 0:1, :]
+        # Sem medição, a velocidade é amortecida para a caixa não disparar
+        self._velocidade[~medido] *= 0.5
+
+        self._cinza = cinza
+        # Caixas que perderam pontos (oclusão, saída de textura) são ressemeadas
+        contagem = np.bincount(self._dono, minlength=n)
+        pobres = np.flatnonzero(contagem < self.min_pontos_caixa)
+        if len(pobres):
+            self._semear(pobres)
+
+        altura, largura = cinza.shape
+        caixas = self._caixas_reduzidas()
+        caixas[:, [0, 2]] = np.clip(caixas[:, [0, 2]], 0, largura)
+        caixas[:, [1, 3]] = np.clip(caixas[:, [1, 3]], 0, altura)
+        return caixas / self._escala
+
+    def taxa_propagacao(self) -> float:
+        """Fração dos frames em que as caixas vieram da propagação."""
+        total = self.keyframes + self.frames_propagados
+        return self.frames_propagados / total if total else 0.0
@@ -0,0 +1,128 @@
+"""
+Publicador de Estado para o Painel - IASenior
+Grava o frame anotado e os arquivos de status lidos pelo painel, pela
+persistência e pelos agentes, em um ritmo próprio (independente do FPS da
+inferência) e sempre de forma atômica: arquivo temporário + os.replace.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def escrever_atomico(caminho: Union[str, Path], dados: bytes):
+    """
+    Grava `dados` em `caminho` sem que leitores vejam o arquivo pela metade.
+
+    O conteúdo vai para um temporário no mesmo diretório, que então substitui
+    o destino com os.replace (atômico no mesmo sistema de arquivos).
+    """
+    caminho = Path(caminho)
+    fd, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=f".{caminho.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+        # mkstemp cria com 0600; os leitores (painel, agentes) podem ser outro usuário
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+class PublicadorEstado:
+    """
+    Publica frame e status do stream para os consumidores em disco.
+
+    - status (ok/queda) é gravado assim que muda;
+    - contagem do quarto e status do banheiro são gravados só quando mudam,
+      no máximo `taxa` vezes por segundo;
+    - o JPEG do frame é codificado no máximo `taxa` vezes por segundo.
+    """
+
+    def __init__(self, frame_path: Optional[str], status_path: str,
+                 contagem_path: Optional[str] = None, banheiro_path: Optional[str] = None,
+                 taxa: float = 2.0, qualidade_jpeg: int = 85):
+        """
+        Inicializa o publicador.
+
+        Args:
+            frame_path: Arquivo JPEG do último frame (None = não publicar frames)
+            status_path: Arquivo com o status geral (ok/queda)
+            contagem_path: Arquivo com a contagem do quarto (None = não publicar)
+            banheiro_path: Arquivo JSON com o status do banheiro (None = não publicar)
+            taxa: Publicações por segundo do frame e dos estados não urgentes
+            qualidade_jpeg: Qualidade do JPEG (0-100)
+        """
+        self.frame_path = frame_path
+        self.status_path = status_path
+        self.contagem_path = contagem_path
+        self.banheiro_path = banheiro_path
+        self.intervalo = 1.0 / taxa if taxa > 0 else 0.0
+        self.parametros_jpeg = [cv2.IMWRITE_JPEG_QUALITY, int(qualidade_jpeg)]
+
+        self._ultimo_frame = 0.0
+        self._ultimo_texto = 0.0
+        self._conteudos: Dict[str, bytes] = {}  # último conteúdo gravado por arquivo
+
+        # Estatísticas
+        self.frames_gravados = 0
+        self.arquivos_gravados = 0
+
+    def _gravar_se_mudou(self, caminho: str, dados: bytes) -> bool:
+        """Grava o arquivo se o conteúdo mudou desde a última gravação."""
+        if self._conteudos.get(caminho) == dados:
+            return False
+        escrever_atomico(caminho, dados)
+        self._conteudos[caminho] = dados
+        self.arquivos_gravados += 1
+        return True
+
+    def publicar(self, frame: Optional[np.ndarray], status: str, contagem_quarto: int,
+                 status_banheiro: Dict[str, Any], agora: Optional[float] = None):
+        """
+        Publica o estado de um frame, respeitando a taxa configurada.
+
+        Args:
+            frame: Frame anotado (None = nenhum frame neste ciclo)
+            status: Status geral ("ok" ou "queda")
+            contagem_quarto: Pessoas no quarto
+            status_banheiro: Status do banheiro (dicionário serializável)
+            agora: Timestamp atual (None = time.time())
+        """
+        agora = time.time() if agora is None else agora
+        try:
+            # Status de queda não espera o próximo ciclo de publicação
+            self._gravar_se_mudou(self.status_path, status.encode())
+
+            if agora - self._ultimo_texto >= self.intervalo:
+                self._ultimo_texto = agora
+                if self.contagem_path:
+                    self._gravar_se_mudou(self.contagem_path, str(contagem_quarto).encode())
+                if self.banheiro_path:
+                    self._gravar_se_mudou(
+                        self.banheiro_path,
+                        json.dumps(status_banheiro, ensure_ascii=False).encode('utf-8')
+                    )
+
+            if self.frame_path and frame is not None and agora - self._ultimo_frame >= self.intervalo:
+                self._ultimo_frame = agora
+                sucesso, buffer = cv2.imencode('.jpg', frame, self.parametros_jpeg)
+                if sucesso:
+                    escrever_atomico(self.frame_path, buffer.tobytes())
+                    self.frames_gravados += 1
+
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar informações: {e}")
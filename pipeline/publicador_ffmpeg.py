@@ -0,0 +1,217 @@
+"""
+Publicador FFmpeg Não Bloqueante - IASenior
+Entrega os frames anotados ao FFmpeg por uma thread própria, atrás de uma
+fila limitada em que o frame mais novo sempre vence. Se o FFmpeg ou o
+servidor RTSP travar, apenas o vídeo atrasa; a detecção segue no ritmo dela.
+"""
+
+import logging
+import queue
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def comando_rtsp(largura: int, altura: int, fps: int, rtsp_url: str,
+                 preset: str = 'ultrafast', tune: str = 'zerolatency') -> List[str]:
+    """Comando FFmpeg que lê BGR24 cru da stdin e publica H.264 em RTSP."""
+    return [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'bgr24',
+        '-s', f'{largura}x{altura}',
+        '-r', str(fps),
+        '-i', '-',
+        '-c:v', 'libx264',
+        '-preset', preset,
+        '-tune', tune,
+        '-f', 'rtsp',
+        rtsp_url
+    ]
+
+
+class PublicadorFFmpeg:
+    """
+    Processo FFmpeg supervisionado, alimentado por uma thread escritora.
+
+    `enviar()` nunca bloqueia: com a fila cheia, o frame mais antigo é
+    descartado. A thread escritora (re)inicia o FFmpeg quando ele não está
+    rodando, com espera crescente entre tentativas, e o reinicia se a escrita
+    falhar (pipe quebrado, processo encerrado).
+
+    Os frames são enfileirados por referência: quem chama não deve alterar o
+    array depois de enviá-lo.
+    """
+
+    nome = "FFmpeg"  # nos logs de reinício/escrita compartilhados com subclasses
+
+    def __init__(self, comando: List[str], tamanho_fila: int = 2,
+                 atraso_reinicio: float = 1.0, atraso_reinicio_max: float = 30.0):
+        """
+        Inicializa o publicador.
+
+        Args:
+            comando: Comando FFmpeg (lendo rawvideo da stdin)
+            tamanho_fila: Máximo de frames aguardando escrita
+            atraso_reinicio: Espera inicial (s) antes de reiniciar o FFmpeg
+            atraso_reinicio_max: Espera máxima (s) entre reinícios
+        """
+        self.comando = comando
+        self.fila: queue.Queue = queue.Queue(maxsize=max(1, tamanho_fila))
+        self.atraso_reinicio = atraso_reinicio
+        self.atraso_reinicio_max = atraso_reinicio_max
+
+        self.process: Optional[subprocess.Popen] = None
+        self._atraso_atual = atraso_reinicio
+        self._proxima_tentativa = 0.0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Estatísticas
+        self.frames_enviados = 0
+        self.frames_descartados = 0
+        self.erros_escrita = 0
+        self.reinicios = 0
+
+    def iniciar(self):
+        """Inicia o FFmpeg e a thread escritora."""
+        self._parar.clear()
+        self._iniciar_processo()
+        self._thread = threading.Thread(
+            target=self._loop, name="publicador-ffmpeg", daemon=True
+        )
+        self._thread.start()
+
+    def _iniciar_processo(self) -> bool:
+        """Sobe o processo FFmpeg. Retorna False se não foi possível."""
+        try:
+            # stdout/stderr descartados: pipes não drenados acabam travando o FFmpeg
+            self.process = subprocess.Popen(
+                self.comando,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            logger.info("✅ FFmpeg iniciado com sucesso!")
+            return True
+        except Exception as e:
+            self.process = None
+            logger.error(f"❌ Erro ao iniciar FFmpeg: {e}")
+            return False
+
+    def _encerrar_processo(self):
+        """Fecha a stdin e encerra o processo FFmpeg atual."""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except Exception:
+            pass
+        try:
+            process.terminate()
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logger.warning("⚠️ FFmpeg não respondeu ao terminate. Forçando kill...")
+            process.kill()
+            process.wait()
+        except Exception as e:
+            logger.error(f"❌ Erro ao finalizar FFmpeg: {e}")
+
+    def _rodando(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _escrever(self, frame: np.ndarray):
+        """Entrega um frame à saída; exceções de E/S derrubam e reiniciam a saída."""
+        self.process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+        self.process.stdin.flush()
+
+    def _garantir_processo(self) -> bool:
+        """Reinicia o FFmpeg se ele caiu, respeitando a espera entre tentativas."""
+        if self._rodando():
+            return True
+
+        if self.process is not None:
+            logger.warning(f"⚠️ FFmpeg encerrou (código {self.process.returncode})")
+            self._encerrar_processo()
+
+        agora = time.time()
+        if agora < self._proxima_tentativa:
+            return False
+
+        self.reinicios += 1
+        logger.info(f"🔄 Reiniciando {self.nome} (tentativa {self.reinicios})...")
+        if self._iniciar_processo():
+            self._atraso_atual = self.atraso_reinicio
+            return True
+
+        self._proxima_tentativa = agora + self._atraso_atual
+        self._atraso_atual = min(self._atraso_atual * 2, self.atraso_reinicio_max)
+        return False
+
+    def _agendar_reinicio(self):
+        """Derruba o processo após uma falha de escrita e agenda o reinício."""
+        self._encerrar_processo()
+        self._proxima_tentativa = time.time() + self._atraso_atual
+        self._atraso_atual = min(self._atraso_atual * 2, self.atraso_reinicio_max)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            try:
+                frame = self.fila.get(timeout=0.5)
+            except queue.Empty:
+                # Sem frames, apenas supervisiona o processo
+                self._garantir_processo()
+                continue
+
+            if not self._garantir_processo():
+                self.frames_descartados += 1
+                continue
+
+            try:
+                self._escrever(frame)
+                self.frames_enviados += 1
+            except (BrokenPipeError, OSError, ValueError) as e:
+                self.erros_escrita += 1
+                self.frames_descartados += 1
+                logger.error(f"❌ Erro ao escrever no {self.nome}: {e}. Reiniciando em {self._atraso_atual:.0f}s")
+                self._agendar_reinicio()
+
+    def enviar(self, frame: np.ndarray):
+        """Enfileira um frame para o FFmpeg sem bloquear (descarta o mais antigo se cheio)."""
+        while True:
+            try:
+                self.fila.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.fila.get_nowait()
+                    self.frames_descartados += 1
+                except queue.Empty:
+                    pass
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores do publicador."""
+        return {
+            'enviados': self.frames_enviados,
+            'descartados': self.frames_descartados,
+            'erros_escrita': self.erros_escrita,
+            'reinicios': self.reinicios,
+            'fila': self.fila.qsize(),
+            'rodando': self._rodando(),
+        }
+
+    def parar(self):
+        """Para a thread escritora e encerra o FFmpeg."""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._encerrar_processo()
+        logger.info("✅ Processo FFmpeg encerrado.")
@@ -0,0 +1,154 @@
+"""
+Publicador RTSP em Processo (PyAV) - IASenior
+Codifica H.264 com a libav dentro do próprio processo e publica no mesmo
+RTSP_URL, sem subprocesso FFmpeg: o frame BGR vira YUV420 uma única vez
+(cv2, vetorizado) e vai direto ao codificador, em vez de ~55 MB/s de BGR cru
+por câmera (1280x720 a 20 FPS) atravessarem um pipe.
+
+Mesma interface e supervisão do PublicadorFFmpeg (fila em que o mais novo
+vence, reinício com espera crescente); aqui o "processo" é o contêiner de
+saída. Requer o pacote opcional `av` (PyAV), importado só ao abrir a saída.
+"""
+
+import logging
+import time
+from fractions import Fraction
+from typing import Any
+
+import cv2
+import numpy as np
+
+from .publicador_ffmpeg import PublicadorFFmpeg
+
+logger = logging.getLogger(__name__)
+
+# Timestamps em milissegundos de relógio: frames descartados na fila não
+# aceleram o vídeo publicado
+BASE_TEMPO = Fraction(1, 1000)
+
+
+class PublicadorPyAV(PublicadorFFmpeg):
+    """
+    Codificador libx264 + muxer RTSP da libav, alimentado pela thread escritora.
+
+    Largura e altura precisam ser pares (subamostragem de croma do YUV420).
+    """
+
+    nome = "PyAV"
+
+    def __init__(self, largura: int, altura: int, fps: int, rtsp_url: str,
+                 preset: str = 'ultrafast', tune: str = 'zerolatency',
+                 tamanho_fila: int = 2, atraso_reinicio: float = 1.0,
+                 atraso_reinicio_max: float = 30.0):
+        """
+        Inicializa o publicador.
+
+        Args:
+            largura: Largura dos frames (par)
+            altura: Altura dos frames (par)
+            fps: Taxa nominal do stream
+            rtsp_url: Destino RTSP (ex.: RTSP_URL)
+            preset: Preset do libx264
+            tune: Tune do libx264
+            tamanho_fila: Máximo de frames aguardando codificação
+            atraso_reinicio: Espera inicial (s) antes de reabrir a saída
+            atraso_reinicio_max: Espera máxima (s) entre reaberturas
+        """
+        if largura % 2 or altura % 2:
+            raise ValueError(f"YUV420 exige dimensões pares (recebido {largura}x{altura})")
+        super().__init__([], tamanho_fila=tamanho_fila, atraso_reinicio=atraso_reinicio,
+                         atraso_reinicio_max=atraso_reinicio_max)
+        self.largura = largura
+        self.altura = altura
+        self.fps = fps
+        self.rtsp_url = rtsp_url
+        self.preset = preset
+        self.tune = tune
+
+        self._av: Any = None
+        self.container: Any = None
+        self.stream: Any = None
+        self._inicio = 0.0
+        self._ultimo_pts = -1
+
+    def _iniciar_processo(self) -> bool:
+        """Abre o contêiner RTSP e o codificador. Retorna False se não foi possível."""
+        container = None
+        try:
+            import av
+            self._av = av
+            container = av.open(self.rtsp_url, mode='w', format='rtsp')
+            stream = container.add_stream('libx264', rate=self.fps)
+            stream.width = self.largura
+            stream.height = self.altura
+            stream.pix_fmt = 'yuv420p'
+            stream.codec_context.time_base = BASE_TEMPO
+            stream.options = {'preset': self.preset, 'tune': self.tune}
+            # Conecta ao servidor RTSP já aqui, e não no primeiro frame
+            container.start_encoding()
+            self.container, self.stream = container, stream
+            self._inicio = time.monotonic()
+            self._ultimo_pts = -1
+            logger.info(f"✅ Publicador PyAV conectado a {self.rtsp_url}")
+            return True
+        except Exception as e:
+            self.container = self.stream = None
+            if container is not None:
+                try:
+                    container.close()
+                except Exception:
+                    pass
+            logger.error(f"❌ Erro ao abrir saída RTSP (PyAV): {e}")
+            return False
+
+    def _encerrar_processo(self):
+        """Esvazia o codificador e fecha o contêiner atual."""
+        container, stream = self.container, self.stream
+        self.container = self.stream = None
+        if container is None:
+            return
+        try:
+            for pacote in stream.encode(None):
+                container.mux(pacote)
+        except Exception:
+            pass  # saída já quebrada: os frames pendentes se perdem
+        try:
+            container.close()
+        except Exception as e:
+            logger.error(f"❌ Erro ao fechar saída RTSP (PyAV): {e}")
+
+    def _rodando(self) -> bool:
+        return self.container is not None
+
+    def _escrever(self, frame: np.ndarray):
+        # Única conversão de cor: BGR -> I420 planar, já no layout do yuv420p
+        yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        quadro = self._av.VideoFrame.from_ndarray(yuv, format='yuv420p')
+        pts = int((time.monotonic() - self._inicio) * 1000)
+        self._ultimo_pts = pts = max(pts, self._ultimo_pts + 1)
+        quadro.pts = pts
+        quadro.time_base = BASE_TEMPO
+        try:
+            for pacote in self.stream.encode(quadro):
+                self.container.mux(pacote)
+        except self._av.error.FFmpegError as e:
+            raise OSError(str(e)) from e
+
+    def estatisticas(self):
+        estatisticas = super().estatisticas()
+        estatisticas['publicador'] = 'pyav'
+        return estatisticas
+
+    def parar(self):
+        """Para a thread escritora e fecha a saída RTSP."""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._encerrar_processo()
+        logger.info("✅ Publicador PyAV encerrado.")
+
+
+def pyav_disponivel() -> bool:
+    """True se o pacote `av` está instalado (sem importá-lo)."""
+    import importlib.util
+    return importlib.util.find_spec('av') is not None
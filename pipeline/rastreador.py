@@ -0,0 +1,168 @@
+"""
+Rastreador de Pessoas em NumPy - IASenior
+Rastreamento multiobjeto no estilo SORT/ByteTrack, independente do modelo:
+o estado fica em um objeto por câmera, não dentro do YOLO, então funciona
+com qualquer backend, com lotes de várias câmeras, com o pool de inferência
+e com frames pulados pelo portão de movimento ou pelos keyframes.
+"""
+
+import threading
+from typing import List, Tuple
+
+import numpy as np
+
+
+def iou_matriz(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU entre todas as caixas xyxy de `a` (N, 4) e `b` (M, 4), em uma operação (N, M)."""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersecao = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    uniao = area_a[:, None] + area_b[None, :] - intersecao
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(uniao > 0, intersecao / uniao, 0.0).astype(np.float32)
+
+
+def associar(iou: np.ndarray, iou_min: float) -> List[Tuple[int, int]]:
+    """
+    Pares (linha, coluna) por IoU decrescente, cada linha/coluna usada uma vez.
+
+    Guloso em vez de húngaro: com poucas pessoas por câmera o resultado é o
+    mesmo na prática, e não exige SciPy.
+    """
+    linhas, colunas = np.nonzero(iou >= iou_min)
+    if not len(linhas):
+        return []
+    ordem = np.argsort(-iou[linhas, colunas], kind='stable')
+    usadas_l, usadas_c, pares = set(), set(), []
+    for k in ordem:
+        i, j = int(linhas[k]), int(colunas[k])
+        if i in usadas_l or j in usadas_c:
+            continue
+        usadas_l.add(i)
+        usadas_c.add(j)
+        pares.append((i, j))
+    return pares
+
+
+class RastreadorSORT:
+    """
+    Trilhas de uma câmera: predição por velocidade constante + associação por IoU.
+
+    Como no ByteTrack, a associação é feita em duas etapas: detecções de
+    confiança alta escolhem trilhas primeiro, e as de confiança baixa só
+    disputam as trilhas que sobraram (uma pessoa parcialmente oculta mantém o
+    id). Diferente do ByteTrack, toda detecção sem trilha abre uma (as que
+    chegam aqui já passaram do limiar de confiança da inferência), para que
+    zonas e cascata de quedas sempre tenham ids. Trilhas não associadas
+    seguem a predição por até `max_perdidos`
+    atualizações; frames em que o rastreador não roda não as envelhecem.
+    Seguro entre threads (o servidor MJPEG atende vários clientes).
+    """
+
+    def __init__(self, iou_min: float = 0.3, conf_alta: float = 0.5,
+                 max_perdidos: int = 30, suavizacao: float = 0.5):
+        """
+        Inicializa o rastreador.
+
+        Args:
+            iou_min: IoU mínimo entre trilha prevista e detecção
+            conf_alta: Confiança que separa as duas etapas de associação
+            max_perdidos: Atualizações sem detecção até a trilha ser removida
+            suavizacao: Peso do deslocamento novo na velocidade (0-1)
+        """
+        self.iou_min = iou_min
+        self.conf_alta = conf_alta
+        self.max_perdidos = max_perdidos
+        self.suavizacao = suavizacao
+
+        self._caixas = np.zeros((0, 4), dtype=np.float32)
+        self._velocidades = np.zeros((0, 4), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._perdidos = np.zeros(0, dtype=np.int64)
+        self._proximo_id = 1
+        self._lock = threading.Lock()
+
+        # Estatísticas
+        self.trilhas_criadas = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def atualizar(self, xyxy: np.ndarray, conf: np.ndarray) -> np.ndarray:
+        """
+        Associa as detecções do frame às trilhas.
+
+        Args:
+            xyxy: (N, 4) caixas em pixels
+            conf: (N,) confiança
+
+        Returns:
+            (N,) ids das trilhas, alinhados com as detecções
+        """
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        ids = np.full(len(xyxy), -1, dtype=np.int64)
+
+        with self._lock:
+            previstas = self._caixas + self._velocidades
+            trilha_de = np.full(len(xyxy), -1, dtype=np.int64)
+            livres = np.ones(len(previstas), dtype=bool)
+
+            for etapa in (conf >= self.conf_alta, conf < self.conf_alta):
+                deteccoes = np.flatnonzero(etapa)
+                trilhas = np.flatnonzero(livres)
+                iou = iou_matriz(previstas[trilhas], xyxy[deteccoes])
+                for i, j in associar(iou, self.iou_min):
+                    trilha_de[deteccoes[j]] = trilhas[i]
+                    livres[trilhas[i]] = False
+
+            # Trilhas associadas: velocidade suavizada, posição da detecção
+            associadas = trilha_de >= 0
+            t = trilha_de[associadas]
+            deslocamento = xyxy[associadas] - self._caixas[t]
+            self._velocidades[t] = (
+                self.suavizacao * deslocamento + (1 - self.suavizacao) * self._velocidades[t]
+            )
+            self._caixas[t] = xyxy[associadas]
+            self._perdidos[t] = 0
+            ids[associadas] = self._ids[t]
+
+            # Trilhas sem detecção seguem a predição, com velocidade amortecida
+            self._caixas[livres] = previstas[livres]
+            self._velocidades[livres] *= 0.5
+            self._perdidos[livres] += 1
+
+            # Detecções sem trilha abrem trilhas novas
+            novas = np.flatnonzero(~associadas)
+            if len(novas):
+                novos_ids = np.arange(self._proximo_id, self._proximo_id + len(novas), dtype=np.int64)
+                self._proximo_id += len(novas)
+                self.trilhas_criadas += len(novas)
+                ids[novas] = novos_ids
+                self._caixas = np.concatenate([self._caixas, xyxy[novas]])
+                self._velocidades = np.concatenate([self._velocidades, np.zeros((len(novas), 4), np.float32)])
+                self._ids = np.concatenate([self._ids, novos_ids])
+                self._perdidos = np.concatenate([self._perdidos, np.zeros(len(novas), np.int64)])
+
+            vivas = self._perdidos <= self.max_perdidos
+            if not vivas.all():
+                self._caixas = self._caixas[vivas]
+                self._velocidades = self._velocidades[vivas]
+                self._ids = self._ids[vivas]
+                self._perdidos = self._perdidos[vivas]
+
+        return ids
+
+    def limpar(self):
+        """Descarta todas as trilhas (os ids continuam crescendo)."""
+        with self._lock:
+            self._caixas = self._caixas[:0]
+            self._velocidades = self._velocidades[:0]
+            self._ids = self._ids[:0]
+            self._perdidos = self._perdidos[:0]
@@ -0,0 +1,157 @@
+"""
+Replay Offline - IASenior
+Fonte de frames a partir de um vídeo, de um diretório de vídeos ou de um
+diretório de imagens, no lugar da captura de tela. Permite rodar o pipeline
+completo sem monitor nem servidor RTSP e medir vazão/latência de forma
+reprodutível (mesmo material para comparar backends, imgsz e modos).
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXTENSOES_VIDEO = {'.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v'}
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+class FonteReplay:
+    """
+    Lê frames de arquivos em sequência, redimensionados para o tamanho de saída.
+
+    Aceita um arquivo de vídeo ou um diretório: os vídeos do diretório são
+    lidos em ordem alfabética; imagens soltas contam como um frame cada.
+    `ler()` retorna None ao fim do material (ou recomeça, se `repetir`).
+    """
+
+    def __init__(self, caminho: Union[str, Path], largura: int, altura: int,
+                 repetir: bool = False, max_frames: Optional[int] = None):
+        """
+        Inicializa a fonte.
+
+        Args:
+            caminho: Arquivo de vídeo ou diretório
+            largura: Largura dos frames entregues
+            altura: Altura dos frames entregues
+            repetir: Recomeçar do primeiro arquivo ao chegar ao fim
+            max_frames: Máximo de frames entregues (None = sem limite)
+        """
+        self.caminho = Path(caminho)
+        self.largura = largura
+        self.altura = altura
+        self.repetir = repetir
+        self.max_frames = max_frames
+
+        self.arquivos: List[Path] = []
+        self._indice = 0
+        self._atual: Optional[Path] = None
+        self._cap = None
+        self.frames_lidos = 0
+
+    def abrir(self):
+        """Lista os arquivos do replay."""
+        if self.caminho.is_dir():
+            self.arquivos = sorted(
+                p for p in self.caminho.iterdir()
+                if p.suffix.lower() in EXTENSOES_VIDEO | EXTENSOES_IMAGEM
+            )
+        elif self.caminho.exists():
+            self.arquivos = [self.caminho]
+        if not self.arquivos:
+            raise FileNotFoundError(f"Nenhum vídeo ou imagem para replay em {self.caminho}")
+        logger.info(f"🎞️ Replay de {len(self.arquivos)} arquivo(s) em {self.caminho}")
+
+    def _proximo_arquivo(self) -> bool:
+        """Avança para o próximo arquivo. Retorna False ao fim do material."""
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        if self._indice >= len(self.arquivos):
+            if not self.repetir:
+                return False
+            self._indice = 0
+        self._atual = self.arquivos[self._indice]
+        self._indice += 1
+        if self._atual.suffix.lower() in EXTENSOES_VIDEO:
+            self._cap = cv2.VideoCapture(str(self._atual))
+            if not self._cap.isOpened():
+                logger.warning(f"⚠️ Não foi possível abrir {self._atual}")
+                self._cap = None
+        return True
+
+    def ler(self) -> Optional[np.ndarray]:
+        """Próximo frame BGR no tamanho de saída, ou None ao fim do replay."""
+        if self.max_frames is not None and self.frames_lidos >= self.max_frames:
+            return None
+
+        arquivos_sem_frame = 0
+        while True:
+            frame = None
+            if self._cap is not None:
+                sucesso, frame = self._cap.read()
+                if not sucesso:
+                    frame = None
+            elif self._atual is not None and self._atual.suffix.lower() in EXTENSOES_IMAGEM:
+                frame = cv2.imread(str(self._atual))
+                self._atual = None
+
+            if frame is not None:
+                break
+            # Evita girar para sempre com `repetir` se nenhum arquivo for legível
+            arquivos_sem_frame += 1
+            if arquivos_sem_frame > len(self.arquivos) + 1 or not self._proximo_arquivo():
+                return None
+
+        if frame.shape[1] != self.largura or frame.shape[0] != self.altura:
+            frame = cv2.resize(frame, (self.largura, self.altura))
+        self.frames_lidos += 1
+        return frame
+
+    def fechar(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ResumoExecucao:
+    """Vazão e latência ponta a ponta (captura → publicação) de uma execução."""
+
+    def __init__(self):
+        self.inicio: Optional[float] = None
+        self.fim: Optional[float] = None
+        self._latencias: List[float] = []
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+
+    def registrar(self, t_captura: float):
+        """Registra um frame publicado, capturado em `t_captura` (time.perf_counter)."""
+        agora = time.perf_counter()
+        self._latencias.append(agora - t_captura)
+        self.fim = agora
+
+    def resumo(self) -> Dict[str, Any]:
+        """Frames, duração, FPS e percentis de latência (ms)."""
+        frames = len(self._latencias)
+        duracao = (self.fim - self.inicio) if (self.inicio and self.fim) else 0.0
+        resumo = {
+            'frames': frames,
+            'duracao_s': round(duracao, 2),
+            'fps': round(frames / duracao, 2) if duracao > 0 else 0.0,
+        }
+        if frames:
+            latencias = np.asarray(self._latencias) * 1000
+            p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+            resumo.update({
+                'latencia_media_ms': round(float(latencias.mean()), 1),
+                'latencia_p50_ms': round(float(p50), 1),
+                'latencia_p95_ms': round(float(p95), 1),
+                'latencia_p99_ms': round(float(p99), 1),
+                'latencia_max_ms': round(float(latencias.max()), 1),
+            })
+        return resumo
@@ -0,0 +1,79 @@
+"""
+Inferência Restrita às Zonas (ROI) - IASenior
+Recorta o frame para a união das zonas habilitadas (mais uma margem) antes
+da inferência e devolve as caixas para coordenadas do frame inteiro.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class RecorteZonas:
+    """
+    Região de interesse fixa: retângulo envolvente das zonas habilitadas.
+
+    O recorte é uma view do frame (sem cópia). `origem` é o deslocamento que
+    leva as caixas do recorte de volta às coordenadas do frame.
+    """
+
+    def __init__(self, areas_px: Sequence[Tuple[int, int, int, int]],
+                 largura: int, altura: int, margem: float = 0.05):
+        """
+        Inicializa o recorte.
+
+        Args:
+            areas_px: Áreas habilitadas em pixels (x1, y1, x2, y2)
+            largura: Largura do frame
+            altura: Altura do frame
+            margem: Margem em volta da união, como fração da largura/altura do frame
+        """
+        if not areas_px:
+            raise ValueError("Nenhuma área habilitada para o recorte")
+
+        areas = np.asarray(areas_px, dtype=np.float32)
+        mx = margem * largura
+        my = margem * altura
+        self.x1 = int(max(0, areas[:, 0].min() - mx))
+        self.y1 = int(max(0, areas[:, 1].min() - my))
+        self.x2 = int(min(largura, areas[:, 2].max() + mx))
+        self.y2 = int(min(altura, areas[:, 3].max() + my))
+        self.largura = largura
+        self.altura = altura
+
+    @property
+    def origem(self) -> Tuple[int, int]:
+        """Deslocamento (dx, dy) do recorte em relação ao frame."""
+        return self.x1, self.y1
+
+    @property
+    def regiao(self) -> Tuple[int, int, int, int]:
+        """Região recortada (x1, y1, x2, y2) em pixels do frame."""
+        return self.x1, self.y1, self.x2, self.y2
+
+    def fracao_frame(self) -> float:
+        """Fração da área do frame coberta pelo recorte."""
+        return ((self.x2 - self.x1) * (self.y2 - self.y1)) / float(self.largura * self.altura)
+
+    def recortar(self, frame: np.ndarray) -> np.ndarray:
+        """Retorna a view do frame correspondente à região."""
+        return frame[self.y1:self.y2, self.x1:self.x2]
+
+    def colar(self, destino: np.ndarray, recorte: np.ndarray) -> np.ndarray:
+        """Copia um recorte (ex.: anotado) de volta para sua posição no frame."""
+        destino[self.y1:self.y2, self.x1:self.x2] = recorte
+        return destino
+
+
+def criar_recorte(area_quarto: Optional[Tuple[int, int, int, int]],
+                  area_banheiro: Optional[Tuple[int, int, int, int]],
+                  largura: int, altura: int, margem: float = 0.05) -> Optional[RecorteZonas]:
+    """
+    Cria o recorte para as zonas habilitadas (None = nenhuma zona, usar o frame inteiro).
+
+    Passe None para as zonas desabilitadas.
+    """
+    areas = [a for a in (area_quarto, area_banheiro) if a is not None]
+    if not areas:
+        return None
+    return RecorteZonas(areas, largura, altura, margem)
@@ -0,0 +1,116 @@
+"""
+Armazém de Trilhas - IASenior
+Estado por pessoa rastreada (entrada, último avistamento, clipe do evento)
+com expiração por tempo e limite rígido de tamanho. Sem tracking, as chaves
+são posições ("temp_12_34") que nunca se repetem; um dicionário simples
+acumula milhares delas ao longo de semanas de execução.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+
+class RegistroTrilha:
+    """Estado de uma trilha (registro compacto, sem __dict__)."""
+
+    __slots__ = ('chave', 'entrada', 'visto', 'clipe')
+
+    def __init__(self, chave: Hashable, agora: float):
+        self.chave = chave
+        self.entrada = agora
+        self.visto = agora
+        self.clipe: Optional[str] = None
+
+    def __repr__(self):
+        return f"RegistroTrilha({self.chave!r}, entrada={self.entrada:.1f}, visto={self.visto:.1f})"
+
+
+class ArmazemTrilhas:
+    """
+    Trilhas ordenadas pelo último avistamento, com TTL e tamanho máximo.
+
+    `tocar()` cria ou atualiza um registro e o move para o fim da ordem;
+    `expirar()` remove do início enquanto os registros estiverem vencidos, então
+    entrada, saída e expiração custam O(1) por trilha. Acima de `max_itens`,
+    a trilha vista há mais tempo é descartada. Seguro entre threads (o servidor
+    MJPEG atende vários clientes sobre o mesmo estado).
+    """
+
+    def __init__(self, ttl: float, max_itens: int = 256):
+        """
+        Inicializa o armazém.
+
+        Args:
+            ttl: Segundos sem avistamento até a trilha expirar
+            max_itens: Máximo de trilhas guardadas
+        """
+        self.ttl = ttl
+        self.max_itens = max(1, max_itens)
+        self._itens: "OrderedDict[Hashable, RegistroTrilha]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Estatísticas
+        self.expiradas = 0
+        self.descartadas = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def __contains__(self, chave: Hashable) -> bool:
+        return chave in self._itens
+
+    def obter(self, chave: Hashable) -> Optional[RegistroTrilha]:
+        return self._itens.get(chave)
+
+    def tocar(self, chave: Hashable, agora: float) -> Tuple[RegistroTrilha, bool]:
+        """
+        Marca a trilha como vista agora.
+
+        Returns:
+            (registro, nova) - nova=True se a trilha acabou de ser criada
+        """
+        with self._lock:
+            registro = self._itens.get(chave)
+            if registro is not None:
+                registro.visto = agora
+                self._itens.move_to_end(chave)
+                return registro, False
+
+            registro = self._itens[chave] = RegistroTrilha(chave, agora)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.descartadas += 1
+            return registro, True
+
+    def expirar(self, agora: float, ttl: Optional[float] = None) -> List[RegistroTrilha]:
+        """
+        Remove as trilhas não vistas há mais de `ttl` segundos (padrão: o do armazém).
+
+        Returns:
+            Registros removidos, do mais antigo ao mais recente
+        """
+        limite = agora - (self.ttl if ttl is None else ttl)
+        removidos = []
+        with self._lock:
+            while self._itens:
+                registro = next(iter(self._itens.values()))
+                if registro.visto >= limite:
+                    break
+                self._itens.popitem(last=False)
+                removidos.append(registro)
+        self.expiradas += len(removidos)
+        return removidos
+
+    def remover(self, chave: Hashable) -> Optional[RegistroTrilha]:
+        with self._lock:
+            return self._itens.pop(chave, None)
+
+    def registros(self) -> List[RegistroTrilha]:
+        """Cópia dos registros atuais (segura para iterar enquanto outra thread atualiza)."""
+        with self._lock:
+            return list(self._itens.values())
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
@@ -0,0 +1,338 @@
+"""
+Troca de Modelo a Quente - IASenior
+Substitui os pesos em uso (modelo principal, modelo customizado de quedas)
+sem parar o stream: o novo modelo é carregado, aquecido e validado em uma
+thread de fundo, e a troca acontece entre dois frames, na thread que usa o
+modelo. Falhas na validação mantêm o modelo atual; falhas logo após a troca
+(período probatório) voltam automaticamente ao modelo anterior.
+
+Uma troca é pedida por:
+- alteração do arquivo de pesos (tamanho/data de modificação, depois de estável);
+- arquivo de comando (JSON) com o novo caminho, consumido ao ser lido:
+
+      {"alvo": "principal", "caminho": "/modelos/yolov8s_v2.pt"}
+
+- `solicitar()` / `solicitar_todos()` (ex.: SIGHUP no stream).
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Assinatura = Tuple[int, int]  # (mtime_ns, tamanho)
+
+
+def _assinatura(caminho: Union[str, Path]) -> Optional[Assinatura]:
+    try:
+        stat = Path(caminho).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def validar_modelo(modelo, frame: np.ndarray, classes: Tuple[int, ...] = (), rastrear: bool = False,
+                   **kwargs):
+    """
+    Inferência de teste: o modelo precisa rodar sobre o frame e conhecer as classes usadas.
+
+    Args:
+        modelo: Modelo Ultralytics recém-carregado
+        frame: Frame de referência (BGR)
+        classes: Ids de classe que o pipeline consulta (ex.: PERSON_CLASS_ID)
+        rastrear: Validar com model.track(persist=True), que também registra o
+            tracker no modelo (pré-requisito de `transferir_rastreamento`)
+        **kwargs: Repassados a predict (imgsz, conf, ...)
+
+    Raises:
+        ValueError: Resultado fora do formato esperado ou classe ausente
+    """
+    nomes = getattr(modelo, 'names', None) or {}
+    ausentes = [c for c in classes if nomes and c not in nomes]
+    if ausentes:
+        raise ValueError(f"Classes {ausentes} ausentes no modelo ({len(nomes)} classes)")
+    # Duas passagens: a primeira aquece (alocação, kernels); a segunda é a verificação
+    inferir = (lambda: modelo.track(frame, persist=True, verbose=False, **kwargs)) if rastrear \
+        else (lambda: modelo.predict(frame, verbose=False, **kwargs))
+    for _ in range(2):
+        resultados = inferir()
+    if not resultados or not hasattr(resultados[0], 'boxes'):
+        raise ValueError("Inferência de teste não retornou caixas")
+
+
+def transferir_rastreamento(antigo, novo) -> bool:
+    """
+    Passa os trackers do Ultralytics (model.track com persist=True) do modelo
+    antigo para o novo, preservando os ids das pessoas (e os cronômetros do
+    banheiro associados a eles).
+
+    Returns:
+        True se havia estado de tracking para transferir
+    """
+    predictor_antigo = getattr(antigo, 'predictor', None)
+    trackers = getattr(predictor_antigo, 'trackers', None)
+    predictor_novo = getattr(novo, 'predictor', None)
+    if trackers is None or predictor_novo is None:
+        return False
+    predictor_novo.trackers = trackers
+    if hasattr(predictor_antigo, 'vid_path'):
+        predictor_novo.vid_path = predictor_antigo.vid_path
+    return True
+
+
+class AlvoTroca:
+    """Um modelo trocável: como carregar, validar, aplicar e descartar."""
+
+    def __init__(self, nome: str, caminho: Union[str, Path], carregar: Callable[[str], Any],
+                 aplicar: Callable[[Any], Any], validar: Optional[Callable[[Any], None]] = None,
+                 descartar: Optional[Callable[[Any], None]] = None, observar_arquivo: bool = True):
+        self.nome = nome
+        self.caminho = str(caminho)
+        self.carregar = carregar
+        self.aplicar = aplicar
+        self.validar = validar
+        self.descartar = descartar
+        self.observar_arquivo = observar_arquivo
+
+        self.assinatura = _assinatura(caminho)     # dos pesos em uso
+        self._vista: Optional[Assinatura] = None   # última lida (espera estabilizar)
+        self._rejeitada: Optional[Assinatura] = None
+
+        # Troca pronta para aplicar e período probatório da última troca
+        self.pronto: Optional[Tuple[Any, str, Optional[Assinatura]]] = None
+        self.anterior: Optional[Tuple[Any, str, Optional[Assinatura]]] = None
+        self.frames_probatorios = 0
+
+        # Estatísticas
+        self.trocas = 0
+        self.rejeicoes = 0
+        self.reversoes = 0
+
+
+class GerenciadorTrocaModelo:
+    """
+    Observa os pesos dos alvos registrados e prepara trocas em segundo plano.
+
+    A thread que usa o modelo chama `aplicar_pendentes()` entre frames e
+    informa o resultado de cada inferência com `registrar_sucesso/falha()`.
+    """
+
+    def __init__(self, intervalo: float = 5.0, caminho_comando: Optional[Union[str, Path]] = None,
+                 frames_probatorios: int = 30, falhas_para_reverter: int = 3):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            intervalo: Segundos entre verificações dos arquivos
+            caminho_comando: Arquivo JSON de comandos de troca (None = desabilitado)
+            frames_probatorios: Inferências após a troca em que falhas provocam reversão
+            falhas_para_reverter: Falhas no período probatório que revertem a troca
+        """
+        self.intervalo = intervalo
+        self.caminho_comando = Path(caminho_comando) if caminho_comando else None
+        self.frames_probatorios = frames_probatorios
+        self.falhas_para_reverter = max(1, falhas_para_reverter)
+
+        self.alvos: Dict[str, AlvoTroca] = {}
+        self._pedidos: Dict[str, Optional[str]] = {}
+        self._falhas: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._recarregar_todos = False  # marcado por handler de sinal (sem locks)
+        self._thread: Optional[threading.Thread] = None
+
+    def registrar(self, alvo: AlvoTroca):
+        self.alvos[alvo.nome] = alvo
+
+    def iniciar(self):
+        """Sobe a thread de observação e carga."""
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="troca-modelo", daemon=True)
+        self._thread.start()
+        alvos = ", ".join(f"{a.nome}={a.caminho}" for a in self.alvos.values())
+        logger.info(f"🔁 Troca de modelo a quente habilitada ({alvos})")
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---------------------------------------------------------------- pedidos
+
+    def solicitar(self, nome: str, caminho: Optional[str] = None):
+        """Pede a troca do alvo (None = recarregar os pesos do caminho atual)."""
+        if nome not in self.alvos:
+            raise KeyError(f"Alvo de troca desconhecido: {nome}")
+        with self._lock:
+            self._pedidos[nome] = caminho
+        self._acordar.set()
+
+    def solicitar_todos(self):
+        """Recarrega todos os alvos. Seguro para chamar de um handler de sinal."""
+        self._recarregar_todos = True
+
+    def _ler_comando(self):
+        if not self.caminho_comando or not self.caminho_comando.exists():
+            return
+        try:
+            dados = json.loads(self.caminho_comando.read_text(encoding='utf-8'))
+            self.caminho_comando.unlink()
+        except Exception as e:
+            logger.warning(f"⚠️ Comando de troca de modelo inválido em {self.caminho_comando}: {e}")
+            return
+        for comando in dados if isinstance(dados, list) else [dados]:
+            try:
+                self.solicitar(comando.get('alvo', 'principal'), comando.get('caminho'))
+            except KeyError as e:
+                logger.warning(f"⚠️ {e}")
+
+    def _verificar_arquivos(self):
+        for alvo in self.alvos.values():
+            if not alvo.observar_arquivo:
+                continue
+            assinatura = _assinatura(alvo.caminho)
+            pronta = alvo.pronto[2] if alvo.pronto else None
+            if assinatura is None or assinatura in (alvo.assinatura, alvo._rejeitada, pronta):
+                alvo._vista = None
+                continue
+            # Só carrega depois de duas leituras iguais (cópia/treino terminou de gravar)
+            if assinatura == alvo._vista:
+                logger.info(f"📦 Pesos de '{alvo.nome}' alterados em {alvo.caminho}")
+                with self._lock:
+                    self._pedidos.setdefault(alvo.nome, None)
+                alvo._vista = None
+            else:
+                alvo._vista = assinatura
+
+    # ---------------------------------------------------------------- carga
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            if self._parar.is_set():
+                break
+            if self._recarregar_todos:
+                self._recarregar_todos = False
+                with self._lock:
+                    for nome in self.alvos:
+                        self._pedidos.setdefault(nome, None)
+            try:
+                self._ler_comando()
+                self._verificar_arquivos()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao verificar modelos: {e}")
+
+            with self._lock:
+                pedidos, self._pedidos = self._pedidos, {}
+            for nome, caminho in pedidos.items():
+                self._preparar(self.alvos[nome], caminho or self.alvos[nome].caminho)
+
+    def _preparar(self, alvo: AlvoTroca, caminho: str):
+        """Carrega e valida o novo modelo; se aprovado, deixa-o pronto para a troca."""
+        assinatura = _assinatura(caminho)
+        if assinatura is None:
+            logger.error(f"❌ Modelo '{alvo.nome}' não encontrado em {caminho}")
+            return
+
+        logger.info(f"🔄 Carregando novo modelo '{alvo.nome}' de {caminho}...")
+        inicio = time.perf_counter()
+        modelo = None
+        try:
+            modelo = alvo.carregar(caminho)
+            if alvo.validar:
+                alvo.validar(modelo)
+        except Exception as e:
+            alvo.rejeicoes += 1
+            alvo._rejeitada = assinatura
+            logger.error(f"❌ Novo modelo '{alvo.nome}' reprovado ({e}). Mantendo o atual.")
+            if modelo is not None and alvo.descartar:
+                alvo.descartar(modelo)
+            return
+
+        with self._lock:
+            substituido, alvo.pronto = alvo.pronto, (modelo, caminho, assinatura)
+        if substituido and alvo.descartar:
+            alvo.descartar(substituido[0])
+        logger.info(
+            f"✅ Novo modelo '{alvo.nome}' pronto em {time.perf_counter() - inicio:.1f}s; "
+            f"troca no próximo frame"
+        )
+
+    # ---------------------------------------------------------------- troca (thread do modelo)
+
+    def aplicar_pendentes(self):
+        """Aplica as trocas prontas. Chamar entre frames, na thread que usa os modelos."""
+        if not any(alvo.pronto for alvo in self.alvos.values()):
+            return
+        for alvo in self.alvos.values():
+            with self._lock:
+                pronto, alvo.pronto = alvo.pronto, None
+            if pronto is None:
+                continue
+            modelo, caminho, assinatura = pronto
+            antigo = alvo.aplicar(modelo)
+
+            # O anterior só é liberado ao fim do período probatório
+            if alvo.anterior is not None and alvo.descartar:
+                alvo.descartar(alvo.anterior[0])
+            alvo.anterior = (antigo, alvo.caminho, alvo.assinatura)
+            alvo.caminho, alvo.assinatura = caminho, assinatura
+            alvo.frames_probatorios = self.frames_probatorios
+            self._falhas[alvo.nome] = 0
+            alvo.trocas += 1
+            logger.info(f"🔁 Modelo '{alvo.nome}' trocado para {caminho}")
+
+    def registrar_sucesso(self, nome: str):
+        """Inferência bem-sucedida com o alvo (conta para o período probatório)."""
+        alvo = self.alvos.get(nome)
+        if alvo is None or alvo.anterior is None:
+            return
+        alvo.frames_probatorios -= 1
+        if alvo.frames_probatorios <= 0:
+            anterior, alvo.anterior = alvo.anterior, None
+            if alvo.descartar:
+                alvo.descartar(anterior[0])
+            logger.info(f"✅ Modelo '{alvo.nome}' confirmado após o período probatório")
+
+    def registrar_falha(self, nome: str):
+        """Inferência com erro; no período probatório, reverte para o modelo anterior."""
+        alvo = self.alvos.get(nome)
+        if alvo is None or alvo.anterior is None:
+            return
+        self._falhas[nome] = self._falhas.get(nome, 0) + 1
+        if self._falhas[nome] < self.falhas_para_reverter:
+            return
+
+        anterior, alvo.anterior = alvo.anterior, None
+        modelo, caminho, assinatura = anterior
+        rejeitado = alvo.aplicar(modelo)
+        if alvo.caminho == caminho:
+            # Pesos trocados no mesmo arquivo: não recarregar até que mudem de novo
+            alvo._rejeitada = alvo.assinatura
+        alvo.caminho, alvo.assinatura = caminho, assinatura
+        alvo.reversoes += 1
+        if alvo.descartar:
+            alvo.descartar(rejeitado)
+        logger.error(f"⏪ Modelo '{alvo.nome}' falhou após a troca. Revertido para {caminho}")
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            nome: {
+                'caminho': alvo.caminho,
+                'trocas': alvo.trocas,
+                'rejeicoes': alvo.rejeicoes,
+                'reversoes': alvo.reversoes,
+                'probatorio': alvo.anterior is not None,
+            }
+            for nome, alvo in self.alvos.items()
+        }
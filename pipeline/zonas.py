@@ -0,0 +1,268 @@
+"""
+Zonas Poligonais - IASenior
+Zonas de monitoramento (quarto, banheiro, cama, porta, poltrona...) descritas
+por polígonos em coordenadas normalizadas. Cada resolução é rasterizada uma
+única vez em uma máscara de bits por pixel (bit i = zona i), e o pertencimento
+de todas as detecções sai de uma única indexação vetorizada nessa máscara.
+
+Arquivo de zonas (gravado por calibracao_visual.py):
+
+    {
+      "zonas": [
+        {"nome": "Banheiro", "tipo": "banheiro", "pontos": [[0.6, 0.0], [1.0, 0.0], [1.0, 1.0], [0.6, 1.0]]},
+        {"nome": "Cama", "tipo": "cama", "pontos": [[0.1, 0.5], [0.4, 0.5], [0.4, 0.9], [0.1, 0.9]]}
+      ],
+      "cameras": {"quarto2": {"zonas": [...]}}
+    }
+
+`cameras` é opcional e substitui a lista padrão para a câmera com esse nome.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .publicador_estado import escrever_atomico
+
+logger = logging.getLogger(__name__)
+
+TIPO_QUARTO = 'quarto'
+TIPO_BANHEIRO = 'banheiro'
+
+# Cor do contorno no overlay (BGR) por tipo de zona
+CORES_TIPO = {
+    TIPO_QUARTO: (0, 255, 0),
+    TIPO_BANHEIRO: (255, 0, 0),
+}
+COR_PADRAO = (0, 200, 200)
+
+MAX_ZONAS = 32
+
+
+class Zona:
+    """Polígono nomeado em coordenadas normalizadas (0.0 a 1.0)."""
+
+    def __init__(self, nome: str, tipo: str, pontos: Sequence[Sequence[float]],
+                 cor: Optional[Tuple[int, int, int]] = None):
+        """
+        Inicializa a zona.
+
+        Args:
+            nome: Rótulo exibido no overlay
+            tipo: Categoria usada pela lógica ("quarto", "banheiro" ou livre)
+            pontos: Vértices [(x, y), ...] normalizados, com ao menos 3 pontos
+            cor: Cor BGR do contorno (None = cor do tipo)
+        """
+        pontos = np.asarray(pontos, dtype=np.float64).reshape(-1, 2)
+        if len(pontos) < 3:
+            raise ValueError(f"Zona '{nome}' precisa de ao menos 3 pontos")
+        self.nome = nome
+        self.tipo = tipo.lower()
+        self.pontos = np.clip(pontos, 0.0, 1.0)
+        self.cor = tuple(cor) if cor is not None else CORES_TIPO.get(self.tipo, COR_PADRAO)
+
+    @classmethod
+    def retangulo(cls, nome: str, tipo: str, area: Sequence[float]) -> 'Zona':
+        """Zona a partir de uma área retangular normalizada (x1, y1, x2, y2)."""
+        x1, y1, x2, y2 = area
+        return cls(nome, tipo, [(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
+
+    def pontos_px(self, largura: int, altura: int) -> np.ndarray:
+        """Vértices em pixels (int32), no formato de cv2.fillPoly/polylines."""
+        escala = np.array([largura, altura], dtype=np.float64)
+        return np.round(self.pontos * escala).astype(np.int32)
+
+    def retangulo_px(self, largura: int, altura: int) -> Tuple[int, int, int, int]:
+        """Retângulo envolvente em pixels (x1, y1, x2, y2)."""
+        pontos = self.pontos_px(largura, altura)
+        x1, y1 = pontos.min(axis=0)
+        x2, y2 = pontos.max(axis=0)
+        return int(x1), int(y1), int(x2), int(y2)
+
+    def para_dict(self) -> Dict:
+        dados = {'nome': self.nome, 'tipo': self.tipo,
+                 'pontos': [[round(float(x), 4), round(float(y), 4)] for x, y in self.pontos]}
+        if self.cor != CORES_TIPO.get(self.tipo, COR_PADRAO):
+            dados['cor'] = list(self.cor)
+        return dados
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'Zona':
+        return cls(dados['nome'], dados.get('tipo', dados['nome']), dados['pontos'], dados.get('cor'))
+
+
+class MascaraZonas:
+    """
+    Zonas rasterizadas em uma resolução: um inteiro por pixel com um bit por zona.
+
+    Zonas podem se sobrepor (a cama dentro do quarto): cada pixel guarda o
+    conjunto de zonas que o contêm.
+    """
+
+    def __init__(self, zonas: Sequence[Zona], largura: int, altura: int):
+        self.zonas = list(zonas)
+        self.largura = largura
+        self.altura = altura
+
+        n = len(self.zonas)
+        tipo = np.uint8 if n <= 8 else np.uint16 if n <= 16 else np.uint32
+        self.bits = np.zeros((altura, largura), dtype=tipo)
+        camada = np.zeros((altura, largura), dtype=np.uint8)
+        for i, zona in enumerate(self.zonas):
+            camada.fill(0)
+            cv2.fillPoly(camada, [zona.pontos_px(largura, altura)], 1)
+            self.bits[camada.astype(bool)] |= tipo(1 << i)
+
+        # Bits de cada tipo e de cada nome, para testes de pertencimento por máscara
+        self.bits_tipo: Dict[str, int] = {}
+        self.bits_nome: Dict[str, int] = {}
+        for i, zona in enumerate(self.zonas):
+            self.bits_tipo[zona.tipo] = self.bits_tipo.get(zona.tipo, 0) | (1 << i)
+            self.bits_nome[zona.nome] = self.bits_nome.get(zona.nome, 0) | (1 << i)
+
+    def bits_em(self, pontos: np.ndarray) -> np.ndarray:
+        """Conjunto de zonas (bits) de cada ponto (N, 2) em pixels."""
+        if len(pontos) == 0:
+            return np.zeros(0, dtype=self.bits.dtype)
+        xs = np.clip(pontos[:, 0].astype(np.intp), 0, self.largura - 1)
+        ys = np.clip(pontos[:, 1].astype(np.intp), 0, self.altura - 1)
+        return self.bits[ys, xs]
+
+    def contem(self, bits: np.ndarray, tipo: str) -> np.ndarray:
+        """Máscara (N,) dos pontos dentro de alguma zona do tipo."""
+        return (bits & self.bits_tipo.get(tipo, 0)) != 0
+
+    def na_zona(self, bits: np.ndarray, nome: str) -> np.ndarray:
+        """Máscara (N,) dos pontos dentro da zona com esse nome."""
+        return (bits & self.bits_nome.get(nome, 0)) != 0
+
+    def tem_tipo(self, tipo: str) -> bool:
+        return tipo in self.bits_tipo
+
+
+class MapaZonas:
+    """Zonas de uma câmera, com as máscaras rasterizadas em cache por resolução."""
+
+    def __init__(self, zonas: Sequence[Zona]):
+        if len(zonas) > MAX_ZONAS:
+            raise ValueError(f"No máximo {MAX_ZONAS} zonas por câmera ({len(zonas)} configuradas)")
+        self.zonas = list(zonas)
+        self._mascaras: Dict[Tuple[int, int], MascaraZonas] = {}
+
+    def __len__(self) -> int:
+        return len(self.zonas)
+
+    def mascara(self, largura: int, altura: int) -> MascaraZonas:
+        """Máscara na resolução pedida (rasterizada só na primeira vez)."""
+        chave = (largura, altura)
+        mascara = self._mascaras.get(chave)
+        if mascara is None:
+            mascara = self._mascaras[chave] = MascaraZonas(self.zonas, largura, altura)
+        return mascara
+
+    def do_tipo(self, tipo: str) -> List[Zona]:
+        return [z for z in self.zonas if z.tipo == tipo]
+
+    def retangulo_tipo(self, tipo: str, largura: int, altura: int) -> Optional[Tuple[int, int, int, int]]:
+        """Retângulo envolvente em pixels das zonas de um tipo (None se não houver)."""
+        retangulos = [z.retangulo_px(largura, altura) for z in self.do_tipo(tipo)]
+        if not retangulos:
+            return None
+        return (
+            min(r[0] for r in retangulos), min(r[1] for r in retangulos),
+            max(r[2] for r in retangulos), max(r[3] for r in retangulos)
+        )
+
+    def poligonos_overlay(self, largura: int, altura: int, ignorar_tipos: Sequence[str] = ()) -> list:
+        """Zonas no formato de RenderizadorOverlay.definir_zonas (pontos em pixels)."""
+        return [
+            (z.pontos_px(largura, altura), z.nome, z.cor)
+            for z in self.zonas if z.tipo not in ignorar_tipos
+        ]
+
+
+def zonas_retangulares(area_quarto: Optional[Sequence[float]],
+                       area_banheiro: Optional[Sequence[float]]) -> List[Zona]:
+    """Zonas quarto/banheiro a partir das áreas retangulares da configuração."""
+    zonas = []
+    if area_quarto is not None:
+        zonas.append(Zona.retangulo("Quarto", TIPO_QUARTO, area_quarto))
+    if area_banheiro is not None:
+        zonas.append(Zona.retangulo("Banheiro", TIPO_BANHEIRO, area_banheiro))
+    return zonas
+
+
+def carregar_zonas(caminho: Union[str, Path, None], area_quarto: Optional[Sequence[float]] = None,
+                   area_banheiro: Optional[Sequence[float]] = None,
+                   camera: Optional[str] = None) -> MapaZonas:
+    """
+    Carrega as zonas de uma câmera do arquivo de zonas.
+
+    Sem arquivo (ou com erro de leitura), usa as áreas retangulares da
+    configuração (ROOM_AREA/BATHROOM_AREA), como antes dos polígonos. Um
+    arquivo sem zona do tipo quarto ou banheiro (só "Cama" e "Porta", por
+    exemplo) recebe o retângulo da configuração para o tipo que falta, com
+    aviso: sem ele, o banheiro deixaria de ser monitorado em silêncio.
+
+    Args:
+        caminho: Arquivo JSON de zonas
+        area_quarto: Área retangular padrão do quarto (normalizada)
+        area_banheiro: Área retangular padrão do banheiro (normalizada)
+        camera: Nome da câmera (usa a lista específica, se houver)
+    """
+    if caminho and Path(caminho).exists():
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            lista = dados.get('zonas', [])
+            if camera and camera in dados.get('cameras', {}):
+                lista = dados['cameras'][camera].get('zonas', lista)
+            zonas = [Zona.de_dict(z) for z in lista]
+            if zonas:
+                logger.info(f"📐 {len(zonas)} zona(s) carregada(s) de {caminho}"
+                            + (f" para '{camera}'" if camera else ""))
+                tipos = {z.tipo for z in zonas}
+                for padrao in zonas_retangulares(area_quarto, area_banheiro):
+                    if padrao.tipo not in tipos:
+                        logger.warning(
+                            f"⚠️ {caminho} não tem zona do tipo '{padrao.tipo}'"
+                            + (f" para '{camera}'" if camera else "")
+                            + ": usando a área retangular da configuração"
+                        )
+                        zonas.append(padrao)
+                return MapaZonas(zonas)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao carregar zonas de {caminho}: {e}. Usando áreas da configuração")
+    return MapaZonas(zonas_retangulares(area_quarto, area_banheiro))
+
+
+def salvar_zonas(caminho: Union[str, Path], zonas: Sequence[Zona], camera: Optional[str] = None):
+    """
+    Grava as zonas no arquivo (atômico), preservando as das demais câmeras.
+
+    Args:
+        caminho: Arquivo JSON de zonas
+        zonas: Zonas a gravar
+        camera: Nome da câmera (None = lista padrão)
+    """
+    caminho = Path(caminho)
+    dados = {}
+    if caminho.exists():
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except Exception:
+            dados = {}
+
+    lista = [z.para_dict() for z in zonas]
+    if camera:
+        dados.setdefault('cameras', {})[camera] = {'zonas': lista}
+    else:
+        dados['zonas'] = lista
+    dados['atualizado'] = datetime.now().isoformat()
+    escrever_atomico(caminho, json.dumps(dados, indent=2, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,53 @@
+"""
+Exporta os pesos YOLO (.pt) para os backends de inferência em CPU.
+Os artefatos ficam ao lado dos pesos e são reaproveitados enquanto
+estiverem mais novos que o .pt.
+
+Uso:
+    python scripts/exportar_modelo.py                      # todos os backends
+    python scripts/exportar_modelo.py --backend onnx_int8
+    python scripts/exportar_modelo.py --modelo modelos/queda_custom.pt --imgsz 480 --forcar
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path para importar config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import MODELS_DIR, INFERENCE_IMGSZ
+from pipeline.backends import BACKENDS, exportar
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Exportar modelo YOLO para backends de CPU")
+    parser.add_argument("--modelo", type=str, default=str(MODELS_DIR / "queda_custom.pt"),
+                        help="Caminho dos pesos .pt (padrão: modelos/queda_custom.pt)")
+    parser.add_argument("--backend", type=str, default="todos",
+                        choices=["todos"] + [b for b in BACKENDS if b != 'pytorch'],
+                        help="Backend a exportar (padrão: todos)")
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_IMGSZ, help="Tamanho de entrada")
+    parser.add_argument("--forcar", action="store_true", help="Exportar mesmo com artefato em cache")
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS if b != 'pytorch'] if args.backend == "todos" else [args.backend]
+
+    falhas = 0
+    for backend in backends:
+        try:
+            artefato = exportar(args.modelo, backend, imgsz=args.imgsz, forcar=args.forcar)
+            print(f"✅ {backend}: {artefato}")
+        except Exception as e:
+            falhas += 1
+            logger.error(f"❌ {backend}: {e}")
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
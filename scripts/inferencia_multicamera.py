@@ -0,0 +1,174 @@
+"""
+Inferência multi-câmera em lote.
+Um único processo e um único modelo YOLO atendem N câmeras: a cada ciclo os
+frames mais recentes são inferidos em um só `predict` e os resultados voltam
+para o estado de zonas/banheiro/quedas de cada câmera.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path para importar config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import (
+    FRAME_WIDTH, FRAME_HEIGHT, FPS, MODEL_PATH, CONFIDENCE_THRESHOLD, LOGS_DIR,
+    PERSON_CLASS_ID, FALL_DETECTION_ENABLED, TRACKING_ENABLED, TRACKER_IOU, TRACKER_MAX_LOST,
+    ROOM_COUNT_ENABLED, ROOM_USE_AREA, ROOM_AREA,
+    BATHROOM_MONITORING_ENABLED, BATHROOM_TIME_LIMIT_SECONDS, BATHROOM_EXIT_GRACE_SECONDS,
+    TRACK_STORE_MAX, BATHROOM_AREA, ZONES_CONFIG_PATH,
+    NOTIFICATIONS_ENABLED, CAMERAS, MULTICAM_BATCH_SIZE, MULTICAM_STATUS_PATH,
+    FALL_CASCADE_HEARTBEAT_SECONDS, FALL_CASCADE_ASPECT_RATIO,
+    FALL_CASCADE_LOW_POSITION, FALL_CASCADE_HEIGHT_DROP,
+    INFERENCE_WORKERS, INFERENCE_WORKER_THREADS, INFERENCE_WORKER_TIMEOUT, DB_ENABLED,
+    CLIP_ENABLED, CLIP_DIR, CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_FPS, CLIP_JPEG_QUALITY, CLIP_MAX_MB
+)
+from pipeline.backends import carregar_modelo
+from pipeline.cascata_queda import GatilhoCascataQueda
+from pipeline.gravador_clipes import GravadorClipes
+from pipeline.monitoramento import MonitorCamera
+from pipeline.multicamera import CameraMonitorada, MotorMultiCamera, criar_fonte, parse_cameras
+from pipeline.pool_inferencia import PoolInferencia
+from pipeline.rastreador import RastreadorSORT
+from pipeline.zonas import carregar_zonas
+
+# Configurar logging
+log_file = LOGS_DIR / "inferencia_multicamera.log"
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(log_file),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Importar detector customizado se disponível
+try:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "datasets" / "quedas"))
+    from inferencia_quedas import DetectorQuedaCustomizado
+    DETECTOR_CUSTOM_DISPONIVEL = True
+except ImportError:
+    DETECTOR_CUSTOM_DISPONIVEL = False
+    logger.info("Detector customizado não disponível, usando heurística padrão")
+
+# Importar sistema de notificações
+notificacao_manager = None
+if NOTIFICATIONS_ENABLED:
+    try:
+        from notificacoes import get_notificacao_manager
+        notificacao_manager = get_notificacao_manager()
+    except ImportError:
+        logger.warning("Sistema de notificações não disponível")
+
+
+def criar_motor():
+    """Carrega o modelo e monta o motor com as câmeras configuradas em CAMERAS."""
+    logger.info(f"🧠 Carregando modelo YOLO de {MODEL_PATH}...")
+    if not Path(MODEL_PATH).exists():
+        raise FileNotFoundError(f"Modelo não encontrado: {MODEL_PATH}")
+    model, pool = None, None
+    if INFERENCE_WORKERS > 0:
+        pool = PoolInferencia(
+            MODEL_PATH, num_workers=INFERENCE_WORKERS,
+            threads_por_worker=INFERENCE_WORKER_THREADS,
+            largura_max=FRAME_WIDTH, altura_max=FRAME_HEIGHT,
+            tempo_limite=INFERENCE_WORKER_TIMEOUT
+        )
+        pool.iniciar()
+    else:
+        model = carregar_modelo(MODEL_PATH)
+
+    detector_queda = None
+    if DETECTOR_CUSTOM_DISPONIVEL and FALL_DETECTION_ENABLED:
+        modelo_custom = Path(__file__).parent.parent / "modelos" / "queda_custom.pt"
+        if modelo_custom.exists():
+            try:
+                detector_queda = DetectorQuedaCustomizado(
+                    modelo_path=str(modelo_custom),
+                    conf_threshold=CONFIDENCE_THRESHOLD
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Erro ao carregar detector customizado: {e}")
+
+    # Quedas em deteccoes_queda (conexão só agora, não na importação)
+    persistencia = None
+    if DB_ENABLED:
+        try:
+            from persistencia import get_persistencia_manager
+            persistencia = get_persistencia_manager()
+        except ImportError as e:
+            logger.warning(f"⚠️ Persistência não disponível: {e}")
+
+    cameras = []
+    for nome, especificacao in parse_cameras(CAMERAS):
+        # Anel de JPEGs por câmera: memória limitada mesmo com muitas câmeras
+        gravador = GravadorClipes(
+            CLIP_DIR, nome=nome, segundos_antes=CLIP_PRE_SECONDS, segundos_depois=CLIP_POST_SECONDS,
+            fps=CLIP_FPS, qualidade_jpeg=CLIP_JPEG_QUALITY, max_bytes=int(CLIP_MAX_MB * 1024 * 1024)
+        ) if CLIP_ENABLED else None
+        monitor = MonitorCamera(
+            nome=nome,
+            limite_banheiro_segundos=BATHROOM_TIME_LIMIT_SECONDS,
+            contagem_quarto_habilitada=ROOM_COUNT_ENABLED,
+            monitoramento_banheiro_habilitado=BATHROOM_MONITORING_ENABLED,
+            notificacao_manager=notificacao_manager,
+            tolerancia_saida_segundos=BATHROOM_EXIT_GRACE_SECONDS,
+            max_trilhas=TRACK_STORE_MAX,
+            gravador_clipes=gravador,
+            persistencia=persistencia
+        )
+        gatilho = None
+        if detector_queda:
+            gatilho = GatilhoCascataQueda(
+                proporcao_max=FALL_CASCADE_ASPECT_RATIO,
+                posicao_min=FALL_CASCADE_LOW_POSITION,
+                queda_altura=FALL_CASCADE_HEIGHT_DROP,
+                intervalo_batimento=FALL_CASCADE_HEARTBEAT_SECONDS
+            )
+        cameras.append(CameraMonitorada(
+            nome, criar_fonte(especificacao, FRAME_WIDTH, FRAME_HEIGHT),
+            FRAME_WIDTH, FRAME_HEIGHT, ROOM_AREA, BATHROOM_AREA,
+            monitor=monitor, gatilho_queda=gatilho,
+            zonas=carregar_zonas(ZONES_CONFIG_PATH, ROOM_AREA, BATHROOM_AREA, camera=nome),
+            # Estado de tracking por câmera (o do Ultralytics não separa câmeras no lote)
+            rastreador=RastreadorSORT(
+                iou_min=TRACKER_IOU, max_perdidos=TRACKER_MAX_LOST
+            ) if TRACKING_ENABLED else None
+        ))
+
+    if not cameras:
+        raise ValueError("Nenhuma câmera configurada em CAMERAS")
+
+    return MotorMultiCamera(
+        model, cameras,
+        conf_threshold=CONFIDENCE_THRESHOLD,
+        classe_pessoa=PERSON_CLASS_ID,
+        usar_area_quarto=ROOM_USE_AREA,
+        tamanho_lote=MULTICAM_BATCH_SIZE,
+        detector_queda=detector_queda,
+        queda_habilitada=FALL_DETECTION_ENABLED,
+        status_path=Path(MULTICAM_STATUS_PATH),
+        pool=pool
+    )
+
+
+def main():
+    """Função principal."""
+    motor = None
+    try:
+        motor = criar_motor()
+        motor.executar(FPS)
+    except KeyboardInterrupt:
+        logger.info("🛑 Interrompido manualmente pelo usuário.")
+    except Exception as e:
+        logger.critical(f"❌ Erro crítico: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        if motor and motor.pool:
+            motor.pool.parar()
+
+
+if __name__ == "__main__":
+    main()
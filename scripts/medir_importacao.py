@@ -0,0 +1,146 @@
+"""
+Mede o tempo de importação de cada ponto de entrada e compara com o orçamento.
+Cada medição roda em um interpretador novo (sem cache de módulos) e também
+verifica se algum pacote pesado (torch, ultralytics, runtimes de inferência)
+foi carregado já na importação, em vez de no primeiro uso.
+
+Uso:
+    python scripts/medir_importacao.py                 # tabela + código de saída 1 se estourar
+    python scripts/medir_importacao.py --repeticoes 5 --detalhe
+    python scripts/medir_importacao.py --fator 2       # orçamento relaxado (máquina lenta)
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).parent.parent
+
+# Pacotes que só podem ser importados no primeiro uso
+PESADOS = ('torch', 'ultralytics', 'onnxruntime', 'openvino', 'tensorflow', 'av')
+
+# (ponto de entrada, tipo, orçamento em ms). Orçamentos com folga de ~1,5-2x
+# sobre a menor medição em uma máquina de desenvolvimento: numpy sozinho custa
+# 100-150 ms a frio (agents), email.mime/smtplib ~50 ms (notificacoes)
+ENTRADAS = [
+    ('config', 'modulo', 50),
+    ('pipeline', 'modulo', 20),
+    ('pipeline.backends', 'modulo', 80),
+    ('notificacoes', 'modulo', 150),
+    ('database', 'modulo', 150),
+    ('agents', 'modulo', 300),
+    ('datasets/quedas/inferencia_quedas.py', 'script', 400),
+    ('scripts/stream_inferencia_rtsp.py', 'script', 600),
+    ('scripts/inferencia_multicamera.py', 'script', 500),
+    ('mjpeg_server.py', 'script', 600),
+    ('mjpeg_server_com_deteccoes.py', 'script', 800),
+]
+
+MARCADOR = '@@medicao@@'
+
+CODIGO = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+tipo, alvo = {tipo!r}, {alvo!r}
+antes = set(sys.modules)
+inicio = time.perf_counter()
+erro = None
+try:
+    if tipo == 'modulo':
+        import importlib
+        importlib.import_module(alvo)
+    else:
+        import runpy
+        sys.argv = [alvo]
+        runpy.run_path(alvo, run_name='__medicao__')
+except BaseException as e:
+    erro = f"{{type(e).__name__}}: {{e}}"
+ms = (time.perf_counter() - inicio) * 1000
+pesados = sorted(m for m in {pesados!r} if m in sys.modules)
+novos = sorted(set(sys.modules) - antes)
+print({marcador!r} + json.dumps({{'ms': ms, 'pesados': pesados, 'erro': erro, 'novos': novos}}), flush=True)
+"""
+
+
+def medir(alvo: str, tipo: str, detalhe: bool = False) -> dict:
+    """
+    Importa o ponto de entrada em um interpretador novo.
+
+    Returns:
+        {'ms', 'pesados', 'erro'} e, com detalhe, 'mais_lentos' [(ms, módulo)]
+    """
+    caminho = str(RAIZ / alvo) if tipo == 'script' else alvo
+    codigo = CODIGO.format(raiz=str(RAIZ), tipo=tipo, alvo=caminho, pesados=PESADOS, marcador=MARCADOR)
+    comando = [sys.executable] + (['-X', 'importtime'] if detalhe else []) + ['-c', codigo]
+    processo = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True, timeout=300)
+
+    resultado = None
+    for linha in processo.stdout.splitlines():
+        if linha.startswith(MARCADOR):
+            resultado = json.loads(linha[len(MARCADOR):])
+    if resultado is None:
+        resultado = {'ms': 0.0, 'pesados': [], 'erro': f"saída inesperada (código {processo.returncode})"}
+
+    if detalhe:
+        # Linhas "import time: self | cumulative | módulo" (microssegundos),
+        # só dos módulos carregados pelo ponto de entrada (não pela medição)
+        novos = set(resultado.get('novos', []))
+        modulos = []
+        for linha in processo.stderr.splitlines():
+            if not linha.startswith('import time:') or 'self [us]' in linha:
+                continue
+            _, acumulado, modulo = linha[len('import time:'):].split('|')
+            if not modulo.startswith(' ' * 2) and modulo.strip() in novos:  # primeiro nível
+                modulos.append((int(acumulado) / 1000, modulo.strip()))
+        resultado['mais_lentos'] = sorted(modulos, reverse=True)[:8]
+    resultado.pop('novos', None)
+    return resultado
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de importação por ponto de entrada")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Medições por entrada (vale a menor)")
+    parser.add_argument("--fator", type=float, default=1.0, help="Multiplicador dos orçamentos")
+    parser.add_argument("--detalhe", action="store_true", help="Listar os módulos mais lentos de cada entrada")
+    parser.add_argument("--json", type=str, default=None, help="Salvar os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    estouros = 0
+    resultados = {}
+    print(f"{'ponto de entrada':<42} {'ms':>8} {'orçamento':>10}  situação")
+    for alvo, tipo, orcamento in ENTRADAS:
+        orcamento *= args.fator
+        medicoes = [medir(alvo, tipo) for _ in range(max(1, args.repeticoes))]
+        melhor = min(medicoes, key=lambda m: m['ms'])
+        if args.detalhe:
+            melhor['mais_lentos'] = medir(alvo, tipo, detalhe=True)['mais_lentos']
+
+        if melhor['erro'] and 'ModuleNotFoundError' in melhor['erro']:
+            # Dependência opcional ausente nesta máquina: não conta como estouro
+            situacao = f"⚪ não medido ({melhor['erro']})"
+        elif melhor['erro']:
+            situacao = f"❌ erro: {melhor['erro']}"
+            estouros += 1
+        elif melhor['pesados']:
+            situacao = f"❌ importa {', '.join(melhor['pesados'])} na importação"
+            estouros += 1
+        elif melhor['ms'] > orcamento:
+            situacao = "❌ acima do orçamento"
+            estouros += 1
+        else:
+            situacao = "✅"
+        print(f"{alvo:<42} {melhor['ms']:>8.0f} {orcamento:>10.0f}  {situacao}")
+        for ms, modulo in melhor.get('mais_lentos', []):
+            print(f"    {ms:>8.1f} ms  {modulo}")
+        resultados[alvo] = dict(melhor, orcamento_ms=orcamento)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding='utf-8')
+    sys.exit(1 if estouros else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,16 @@ Script de inferência com YOLO para detecção em tempo real via RTSP.
 Melhorado com logging, tratamento de erros e configuração centralizada.
 """
 
-import cv2
-import mss
+import argparse
+import json
 import numpy as np
-import subprocess
 import time
 import logging
+import signal
 import sys
+import threading
 from pathlib import Path
-from collections import defaultdict
-from datetime import datetime, timedelta
-from ultralytics import YOLO
+from datetime import datetime
 
 # Adicionar diretório raiz ao path para importar config
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -21,10 +20,61 @@ from config import (
     MONITOR_IDX, FRAME_WIDTH, FRAME_HEIGHT, FPS, RTSP_URL,
     MODEL_PATH, CONFIDENCE_THRESHOLD, RESULTS_DIR, LOGS_DIR,
     FRAME_PATH, STATUS_PATH, PERSON_CLASS_ID, FALL_DETECTION_ENABLED,
-    TRACKING_ENABLED, ROOM_COUNT_ENABLED, ROOM_USE_AREA, ROOM_AREA,
-    BATHROOM_MONITORING_ENABLED, BATHROOM_TIME_LIMIT_SECONDS, BATHROOM_AREA,
-    ROOM_COUNT_PATH, BATHROOM_STATUS_PATH, NOTIFICATIONS_ENABLED
+    TRACKING_ENABLED, TRACKER, TRACKER_IOU, TRACKER_MAX_LOST,
+    ROOM_COUNT_ENABLED, ROOM_USE_AREA, ROOM_AREA,
+    BATHROOM_MONITORING_ENABLED, BATHROOM_TIME_LIMIT_SECONDS, BATHROOM_EXIT_GRACE_SECONDS,
+    TRACK_STORE_MAX, BATHROOM_AREA, ZONES_CONFIG_PATH,
+    ROOM_COUNT_PATH, BATHROOM_STATUS_PATH, NOTIFICATIONS_ENABLED,
+    PIPELINE_MODE, PIPELINE_QUEUE_SIZE,
+    FALL_CASCADE_ENABLED, FALL_CASCADE_HEARTBEAT_SECONDS, FALL_CASCADE_ASPECT_RATIO,
+    FALL_CASCADE_LOW_POSITION, FALL_CASCADE_HEIGHT_DROP,
+    MOTION_GATE_ENABLED, MOTION_GATE_THRESHOLD, MOTION_GATE_PIXEL_DIFF,
+    MOTION_GATE_WIDTH, MOTION_GATE_FORCE_SECONDS, KEYFRAME_INTERVAL, KEYFRAME_FLOW_WIDTH,
+    ROI_INFERENCE_ENABLED, ROI_MARGIN, CAPTURE_REGION,
+    FFMPEG_PRESET, FFMPEG_TUNE, FFMPEG_QUEUE_SIZE, FFMPEG_RESTART_DELAY, RTSP_PUBLISHER,
+    RTSP_PUBLISH_ENABLED, PANEL_FRAME_ENABLED, STATE_PUBLISH_FPS, PANEL_JPEG_QUALITY,
+    SHM_FRAMES_ENABLED, SHM_FRAMES_NAME, SHM_FRAMES_SLOTS, DB_ENABLED,
+    SHM_RAW_FRAMES_ENABLED, SHM_RAW_FRAMES_NAME,
+    CLIP_ENABLED, CLIP_DIR, CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_FPS, CLIP_JPEG_QUALITY, CLIP_MAX_MB,
+    METRICS_ENABLED, METRICS_HOST, METRICS_PORT, METRICS_WINDOW,
+    INFERENCE_BACKEND, INFERENCE_IMGSZ,
+    INFERENCE_WORKERS, INFERENCE_WORKER_THREADS, INFERENCE_WORKER_TIMEOUT,
+    MODEL_HOT_SWAP_ENABLED, MODEL_WATCH_INTERVAL, MODEL_SWAP_COMMAND_PATH,
+    MODEL_SWAP_PROBATION_FRAMES
 )
+from pipeline.backends import BACKENDS, carregar_modelo
+from pipeline.estagios import FIM, PipelineEstagios
+from pipeline.posprocessamento import extrair_deteccoes
+from pipeline.captura import CapturaTela
+from pipeline.gravador_clipes import GravadorClipes
+from pipeline.cascata_queda import GatilhoCascataQueda
+from pipeline.monitoramento import MonitorCamera
+from pipeline.movimento import DetectorMovimento
+from pipeline.propagacao import PropagadorCaixas
+from pipeline.rastreador import RastreadorSORT
+from pipeline.replay import FonteReplay, ResumoExecucao
+from pipeline.publicador_estado import PublicadorEstado
+from pipeline.memoria_compartilhada import AnelFramesCompartilhado
+from pipeline.metricas import RegistroMetricas, ServidorMetricas
+from pipeline.pool_inferencia import PoolInferencia
+from pipeline.overlay import RenderizadorOverlay, textos_contadores
+from pipeline.publicador_ffmpeg import PublicadorFFmpeg, comando_rtsp
+from pipeline.publicador_pyav import PublicadorPyAV, pyav_disponivel
+from pipeline.roi import criar_recorte
+from pipeline.troca_modelo import AlvoTroca, GerenciadorTrocaModelo, transferir_rastreamento, validar_modelo
+from pipeline.zonas import TIPO_BANHEIRO, TIPO_QUARTO, carregar_zonas
+
+# Configurar logging (antes dos imports opcionais abaixo, que já registram no log)
+log_file = LOGS_DIR / "inferencia.log"
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(log_file),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
 
 # Importar detector customizado se disponível
 try:
@@ -46,34 +96,82 @@ if NOTIFICATIONS_ENABLED:
 else:
     notificacao_manager = None
 
-# Configurar logging
-log_file = LOGS_DIR / "inferencia.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
+
+def obter_persistencia():
+    """Gerenciador de persistência (quedas no banco), ou None sem banco disponível."""
+    if not DB_ENABLED:
+        return None
+    try:
+        from persistencia import get_persistencia_manager
+        return get_persistencia_manager()
+    except ImportError as e:
+        logger.warning(f"⚠️ Persistência não disponível: {e}")
+        return None
 
 
 class StreamInferenciaRTSP:
     """Classe para gerenciar inferência e transmissão RTSP."""
     
-    def __init__(self):
+    def __init__(self, replay=None, repetir_replay=False, max_frames=None, limitar_fps=True,
+                 publicar_rtsp=RTSP_PUBLISH_ENABLED, modo_pipeline=PIPELINE_MODE,
+                 backend=None, imgsz=None, resumo_path=None, workers=None, publicador=None,
+                 efeitos_producao=None):
+        """
+        Inicializa o stream.
+        
+        Args:
+            replay: Vídeo ou diretório usado no lugar da captura de tela (None = monitor)
+            repetir_replay: Recomeçar o replay ao chegar ao fim
+            max_frames: Encerrar após este número de frames (None = sem limite)
+            limitar_fps: Se False, processa o mais rápido possível (sem respeitar FPS)
+            publicar_rtsp: Publicar o vídeo anotado via FFmpeg/RTSP
+            modo_pipeline: "sequencial" ou "estagios"
+            backend: Backend de inferência (None = INFERENCE_BACKEND)
+            imgsz: Tamanho de entrada da inferência (None = INFERENCE_IMGSZ)
+            resumo_path: Arquivo JSON para o resumo de vazão/latência ao final
+            workers: Processos de inferência (None = INFERENCE_WORKERS, 0 = no próprio processo)
+            publicador: "ffmpeg" ou "pyav" (None = RTSP_PUBLISHER)
+            efeitos_producao: Notificações, banco, arquivos do painel, memória
+                compartilhada e /metrics (None = só fora do replay)
+        """
+        self.replay = replay
+        self.repetir_replay = repetir_replay
+        self.max_frames = max_frames
+        self.limitar_fps = limitar_fps
+        self.publicar_rtsp = publicar_rtsp
+        self.modo_pipeline = modo_pipeline
+        self.backend = backend
+        self.imgsz = imgsz or INFERENCE_IMGSZ
+        self.workers = INFERENCE_WORKERS if workers is None else workers
+        self.tipo_publicador = publicador or RTSP_PUBLISHER
+        self.resumo_path = resumo_path
+        self.resumo = ResumoExecucao()
+        # Um replay não envia e-mails, não grava no banco nem sobrescreve o
+        # estado do pipeline de produção (painel, anel, porta de métricas)
+        self.efeitos_producao = replay is None if efeitos_producao is None else efeitos_producao
+        if not self.efeitos_producao:
+            logger.info("🧪 Replay isolado: sem notificações, banco, painel, memória compartilhada e /metrics")
+        
+        # Latência por estágio, filas e descartes (Prometheus em /metrics)
+        self.metricas = RegistroMetricas(janela=METRICS_WINDOW)
+        self.servidor_metricas = None
+        
         self.model = None
-        self.process = None
-        self.sct = None
-        self.monitor = None
+        self.pool = None
+        self.troca_modelo = None
+        self.frame_referencia = None  # cópia de um frame recente para validar modelos novos
+        self.publicador = None
+        self.anel_frames = None
+        self.anel_frames_cru = None  # frames antes do overlay (servidor com detecções)
+        self.captura = None
         self.frame_count = 0
+        self.pipeline = None
         
         # Detector customizado de quedas (se disponível)
         self.detector_queda_custom = None
         if DETECTOR_CUSTOM_DISPONIVEL:
             try:
-                modelos_dir = Path(__file__).parent.parent.parent / "modelos"
+                modelos_dir = Path(__file__).parent.parent / "modelos"
                 modelo_custom = modelos_dir / "queda_custom.pt"
                 if modelo_custom.exists():
                     self.detector_queda_custom = DetectorQuedaCustomizado(
@@ -85,22 +183,87 @@ class StreamInferenciaRTSP:
                     logger.info("ℹ️  Modelo customizado não encontrado, usando heurística padrão")
             except Exception as e:
                 logger.warning(f"⚠️  Erro ao carregar detector customizado: {e}")
+        
+        # Gatilho da cascata: decide quando o detector customizado roda
+        self.gatilho_queda = None
+        if self.detector_queda_custom and FALL_CASCADE_ENABLED:
+            self.gatilho_queda = GatilhoCascataQueda(
+                proporcao_max=FALL_CASCADE_ASPECT_RATIO,
+                posicao_min=FALL_CASCADE_LOW_POSITION,
+                queda_altura=FALL_CASCADE_HEIGHT_DROP,
+                intervalo_batimento=FALL_CASCADE_HEARTBEAT_SECONDS
+            )
+            logger.info("✅ Cascata de detecção de quedas habilitada")
+        
+        # Portão de movimento: pula o modelo com a cena parada
+        self.detector_movimento = None
+        if MOTION_GATE_ENABLED:
+            self.detector_movimento = DetectorMovimento(
+                limiar_atividade=MOTION_GATE_THRESHOLD,
+                limiar_pixel=MOTION_GATE_PIXEL_DIFF,
+                largura=MOTION_GATE_WIDTH,
+                intervalo_forcado=MOTION_GATE_FORCE_SECONDS
+            )
+            logger.info("✅ Portão de movimento habilitado")
+        # Keyframes: entre inferências, as caixas seguem o fluxo óptico
+        self.propagador = None
+        self.frames_sem_inferencia = 0
+        self.cena_em_movimento = False
+        if KEYFRAME_INTERVAL > 1:
+            self.propagador = PropagadorCaixas(largura_fluxo=KEYFRAME_FLOW_WIDTH)
+            logger.info(f"✅ Keyframes a cada {KEYFRAME_INTERVAL} frames (caixas propagadas entre eles)")
+        self.ultimos_results = None
+        self.ultimas_deteccoes = None
+        self.ultima_queda = False
+        self.caixas_queda = np.zeros((0, 4), dtype=np.float32)
+        self.ultimas_caixas_queda = self.caixas_queda
+        self.renderizador = None
+        
+        # Frame e status para o painel, no ritmo de STATE_PUBLISH_FPS
+        self.publicador_estado = PublicadorEstado(
+            frame_path=FRAME_PATH if PANEL_FRAME_ENABLED else None,
+            status_path=STATUS_PATH,
+            contagem_path=ROOM_COUNT_PATH if ROOM_COUNT_ENABLED else None,
+            banheiro_path=BATHROOM_STATUS_PATH if BATHROOM_MONITORING_ENABLED else None,
+            taxa=STATE_PUBLISH_FPS,
+            qualidade_jpeg=PANEL_JPEG_QUALITY
+        ) if self.efeitos_producao else None
         self.start_time = None
         self.running = False
         
-        # Tracking de pessoas
-        self.person_tracker = {}  # {track_id: {entry_time, area, last_seen}}
-        self.next_track_id = 1
+        # Rastreador interno (TRACKER=interno): ids fora do modelo, estáveis
+        # entre trocas de modelo, pool de inferência e frames pulados
+        self.rastreador = None
+        if TRACKING_ENABLED and TRACKER == "interno":
+            self.rastreador = RastreadorSORT(iou_min=TRACKER_IOU, max_perdidos=TRACKER_MAX_LOST)
+        self.rastrear_no_modelo = TRACKING_ENABLED and self.rastreador is None
         
-        # Área do banheiro (em pixels)
+        # Zonas poligonais e retângulos envolventes do quarto/banheiro (em pixels)
+        self.mapa_zonas = None
+        self.mascara_zonas = None
         self.bathroom_area_px = None
         self.room_area_px = None
         
-        # Pessoas atualmente no banheiro
-        self.bathroom_people = {}  # {track_id: entry_time}
+        # Recorte das zonas para inferência (None = frame inteiro)
+        self.recorte_zonas = None
+        
+        # Últimos segundos em JPEG, salvos em clipe em quedas e alertas de banheiro
+        self.gravador_clipes = GravadorClipes(
+            CLIP_DIR, nome="camera", segundos_antes=CLIP_PRE_SECONDS, segundos_depois=CLIP_POST_SECONDS,
+            fps=CLIP_FPS, qualidade_jpeg=CLIP_JPEG_QUALITY, max_bytes=int(CLIP_MAX_MB * 1024 * 1024)
+        ) if CLIP_ENABLED else None
         
-        # Contador de pessoas no quarto
-        self.room_people_count = 0
+        # Estado do quarto/banheiro (pessoas no banheiro, contagem, notificações)
+        self.monitor_camera = MonitorCamera(
+            limite_banheiro_segundos=BATHROOM_TIME_LIMIT_SECONDS,
+            contagem_quarto_habilitada=ROOM_COUNT_ENABLED,
+            monitoramento_banheiro_habilitado=BATHROOM_MONITORING_ENABLED,
+            notificacao_manager=notificacao_manager if self.efeitos_producao else None,
+            tolerancia_saida_segundos=BATHROOM_EXIT_GRACE_SECONDS,
+            max_trilhas=TRACK_STORE_MAX,
+            gravador_clipes=self.gravador_clipes,
+            persistencia=obter_persistencia() if self.efeitos_producao else None
+        )
         
     def inicializar_modelo(self):
         """Carrega o modelo YOLO."""
@@ -110,532 +273,623 @@ class StreamInferenciaRTSP:
                 logger.error(f"❌ Modelo não encontrado em {MODEL_PATH}")
                 raise FileNotFoundError(f"Modelo não encontrado: {MODEL_PATH}")
             
-            self.model = YOLO(MODEL_PATH)
+            if self.workers > 0:
+                # O modelo vive nos workers; este processo só captura, desenha e publica
+                self.pool = self.criar_pool(MODEL_PATH)
+            else:
+                self.model = carregar_modelo(MODEL_PATH, backend=self.backend, imgsz=self.imgsz)
             logger.info("✅ Modelo carregado com sucesso!")
         except Exception as e:
             logger.error(f"❌ Erro ao carregar modelo: {e}", exc_info=True)
             raise
     
-    def inicializar_captura(self):
-        """Inicializa a captura de tela."""
-        try:
-            logger.info(f"📺 Inicializando captura do monitor {MONITOR_IDX}...")
-            self.sct = mss.mss()
-            if MONITOR_IDX >= len(self.sct.monitors):
-                logger.error(f"❌ Monitor {MONITOR_IDX} não existe. Monitores disponíveis: {len(self.sct.monitors) - 1}")
-                raise ValueError(f"Monitor {MONITOR_IDX} inválido")
+    def criar_pool(self, modelo_path):
+        """Sobe um pool de processos de inferência com os pesos indicados."""
+        pool = PoolInferencia(
+            modelo_path, num_workers=self.workers,
+            threads_por_worker=INFERENCE_WORKER_THREADS,
+            largura_max=FRAME_WIDTH, altura_max=FRAME_HEIGHT,
+            backend=self.backend, imgsz=self.imgsz,
+            tempo_limite=INFERENCE_WORKER_TIMEOUT
+        )
+        pool.iniciar()
+        return pool
+    
+    def inicializar_troca_modelo(self):
+        """Observa os pesos do modelo principal e do detector de quedas para troca a quente."""
+        if not MODEL_HOT_SWAP_ENABLED:
+            return
+        self.troca_modelo = GerenciadorTrocaModelo(
+            intervalo=MODEL_WATCH_INTERVAL,
+            caminho_comando=MODEL_SWAP_COMMAND_PATH,
+            frames_probatorios=MODEL_SWAP_PROBATION_FRAMES
+        )
+        
+        def frame_teste():
+            if self.frame_referencia is not None:
+                return self.frame_referencia
+            return np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+        
+        if self.pool:
+            # Um pool novo sobe ao lado do atual; o tracking recomeça nos workers novos
+            def validar_pool(pool):
+                for _ in range(2):
+                    pool.inferir(frame_teste(), conf=CONFIDENCE_THRESHOLD, imgsz=self.imgsz)
             
-            self.monitor = self.sct.monitors[MONITOR_IDX]
-            logger.info(f"✅ Captura configurada para monitor {MONITOR_IDX}")
+            def aplicar_pool(pool):
+                antigo, self.pool = self.pool, pool
+                return antigo
             
-            # Calcular áreas em pixels
-            self.bathroom_area_px = (
-                int(BATHROOM_AREA[0] * FRAME_WIDTH),
-                int(BATHROOM_AREA[1] * FRAME_HEIGHT),
-                int(BATHROOM_AREA[2] * FRAME_WIDTH),
-                int(BATHROOM_AREA[3] * FRAME_HEIGHT)
+            principal = AlvoTroca(
+                'principal', MODEL_PATH, self.criar_pool, aplicar_pool, validar=validar_pool,
+                descartar=lambda pool: threading.Thread(target=pool.parar, daemon=True).start()
             )
+        else:
+            def aplicar_modelo(modelo):
+                if self.rastrear_no_modelo and transferir_rastreamento(self.model, modelo):
+                    logger.info("🔗 Estado do tracking transferido para o novo modelo")
+                antigo, self.model = self.model, modelo
+                return antigo
             
-            self.room_area_px = (
-                int(ROOM_AREA[0] * FRAME_WIDTH),
-                int(ROOM_AREA[1] * FRAME_HEIGHT),
-                int(ROOM_AREA[2] * FRAME_WIDTH),
-                int(ROOM_AREA[3] * FRAME_HEIGHT)
+            principal = AlvoTroca(
+                'principal', MODEL_PATH,
+                lambda caminho: carregar_modelo(caminho, backend=self.backend, imgsz=self.imgsz),
+                aplicar_modelo,
+                validar=lambda modelo: validar_modelo(
+                    modelo, frame_teste(), classes=(PERSON_CLASS_ID,), rastrear=self.rastrear_no_modelo,
+                    conf=CONFIDENCE_THRESHOLD, imgsz=self.imgsz
+                )
             )
+        self.troca_modelo.registrar(principal)
+        
+        if self.detector_queda_custom:
+            detector = self.detector_queda_custom
+            
+            def aplicar_queda(modelo):
+                antigo, detector.model = detector.model, modelo
+                return antigo
+            
+            self.troca_modelo.registrar(AlvoTroca(
+                'queda', Path(__file__).parent.parent / "modelos" / "queda_custom.pt",
+                carregar_modelo, aplicar_queda,
+                validar=lambda modelo: validar_modelo(modelo, frame_teste())
+            ))
+        
+        self.troca_modelo.iniciar()
+    
+    def inicializar_captura(self):
+        """Inicializa a captura de tela (ou o replay de arquivos)."""
+        try:
+            if self.replay:
+                self.captura = FonteReplay(
+                    self.replay, FRAME_WIDTH, FRAME_HEIGHT,
+                    repetir=self.repetir_replay, max_frames=self.max_frames
+                )
+                self.captura.abrir()
+            else:
+                logger.info(f"📺 Inicializando captura do monitor {MONITOR_IDX}...")
+                # No modo em estágios, cada frame capturado segue referenciado até
+                # a codificação (que ainda o lê para o anel de clipes e o anel cru):
+                # até PIPELINE_QUEUE_SIZE em cada uma das 3 filas, mais um em cada
+                # um dos 4 estágios, mais o buffer da próxima captura
+                num_buffers = 3 * PIPELINE_QUEUE_SIZE + 5 if self.modo_pipeline == "estagios" else 2
+                self.captura = CapturaTela(
+                    MONITOR_IDX, FRAME_WIDTH, FRAME_HEIGHT,
+                    regiao=CAPTURE_REGION, num_buffers=num_buffers
+                )
+                self.captura.abrir()
+                logger.info(f"✅ Captura configurada para monitor {MONITOR_IDX}")
+            
+            # Zonas rasterizadas uma vez na resolução de saída; os retângulos
+            # envolventes servem ao recorte da inferência
+            self.mapa_zonas = carregar_zonas(ZONES_CONFIG_PATH, ROOM_AREA, BATHROOM_AREA)
+            self.mascara_zonas = self.mapa_zonas.mascara(FRAME_WIDTH, FRAME_HEIGHT)
+            self.room_area_px = self.mapa_zonas.retangulo_tipo(TIPO_QUARTO, FRAME_WIDTH, FRAME_HEIGHT)
+            self.bathroom_area_px = self.mapa_zonas.retangulo_tipo(TIPO_BANHEIRO, FRAME_WIDTH, FRAME_HEIGHT)
             
             logger.info(f"📍 Área do quarto: {self.room_area_px}")
             logger.info(f"🚿 Área do banheiro: {self.bathroom_area_px}")
+            logger.info(f"📐 Zonas: {', '.join(f'{z.nome} ({z.tipo})' for z in self.mapa_zonas.zonas)}")
+            
+            # Overlay: cada frame anotado fica em uso até o FFmpeg escrevê-lo,
+            # então o anel cobre a fila do publicador (e a do pipeline)
+            num_buffers = FFMPEG_QUEUE_SIZE + 2
+            if self.modo_pipeline == "estagios":
+                num_buffers += PIPELINE_QUEUE_SIZE + 1
+            self.renderizador = RenderizadorOverlay(FRAME_WIDTH, FRAME_HEIGHT, num_buffers=num_buffers)
+            self.renderizador.definir_zonas(self.mapa_zonas.poligonos_overlay(
+                FRAME_WIDTH, FRAME_HEIGHT, ignorar_tipos=() if ROOM_USE_AREA else (TIPO_QUARTO,)
+            ))
+            
+            # Inferência restrita às zonas habilitadas
+            if ROI_INFERENCE_ENABLED:
+                self.recorte_zonas = criar_recorte(
+                    self.room_area_px if (ROOM_COUNT_ENABLED and ROOM_USE_AREA) else None,
+                    self.bathroom_area_px if BATHROOM_MONITORING_ENABLED else None,
+                    FRAME_WIDTH, FRAME_HEIGHT, margem=ROI_MARGIN
+                )
+                if self.recorte_zonas:
+                    logger.info(
+                        f"✂️  Inferência restrita à região {self.recorte_zonas.regiao} "
+                        f"({self.recorte_zonas.fracao_frame() * 100:.0f}% do frame)"
+                    )
             
         except Exception as e:
             logger.error(f"❌ Erro ao inicializar captura: {e}", exc_info=True)
             raise
     
     def inicializar_ffmpeg(self):
-        """Inicializa o processo FFmpeg para transmissão RTSP."""
-        try:
+        """Inicia o publicador RTSP (subprocesso FFmpeg ou PyAV em processo, conforme o tipo)."""
+        if not self.publicar_rtsp:
+            logger.info("ℹ️  Publicação RTSP desabilitada")
+            return
+        if self.tipo_publicador == "pyav" and not pyav_disponivel():
+            logger.warning("⚠️ RTSP_PUBLISHER=pyav, mas o pacote av não está instalado. Usando o subprocesso FFmpeg")
+            self.tipo_publicador = "ffmpeg"
+        
+        if self.tipo_publicador == "pyav":
+            # H.264 no próprio processo: sem BGR cru atravessando um pipe
+            logger.info(f"🎥 Iniciando transmissão via PyAV para {RTSP_URL}...")
+            self.publicador = PublicadorPyAV(
+                FRAME_WIDTH, FRAME_HEIGHT, FPS, RTSP_URL, FFMPEG_PRESET, FFMPEG_TUNE,
+                tamanho_fila=FFMPEG_QUEUE_SIZE,
+                atraso_reinicio=FFMPEG_RESTART_DELAY
+            )
+        else:
             logger.info(f"🎥 Iniciando transmissão via FFmpeg para {RTSP_URL}...")
-            command = [
-                'ffmpeg',
-                '-f', 'rawvideo',
-                '-pix_fmt', 'bgr24',
-                '-s', f'{FRAME_WIDTH}x{FRAME_HEIGHT}',
-                '-r', str(FPS),
-                '-i', '-',
-                '-c:v', 'libx264',
-                '-preset', 'ultrafast',
-                '-tune', 'zerolatency',
-                '-f', 'rtsp',
-                RTSP_URL
-            ]
-            
-            self.process = subprocess.Popen(
-                command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+            self.publicador = PublicadorFFmpeg(
+                comando_rtsp(FRAME_WIDTH, FRAME_HEIGHT, FPS, RTSP_URL, FFMPEG_PRESET, FFMPEG_TUNE),
+                tamanho_fila=FFMPEG_QUEUE_SIZE,
+                atraso_reinicio=FFMPEG_RESTART_DELAY
             )
-            logger.info("✅ FFmpeg iniciado com sucesso!")
-        except Exception as e:
-            logger.error(f"❌ Erro ao iniciar FFmpeg: {e}", exc_info=True)
-            raise
+        self.publicador.iniciar()
+    
+    def inicializar_memoria_compartilhada(self):
+        """Cria os anéis de frames em memória compartilhada para os consumidores locais."""
+        if not self.efeitos_producao:
+            return  # criar() substituiria o anel do pipeline de produção
+        if SHM_FRAMES_ENABLED:
+            try:
+                self.anel_frames = AnelFramesCompartilhado.criar(
+                    SHM_FRAMES_NAME, FRAME_WIDTH, FRAME_HEIGHT, num_slots=SHM_FRAMES_SLOTS
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Memória compartilhada indisponível: {e}")
+        if SHM_RAW_FRAMES_ENABLED:
+            try:
+                self.anel_frames_cru = AnelFramesCompartilhado.criar(
+                    SHM_RAW_FRAMES_NAME, FRAME_WIDTH, FRAME_HEIGHT, num_slots=SHM_FRAMES_SLOTS
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Memória compartilhada (frames crus) indisponível: {e}")
     
-    def detectar_queda(self, results, frame=None):
+    def inicializar_metricas(self):
+        """Registra filas/contadores dos componentes e sobe o endpoint /metrics."""
+        m = self.metricas
+        m.expor('frames_processados_total', lambda: self.frame_count, tipo='counter',
+                ajuda="Frames que passaram por todo o pipeline")
+        if self.publicador:
+            publicador = self.publicador
+            m.expor('fila_profundidade', publicador.fila.qsize,
+                    ajuda="Itens aguardando em cada fila", fila="ffmpeg")
+            m.expor('frames_descartados_total', lambda: publicador.frames_descartados, tipo='counter',
+                    ajuda="Frames descartados por fila cheia ou falha", etapa="ffmpeg")
+            m.expor('ffmpeg_reinicios_total', lambda: publicador.reinicios, tipo='counter',
+                    ajuda="Reinícios do publicador RTSP (processo FFmpeg ou saída PyAV)")
+        if self.gravador_clipes:
+            gravador = self.gravador_clipes
+            m.expor('clipes_gravados_total', lambda: gravador.clipes_gravados, tipo='counter',
+                    ajuda="Clipes de evento (queda/banheiro) salvos")
+            m.expor('clipes_anel_bytes', lambda: gravador.estatisticas()['bytes_anel'],
+                    ajuda="Memória ocupada pelo anel de JPEGs pré-evento")
+        if self.propagador:
+            propagador = self.propagador
+            m.expor('frames_propagados_total', lambda: propagador.frames_propagados, tipo='counter',
+                    ajuda="Frames cujas caixas vieram do fluxo óptico, sem rodar o modelo")
+        if self.detector_movimento:
+            detector = self.detector_movimento
+            m.expor('inferencias_puladas_total', lambda: detector.inferencias_puladas, tipo='counter',
+                    ajuda="Frames em que o portão de movimento pulou o modelo")
+        if self.gatilho_queda:
+            gatilho = self.gatilho_queda
+            # Uma série por motivo (proporcao, posicao, altura, batimento)
+            for motivo in gatilho.disparos:
+                m.expor('modelo_queda_disparos_total', lambda motivo=motivo: gatilho.disparos[motivo],
+                        tipo='counter', ajuda="Execuções do modelo customizado de quedas disparadas pela cascata",
+                        motivo=motivo)
+        if self.pool:
+            # Lido de self.pool na coleta: a troca de modelo substitui o pool
+            m.expor('pool_workers_prontos', lambda: self.pool.estatisticas()['workers_prontos'],
+                    ajuda="Workers de inferência com o modelo carregado")
+            m.expor('pool_em_voo', lambda: self.pool.estatisticas()['em_voo'],
+                    ajuda="Frames aguardando resultado nos workers de inferência")
+            m.expor('pool_reinicios_total', lambda: self.pool.estatisticas()['reinicios'], tipo='counter',
+                    ajuda="Reinícios de workers de inferência pelo supervisor")
+            m.expor('erros_estagio_total', lambda: self.pool.estatisticas()['erros'], tipo='counter',
+                    estagio="pool_inferencia")
+        if self.troca_modelo:
+            for nome, alvo in self.troca_modelo.alvos.items():
+                m.expor('modelo_trocas_total', lambda a=alvo: a.trocas, tipo='counter',
+                        ajuda="Trocas de modelo a quente aplicadas", alvo=nome)
+                m.expor('modelo_rejeicoes_total', lambda a=alvo: a.rejeicoes, tipo='counter',
+                        ajuda="Modelos novos reprovados na inferência de teste", alvo=nome)
+                m.expor('modelo_reversoes_total', lambda a=alvo: a.reversoes, tipo='counter',
+                        ajuda="Trocas revertidas por falhas no período probatório", alvo=nome)
+        
+        if METRICS_ENABLED and self.efeitos_producao:
+            self.servidor_metricas = ServidorMetricas(self.metricas, METRICS_PORT, METRICS_HOST)
+            if not self.servidor_metricas.iniciar():
+                self.servidor_metricas = None
+    
+    def pos_processar(self, results):
+        """
+        Etapa única de pós-processamento do frame.
+        
+        Copia as caixas para a CPU uma vez e calcula filtro de pessoas, áreas,
+        proporções e candidatos a queda de forma vetorizada. O resultado é
+        compartilhado por detecção de queda, contagem do quarto e banheiro.
+        """
+        return extrair_deteccoes(
+            results,
+            altura_frame=FRAME_HEIGHT,
+            classe_pessoa=PERSON_CLASS_ID,
+            conf_threshold=CONFIDENCE_THRESHOLD,
+            area_quarto=self.room_area_px,
+            area_banheiro=self.bathroom_area_px,
+            usar_area_quarto=ROOM_USE_AREA,
+            usar_tracking=TRACKING_ENABLED,
+            deslocamento=self.recorte_zonas.origem if self.recorte_zonas else (0, 0),
+            zonas=self.mascara_zonas,
+            rastreador=self.rastreador
+        )
+    
+    def detectar_queda(self, deteccoes, frame=None):
         """
         Detecta possíveis quedas usando modelo customizado ou heurística.
         Retorna True se uma queda foi detectada.
         """
+        self.caixas_queda = np.zeros((0, 4), dtype=np.float32)
         if not FALL_DETECTION_ENABLED:
             return False
         
         # Tentar usar detector customizado primeiro
         if self.detector_queda_custom and frame is not None:
             try:
-                tem_queda, deteccoes, _ = self.detector_queda_custom.detectar(frame)
+                if self.gatilho_queda:
+                    # Cascata: só roda sobre recortes das pessoas candidatas
+                    motivo, candidatos = self.gatilho_queda.avaliar(deteccoes)
+                    if motivo is None:
+                        tem_queda, quedas = False, []
+                    else:
+                        tem_queda, quedas = self.detector_queda_custom.detectar_recortes(
+                            frame, deteccoes.xyxy[candidatos]
+                        )
+                        self.registrar_uso_modelo('queda', True)
+                else:
+                    tem_queda, quedas, _ = self.detector_queda_custom.detectar(frame, anotar=False)
+                    self.registrar_uso_modelo('queda', True)
                 if tem_queda:
-                    logger.info(f"🚨 Queda detectada pelo modelo customizado! Confiança: {deteccoes[0]['confianca']:.2f}")
+                    logger.info(f"🚨 Queda detectada pelo modelo customizado! Confiança: {quedas[0]['confianca']:.2f}")
+                    self.caixas_queda = np.array([q['bbox'] for q in quedas], dtype=np.float32)
                     return True
             except Exception as e:
                 logger.warning(f"⚠️  Erro no detector customizado, usando heurística: {e}")
+                self.registrar_uso_modelo('queda', False)
         
-        # Fallback para heurística padrão
-        try:
-            for result in results:
-                boxes = result.boxes
-                if boxes is None or len(boxes) == 0:
-                    continue
-                
-                for box in boxes:
-                    # Verificar se é uma pessoa
-                    cls = int(box.cls[0])
-                    if cls != PERSON_CLASS_ID:
-                        continue
-                    
-                    conf = float(box.conf[0])
-                    if conf < CONFIDENCE_THRESHOLD:
-                        continue
-                    
-                    # Obter coordenadas da bounding box
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Calcular altura e largura
-                    height = y2 - y1
-                    width = x2 - x1
-                    
-                    # Calcular proporção (altura/largura)
-                    if width > 0:
-                        aspect_ratio = height / width
-                        
-                        # Uma pessoa caída geralmente tem aspect_ratio < 0.7
-                        # e está na parte inferior da imagem
-                        frame_center_y = FRAME_HEIGHT / 2
-                        box_center_y = (y1 + y2) / 2
-                        
-                        if aspect_ratio < 0.7 and box_center_y > frame_center_y:
-                            return True
-            
-            return False
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao detectar queda: {e}")
-            return False
-    
-    def ponto_na_area(self, x, y, area):
-        """Verifica se um ponto (x, y) está dentro de uma área."""
-        x1, y1, x2, y2 = area
-        return x1 <= x <= x2 and y1 <= y <= y2
+        # Fallback para heurística padrão: pessoa deitada (altura/largura < 0.7)
+        # na parte inferior da imagem
+        self.caixas_queda = deteccoes.xyxy[deteccoes.candidatos_queda]
+        return bool(deteccoes.candidatos_queda.any())
     
-    def centro_box_na_area(self, box_xyxy, area):
-        """Verifica se o centro de uma bounding box está dentro de uma área."""
-        x1, y1, x2, y2 = box_xyxy
-        centro_x = (x1 + x2) / 2
-        centro_y = (y1 + y2) / 2
-        return self.ponto_na_area(centro_x, centro_y, area)
-    
-    def contar_pessoas_quarto(self, results):
+    def contar_pessoas_quarto(self, deteccoes):
         """Conta pessoas detectadas no quarto."""
-        if not ROOM_COUNT_ENABLED:
-            return 0
-        
-        try:
-            pessoas_no_quarto = set()
-            
-            for result in results:
-                boxes = result.boxes
-                if boxes is None or len(boxes) == 0:
-                    continue
-                
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    if cls != PERSON_CLASS_ID:
-                        continue
-                    
-                    conf = float(box.conf[0])
-                    if conf < CONFIDENCE_THRESHOLD:
-                        continue
-                    
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Se não usar área específica, conta todas as pessoas
-                    if not ROOM_USE_AREA:
-                        # Usa track_id se disponível, senão usa posição como identificador temporário
-                        if TRACKING_ENABLED and hasattr(box, 'id') and box.id is not None:
-                            track_id = int(box.id[0])
-                            pessoas_no_quarto.add(track_id)
-                        else:
-                            # Usa posição aproximada como identificador
-                            pos_id = f"{int(x1/10)}_{int(y1/10)}"
-                            pessoas_no_quarto.add(pos_id)
-                    else:
-                        # Verifica se está na área do quarto
-                        if self.centro_box_na_area((x1, y1, x2, y2), self.room_area_px):
-                            if TRACKING_ENABLED and hasattr(box, 'id') and box.id is not None:
-                                track_id = int(box.id[0])
-                                pessoas_no_quarto.add(track_id)
-                            else:
-                                pos_id = f"{int(x1/10)}_{int(y1/10)}"
-                                pessoas_no_quarto.add(pos_id)
-            
-            return len(pessoas_no_quarto)
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao contar pessoas no quarto: {e}")
-            return 0
+        return self.monitor_camera.contar_pessoas_quarto(deteccoes)
     
-    def monitorar_banheiro(self, results):
+    def monitorar_banheiro(self, deteccoes):
         """Monitora pessoas no banheiro e detecta tempo > limite."""
-        if not BATHROOM_MONITORING_ENABLED:
-            return {}, []
-        
-        try:
-            pessoas_banheiro_atual = {}
-            alertas = []
-            current_time = time.time()
-            
-            # Primeiro, verifica pessoas detectadas no banheiro
-            for result in results:
-                boxes = result.boxes
-                if boxes is None or len(boxes) == 0:
-                    continue
-                
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    if cls != PERSON_CLASS_ID:
-                        continue
-                    
-                    conf = float(box.conf[0])
-                    if conf < CONFIDENCE_THRESHOLD:
-                        continue
-                    
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Verifica se está na área do banheiro
-                    if self.centro_box_na_area((x1, y1, x2, y2), self.bathroom_area_px):
-                        if TRACKING_ENABLED and hasattr(box, 'id') and box.id is not None:
-                            track_id = int(box.id[0])
-                        else:
-                            # Usa posição como identificador temporário
-                            track_id = f"temp_{int(x1/10)}_{int(y1/10)}"
-                        
-                        # Se é nova pessoa no banheiro
-                        if track_id not in self.bathroom_people:
-                            self.bathroom_people[track_id] = current_time
-                            logger.info(f"🚿 Pessoa {track_id} entrou no banheiro")
-                        
-                        pessoas_banheiro_atual[track_id] = self.bathroom_people[track_id]
-            
-            # Verifica pessoas que saíram do banheiro e remove
-            pessoas_sairam = set(self.bathroom_people.keys()) - set(pessoas_banheiro_atual.keys())
-            for track_id in pessoas_sairam:
-                tempo_no_banheiro = current_time - self.bathroom_people[track_id]
-                logger.info(f"🚿 Pessoa {track_id} saiu do banheiro após {tempo_no_banheiro:.1f}s")
-                del self.bathroom_people[track_id]
-            
-            # Verifica alertas de tempo excedido
-            for track_id, entry_time in pessoas_banheiro_atual.items():
-                tempo_no_banheiro = current_time - entry_time
-                
-                if tempo_no_banheiro > BATHROOM_TIME_LIMIT_SECONDS:
-                    minutos = int(tempo_no_banheiro // 60)
-                    segundos = int(tempo_no_banheiro % 60)
-                    alerta = {
-                        'track_id': track_id,
-                        'tempo_minutos': minutos,
-                        'tempo_segundos': segundos,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    alertas.append(alerta)
-                    
-                    if len(alertas) == 1:  # Log apenas uma vez por ciclo
-                        logger.warning(
-                            f"⚠️ ALERTA: Pessoa {track_id} no banheiro há {minutos}min {segundos}s "
-                            f"(limite: {BATHROOM_TIME_LIMIT_SECONDS//60}min)"
-                        )
-                        
-                        # Enviar notificação por email
-                        if notificacao_manager:
-                            try:
-                                # Evitar spam: só enviar se não enviou recentemente para este track_id
-                                if not hasattr(self, '_notificacoes_banheiro'):
-                                    self._notificacoes_banheiro = {}
-                                
-                                ultima_notif = self._notificacoes_banheiro.get(track_id, 0)
-                                tempo_desde_ultima = time.time() - ultima_notif
-                                
-                                if tempo_desde_ultima > 600:  # 10 minutos entre notificações para mesmo track_id
-                                    notificacao_manager.notificar_banheiro_tempo(
-                                        track_id=track_id,
-                                        tempo_minutos=minutos,
-                                        tempo_segundos=segundos
-                                    )
-                                    self._notificacoes_banheiro[track_id] = time.time()
-                            except Exception as e:
-                                logger.error(f"Erro ao enviar notificação de banheiro: {e}")
-            
-            return pessoas_banheiro_atual, alertas
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao monitorar banheiro: {e}")
-            return {}, []
+        return self.monitor_camera.monitorar_banheiro(deteccoes)
     
     def salvar_informacoes(self, frame, status, contagem_quarto, status_banheiro):
-        """Salva frame, status e informações de contagem/tempo."""
-        try:
-            # Salvar frame
-            cv2.imwrite(FRAME_PATH, frame)
-            
-            # Salvar status geral
-            with open(STATUS_PATH, 'w') as f:
-                f.write(status)
-            
-            # Salvar contagem do quarto
-            if ROOM_COUNT_ENABLED:
-                with open(ROOM_COUNT_PATH, 'w') as f:
-                    f.write(str(contagem_quarto))
-            
-            # Salvar status do banheiro
-            if BATHROOM_MONITORING_ENABLED:
-                with open(BATHROOM_STATUS_PATH, 'w') as f:
-                    import json
-                    json.dump(status_banheiro, f, indent=2, ensure_ascii=False)
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao salvar informações: {e}")
+        """Publica frame, status e contagem/tempo para o painel (atômico, com taxa limitada)."""
+        if self.publicador_estado:
+            self.publicador_estado.publicar(frame, status, contagem_quarto, status_banheiro)
     
-    def desenhar_areas(self, frame):
-        """Desenha áreas do quarto e banheiro no frame."""
-        try:
-            # Desenhar área do quarto (verde)
-            if ROOM_USE_AREA:
-                cv2.rectangle(
-                    frame,
-                    (self.room_area_px[0], self.room_area_px[1]),
-                    (self.room_area_px[2], self.room_area_px[3]),
-                    (0, 255, 0),
-                    2
-                )
-                cv2.putText(
-                    frame,
-                    "Quarto",
-                    (self.room_area_px[0] + 5, self.room_area_px[1] + 25),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (0, 255, 0),
-                    2
-                )
-            
-            # Desenhar área do banheiro (azul)
-            cv2.rectangle(
-                frame,
-                (self.bathroom_area_px[0], self.bathroom_area_px[1]),
-                (self.bathroom_area_px[2], self.bathroom_area_px[3]),
-                (255, 0, 0),
-                2
+    def inferir(self, frame):
+        """Executa a inferência YOLO (com o tracking do modelo, se for ele o rastreador)."""
+        if self.recorte_zonas:
+            # Só a região das zonas vai para o modelo; as caixas voltam
+            # para coordenadas do frame no pós-processamento
+            frame = self.recorte_zonas.recortar(frame)
+        if self.pool:
+            return self.pool.inferir(
+                frame, chave='stream', rastrear=self.rastrear_no_modelo,
+                conf=CONFIDENCE_THRESHOLD, imgsz=self.imgsz
             )
-            cv2.putText(
+        if self.rastrear_no_modelo:
+            return self.model.track(
                 frame,
-                "Banheiro",
-                (self.bathroom_area_px[0] + 5, self.bathroom_area_px[1] + 25),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (255, 0, 0),
-                2
+                conf=CONFIDENCE_THRESHOLD,
+                imgsz=self.imgsz,
+                verbose=False,
+                persist=True
             )
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao desenhar áreas: {e}")
+        return self.model.predict(
+            frame,
+            conf=CONFIDENCE_THRESHOLD,
+            imgsz=self.imgsz,
+            verbose=False,
+            stream=False
+        )
     
-    def processar_frame(self, frame):
-        """Processa um frame: inferência, detecção e transmissão."""
-        try:
-            # Inferência YOLO com tracking se habilitado
-            if TRACKING_ENABLED:
-                results = self.model.track(
-                    frame,
-                    conf=CONFIDENCE_THRESHOLD,
-                    verbose=False,
-                    persist=True
-                )
-            else:
-                results = self.model.predict(
-                    frame,
-                    conf=CONFIDENCE_THRESHOLD,
-                    verbose=False,
-                    stream=False
-                )
-            
-            # Anotar frame com detecções
-            annotated = results[0].plot()
-            
-            # Desenhar áreas de quarto e banheiro
-            self.desenhar_areas(annotated)
+    def inferir_com_portao(self, frame):
+        """
+        Inferência precedida pelo portão de movimento (se habilitado).
+        
+        Com a cena parada, o modelo é pulado e o último resultado reaproveitado;
+        uma inferência é forçada a cada MOTION_GATE_FORCE_SECONDS. Com keyframes,
+        o modelo só roda a cada KEYFRAME_INTERVAL frames ou quando a cena volta
+        a se mexer (alguém novo pode ter aparecido, e a propagação não o veria).
+        
+        Returns:
+            (results, reutilizado)
+        """
+        self.preparar_troca_modelo(frame)
+        forcar = self.ultimos_results is None
+        if self.detector_movimento is not None:
+            # No primeiro frame, só alimenta o fundo
+            inferir, motivo = self.detector_movimento.deve_inferir(frame)
+            if not inferir and not forcar:
+                self.cena_em_movimento = False
+                return self.ultimos_results, True
+            forcar = forcar or motivo == 'forcado' or not self.cena_em_movimento
+            self.cena_em_movimento = True
+        
+        if self.propagador and not forcar and self.frames_sem_inferencia + 1 < KEYFRAME_INTERVAL:
+            self.frames_sem_inferencia += 1
+            return self.ultimos_results, True
+        self.frames_sem_inferencia = 0
+        
+        with self.metricas.medir('inferencia'):
+            try:
+                self.ultimos_results = self.inferir(frame)
+            except Exception:
+                self.registrar_uso_modelo('principal', False)
+                raise
+        self.registrar_uso_modelo('principal', True)
+        return self.ultimos_results, False
+    
+    def preparar_troca_modelo(self, frame):
+        """Fronteira entre frames: aplica trocas de modelo prontas e guarda um frame de teste."""
+        if not self.troca_modelo:
+            return
+        if self.frame_referencia is None or self.frame_count % (FPS * 5) == 0:
+            # Cópia: o buffer da captura é reutilizado no próximo frame
+            self.frame_referencia = frame.copy()
+        self.troca_modelo.aplicar_pendentes()
+    
+    def registrar_uso_modelo(self, alvo, sucesso):
+        """Resultado de uma inferência, para o período probatório após uma troca."""
+        if not self.troca_modelo:
+            return
+        if sucesso:
+            self.troca_modelo.registrar_sucesso(alvo)
+        else:
+            self.troca_modelo.registrar_falha(alvo)
+    
+    def analisar(self, results, frame, reutilizado=False):
+        """
+        Aplica a lógica de monitoramento sobre o resultado da inferência.
+        
+        Se `reutilizado`, as detecções e o resultado de queda do último frame
+        inferido são reaproveitados (sem rodar o detector customizado), mas
+        contagem do quarto e cronômetros do banheiro continuam atualizando.
+        Com keyframes, as caixas reaproveitadas são antes movidas para este
+        frame pelo propagador, e as zonas recalculadas.
+        
+        Returns:
+            Dicionário com as detecções pós-processadas, status, contagem do quarto,
+            pessoas/alertas do banheiro e o status do banheiro pronto para persistência
+        """
+        inicio = time.perf_counter()
+        if reutilizado and self.ultimas_deteccoes is not None:
+            deteccoes = self.ultimas_deteccoes
+            if self.propagador and len(deteccoes):
+                with self.metricas.medir('propagacao'):
+                    deteccoes = deteccoes.mover(self.propagador.propagar(frame))
+            queda_detectada = self.ultima_queda
+            caixas_queda = self.ultimas_caixas_queda
+        else:
+            deteccoes = self.pos_processar(results)
+            if self.propagador:
+                self.propagador.reiniciar(frame, deteccoes.xyxy)
             
             # Detecção de queda (passa frame original para detector customizado)
-            queda_detectada = self.detectar_queda(results, frame)
-            status = "queda" if queda_detectada else "ok"
-            
-            # Enviar notificação de queda se detectada
-            if queda_detectada and notificacao_manager:
-                try:
-                    # Evitar spam: só enviar se não enviou recentemente
-                    if not hasattr(self, '_ultima_notificacao_queda'):
-                        self._ultima_notificacao_queda = 0
-                    
-                    tempo_desde_ultima = time.time() - self._ultima_notificacao_queda
-                    if tempo_desde_ultima > 300:  # 5 minutos entre notificações
-                        notificacao_manager.notificar_queda(metadata={
-                            'frame_count': self.frame_count,
-                            'timestamp': datetime.now().isoformat()
-                        })
-                        self._ultima_notificacao_queda = time.time()
-                except Exception as e:
-                    logger.error(f"Erro ao enviar notificação de queda: {e}")
-            
-            # Contagem de pessoas no quarto
-            contagem_quarto = self.contar_pessoas_quarto(results)
-            self.room_people_count = contagem_quarto
-            
-            # Monitoramento do banheiro
-            pessoas_banheiro, alertas_banheiro = self.monitorar_banheiro(results)
-            
-            # Preparar status do banheiro
-            status_banheiro = {
-                'pessoas_no_banheiro': len(pessoas_banheiro),
-                'alertas': alertas_banheiro,
-                'pessoas': []
-            }
-            
-            current_time = time.time()
-            for track_id, entry_time in pessoas_banheiro.items():
-                tempo_decorrido = current_time - entry_time
-                minutos = int(tempo_decorrido // 60)
-                segundos = int(tempo_decorrido % 60)
-                
-                status_banheiro['pessoas'].append({
-                    'track_id': str(track_id),
-                    'tempo_minutos': minutos,
-                    'tempo_segundos': segundos,
-                    'alerta': tempo_decorrido > BATHROOM_TIME_LIMIT_SECONDS
-                })
-            
-            # Adicionar informações no frame
-            cv2.putText(
-                annotated,
-                f"Pessoas no Quarto: {contagem_quarto}",
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 255, 0),
-                2
-            )
-            
-            cv2.putText(
-                annotated,
-                f"Pessoas no Banheiro: {len(pessoas_banheiro)}",
-                (10, 60),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (255, 0, 0),
-                2
+            queda_detectada = self.detectar_queda(deteccoes, frame)
+            caixas_queda = self.caixas_queda if queda_detectada else self.caixas_queda[:0]
+            self.ultimas_deteccoes = deteccoes
+            self.ultima_queda = queda_detectada
+            self.ultimas_caixas_queda = caixas_queda
+        status = "queda" if queda_detectada else "ok"
+        
+        # Clipe, registro em deteccoes_queda e notificação (um por evento de queda)
+        if queda_detectada:
+            self.monitor_camera.registrar_queda(True, metadata={
+                'frame_count': self.frame_count,
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        # Contagem de pessoas no quarto
+        contagem_quarto = self.contar_pessoas_quarto(deteccoes)
+        
+        # Monitoramento do banheiro
+        pessoas_banheiro, alertas_banheiro = self.monitorar_banheiro(deteccoes)
+        
+        # Preparar status do banheiro
+        status_banheiro = self.monitor_camera.status_banheiro(pessoas_banheiro, alertas_banheiro)
+        
+        self.metricas.observar('posprocessamento', time.perf_counter() - inicio)
+        return {
+            'deteccoes': deteccoes,
+            'caixas_queda': caixas_queda,
+            'status': status,
+            'contagem_quarto': contagem_quarto,
+            'pessoas_banheiro': pessoas_banheiro,
+            'alertas_banheiro': alertas_banheiro,
+            'status_banheiro': status_banheiro
+        }
+    
+    def renderizar(self, frame, estado):
+        """Desenha zonas, contadores e caixas de pessoas/quedas. Retorna o frame anotado."""
+        inicio = time.perf_counter()
+        deteccoes = estado['deteccoes']
+        # Camada de textos só é redesenhada quando os contadores mudam
+        self.renderizador.definir_textos(textos_contadores(
+            estado['contagem_quarto'],
+            len(estado['pessoas_banheiro']),
+            len(estado['alertas_banheiro']),
+            BATHROOM_TIME_LIMIT_SECONDS // 60,
+            queda=estado['status'] == "queda"
+        ))
+        # Caixas do último resultado sobre o frame atual (que pode ser mais novo
+        # quando o resultado é reaproveitado pelo portão de movimento)
+        annotated = self.renderizador.renderizar(
+            frame, deteccoes.xyxy, deteccoes.ids, estado['caixas_queda']
+        )
+        self.metricas.observar('renderizacao', time.perf_counter() - inicio)
+        return annotated
+    
+    def ha_consumidores(self):
+        """True se alguém consome o frame anotado (RTSP, memória compartilhada ou frame do painel)."""
+        return (
+            self.publicador is not None or self.anel_frames is not None
+            or (PANEL_FRAME_ENABLED and self.publicador_estado is not None)
+        )
+    
+    def publicar(self, annotated, estado, frame=None):
+        """Salva as informações para o painel, guarda o frame no anel de clipes e o transmite via FFmpeg."""
+        # Anotado quando houver (mostra as caixas); senão o frame capturado
+        quadro_clipe = annotated if annotated is not None else frame
+        if self.gravador_clipes and quadro_clipe is not None:
+            with self.metricas.medir('clipes'):
+                self.gravador_clipes.adicionar(quadro_clipe)
+        
+        # Salvar informações (annotated é None quando não há consumidores do vídeo)
+        with self.metricas.medir('persistencia'):
+            self.salvar_informacoes(
+                annotated, estado['status'], estado['contagem_quarto'], estado['status_banheiro']
             )
+        
+        # Frame cru para o servidor com detecções (não depende do overlay)
+        if self.anel_frames_cru and frame is not None:
+            with self.metricas.medir('publicacao'):
+                self.anel_frames_cru.publicar(frame)
+        
+        if annotated is None:
+            return
+        with self.metricas.medir('publicacao'):
+            # Transmitir via FFmpeg (não bloqueia; descarta frames se o FFmpeg atrasar)
+            if self.publicador:
+                self.publicador.enviar(annotated)
             
-            if alertas_banheiro:
-                for i, alerta in enumerate(alertas_banheiro):
-                    cv2.putText(
-                        annotated,
-                        f"ALERTA: Pessoa no banheiro > {BATHROOM_TIME_LIMIT_SECONDS//60}min!",
-                        (10, 90 + i * 30),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.7,
-                        (0, 0, 255),
-                        2
-                    )
-            
-            # Salvar informações
-            self.salvar_informacoes(annotated, status, contagem_quarto, status_banheiro)
-            
-            # Transmitir via FFmpeg
-            if self.process and self.process.stdin:
-                try:
-                    self.process.stdin.write(annotated.tobytes())
-                    self.process.stdin.flush()
-                except BrokenPipeError:
-                    logger.error("❌ Pipe do FFmpeg quebrado. Tentando reiniciar...")
-                    raise
-                except Exception as e:
-                    logger.error(f"❌ Erro ao escrever no FFmpeg: {e}")
-                    raise
+            # Consumidores locais (MJPEG, painel, calibração) leem o frame anotado
+            if self.anel_frames:
+                self.anel_frames.publicar(annotated)
+    
+    def processar_frame(self, frame):
+        """Processa um frame: inferência, detecção e transmissão."""
+        try:
+            results, reutilizado = self.inferir_com_portao(frame)
+            estado = self.analisar(results, frame, reutilizado)
+            annotated = self.renderizar(frame, estado) if self.ha_consumidores() else None
+            self.publicar(annotated, estado, frame)
             
-            return status, contagem_quarto, len(pessoas_banheiro), len(alertas_banheiro)
+            return (
+                estado['status'], estado['contagem_quarto'],
+                len(estado['pessoas_banheiro']), len(estado['alertas_banheiro'])
+            )
             
         except Exception as e:
             logger.error(f"❌ Erro ao processar frame: {e}", exc_info=True)
             return None, 0, 0, 0
     
+    def capturar_frame(self):
+        """
+        Captura um screenshot do monitor no tamanho de saída (buffer reutilizado).
+        
+        No replay, retorna o próximo frame dos arquivos ou None ao fim.
+        """
+        if self.max_frames is not None and self.frame_count >= self.max_frames and not self.replay:
+            return None
+        with self.metricas.medir('captura'):
+            return self.captura.ler()
+    
+    def registrar_frame(self, t_captura):
+        """Contabiliza um frame concluído e sua latência captura → publicação."""
+        self.frame_count += 1
+        self.resumo.registrar(t_captura)
+        self.metricas.observar('ponta_a_ponta', time.perf_counter() - t_captura)
+    
+    def log_periodico(self, status, contagem_quarto, pessoas_banheiro, alertas):
+        """Registra no log o progresso a cada 5 segundos de frames."""
+        if self.frame_count % (FPS * 5) != 0:
+            return
+        
+        # FPS da janela recente (não da execução inteira)
+        fps_actual = self.metricas.taxa('ponta_a_ponta')
+        logger.info(
+            f"✅ {self.frame_count} frames processados | "
+            f"FPS: {fps_actual:.2f} | Status: {status} | "
+            f"Quarto: {contagem_quarto} pessoas | "
+            f"Banheiro: {pessoas_banheiro} pessoas | "
+            f"Alertas: {alertas}"
+        )
+        logger.info(f"⏱️ Latência p50/p95/p99 (ms): {self.metricas.resumo_latencias()}")
+        if self.publicador:
+            logger.info(f"🎥 Publicador RTSP ({self.tipo_publicador}): {self.publicador.estatisticas()}")
+        if self.pipeline:
+            logger.info(f"📊 Ocupação dos estágios: {self.pipeline.resumo_ocupacao()}")
+        if self.detector_movimento:
+            logger.info(
+                f"💤 Portão de movimento: modelo pulado em "
+                f"{self.detector_movimento.taxa_pulos() * 100:.0f}% dos frames | "
+                f"atividade atual: {self.detector_movimento.atividade * 100:.2f}%"
+            )
+        if self.propagador:
+            logger.info(
+                f"🎯 Keyframes: caixas propagadas em "
+                f"{self.propagador.taxa_propagacao() * 100:.0f}% dos frames"
+            )
+        if self.gatilho_queda:
+            logger.info(
+                f"🪜 Cascata de quedas: modelo customizado em "
+                f"{self.gatilho_queda.taxa_execucao() * 100:.0f}% dos frames | "
+                f"disparos: {self.gatilho_queda.disparos}"
+            )
+    
     def executar(self):
         """Loop principal de captura e inferência."""
         try:
             self.inicializar_modelo()
+            self.inicializar_troca_modelo()
             self.inicializar_captura()
             self.inicializar_ffmpeg()
+            self.inicializar_memoria_compartilhada()
+            self.inicializar_metricas()
             
             self.running = True
             self.start_time = time.time()
-            frame_time = 1.0 / FPS
+            self.resumo.iniciar()
             
             logger.info("🚀 Iniciando loop de inferência...")
-            logger.info(f"📊 Configuração: {FRAME_WIDTH}x{FRAME_HEIGHT} @ {FPS}fps")
+            logger.info(
+                f"📊 Configuração: {FRAME_WIDTH}x{FRAME_HEIGHT} @ "
+                f"{f'{FPS}fps' if self.limitar_fps else 'sem limite de FPS'} | modo: {self.modo_pipeline}"
+            )
             
-            while self.running:
-                loop_start = time.time()
-                
-                # Capturar screenshot
-                screenshot = np.array(self.sct.grab(self.monitor))
-                frame = cv2.resize(screenshot[:, :, :3], (FRAME_WIDTH, FRAME_HEIGHT))
-                
-                # Processar frame
-                resultado = self.processar_frame(frame)
-                if resultado:
-                    status, contagem_quarto, pessoas_banheiro, alertas = resultado
-                else:
-                    status, contagem_quarto, pessoas_banheiro, alertas = "erro", 0, 0, 0
-                
-                self.frame_count += 1
-                
-                # Log periódico
-                if self.frame_count % (FPS * 5) == 0:  # A cada 5 segundos
-                    elapsed = time.time() - self.start_time
-                    fps_actual = self.frame_count / elapsed if elapsed > 0 else 0
-                    logger.info(
-                        f"✅ {self.frame_count} frames processados | "
-                        f"FPS: {fps_actual:.2f} | Status: {status} | "
-                        f"Quarto: {contagem_quarto} pessoas | "
-                        f"Banheiro: {pessoas_banheiro} pessoas | "
-                        f"Alertas: {alertas}"
-                    )
-                
-                # Controlar FPS
-                elapsed_frame = time.time() - loop_start
-                sleep_time = max(0, frame_time - elapsed_frame)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+            if self.modo_pipeline == "estagios":
+                self.executar_pipeline()
+            else:
+                self.executar_sequencial()
                 
         except KeyboardInterrupt:
             logger.info("🛑 Interrompido manualmente pelo usuário.")
@@ -646,39 +900,229 @@ class StreamInferenciaRTSP:
         finally:
             self.finalizar()
     
+    def executar_sequencial(self):
+        """Executa captura, inferência, desenho e envio em sequência na mesma thread."""
+        frame_time = 1.0 / FPS
+        
+        while self.running:
+            loop_start = time.time()
+            t_captura = time.perf_counter()
+            
+            # Capturar screenshot
+            frame = self.capturar_frame()
+            if frame is None:
+                logger.info("🏁 Fim da fonte de frames")
+                break
+            
+            # Processar frame
+            resultado = self.processar_frame(frame)
+            if resultado:
+                status, contagem_quarto, pessoas_banheiro, alertas = resultado
+            else:
+                status, contagem_quarto, pessoas_banheiro, alertas = "erro", 0, 0, 0
+            
+            self.registrar_frame(t_captura)
+            self.log_periodico(status, contagem_quarto, pessoas_banheiro, alertas)
+            
+            # Controlar FPS
+            if not self.limitar_fps:
+                continue
+            elapsed_frame = time.time() - loop_start
+            sleep_time = max(0, frame_time - elapsed_frame)
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+    
+    def executar_pipeline(self):
+        """
+        Executa o processamento em estágios com filas limitadas.
+        
+        Captura → inferência (modelo + lógica de monitoramento) → renderização →
+        codificação (painel + FFmpeg). O estado de tracking e do banheiro fica
+        inteiro no estágio de inferência, então não há concorrência sobre ele.
+        """
+        frame_time = 1.0 / FPS
+        proximo_frame = [time.time()]
+        
+        def estagio_captura():
+            # Controlar FPS na origem
+            if self.limitar_fps:
+                espera = proximo_frame[0] - time.time()
+                if espera > 0:
+                    time.sleep(espera)
+                proximo_frame[0] = max(proximo_frame[0] + frame_time, time.time())
+            t_captura = time.perf_counter()
+            frame = self.capturar_frame()
+            if frame is None:
+                logger.info("🏁 Fim da fonte de frames")
+                return FIM
+            return {'frame': frame, 't_captura': t_captura}
+        
+        def estagio_inferencia(item):
+            item['results'], reutilizado = self.inferir_com_portao(item['frame'])
+            item['estado'] = self.analisar(item['results'], item['frame'], reutilizado)
+            return item
+        
+        def estagio_renderizacao(item):
+            if self.ha_consumidores():
+                item['annotated'] = self.renderizar(item['frame'], item['estado'])
+            else:
+                item['annotated'] = None
+            return item
+        
+        def estagio_codificacao(item):
+            estado = item['estado']
+            try:
+                self.publicar(item['annotated'], estado, item['frame'])
+            finally:
+                self.registrar_frame(item['t_captura'])
+                self.log_periodico(
+                    estado['status'], estado['contagem_quarto'],
+                    len(estado['pessoas_banheiro']), len(estado['alertas_banheiro'])
+                )
+        
+        self.pipeline = PipelineEstagios(tamanho_fila=PIPELINE_QUEUE_SIZE)
+        # Na captura, descartar o frame mais antigo é melhor que acumular atraso
+        # (no replay sem limite de FPS todo frame deve ser processado)
+        self.pipeline.adicionar_estagio(
+            "captura", estagio_captura, descartar_se_cheia=self.limitar_fps or not self.replay
+        )
+        self.pipeline.adicionar_estagio("inferencia", estagio_inferencia)
+        self.pipeline.adicionar_estagio("renderizacao", estagio_renderizacao)
+        self.pipeline.adicionar_estagio("codificacao", estagio_codificacao)
+        for estagio in self.pipeline.estagios:
+            if estagio.entrada is not None:
+                self.metricas.expor('fila_profundidade', estagio.entrada.qsize,
+                                    ajuda="Itens aguardando em cada fila", fila=estagio.nome)
+            self.metricas.expor('frames_descartados_total', lambda e=estagio: e.itens_descartados,
+                                tipo='counter', ajuda="Frames descartados por fila cheia ou falha",
+                                etapa=estagio.nome)
+            self.metricas.expor('erros_estagio_total', lambda e=estagio: e.erros, tipo='counter',
+                                ajuda="Exceções por estágio do pipeline", estagio=estagio.nome)
+        self.pipeline.iniciar()
+        
+        try:
+            while self.running and self.pipeline.ativo():
+                time.sleep(0.5)
+        finally:
+            self.pipeline.parar()
+            self.pipeline.aguardar(timeout=5)
+    
     def finalizar(self):
         """Finaliza todos os recursos."""
         logger.info("🚪 Finalizando recursos...")
         self.running = False
         
-        if self.process:
-            try:
-                if self.process.stdin:
-                    self.process.stdin.close()
-                self.process.terminate()
-                self.process.wait(timeout=5)
-                logger.info("✅ Processo FFmpeg encerrado.")
-            except subprocess.TimeoutExpired:
-                logger.warning("⚠️ FFmpeg não respondeu ao terminate. Forçando kill...")
-                self.process.kill()
-                self.process.wait()
-            except Exception as e:
-                logger.error(f"❌ Erro ao finalizar FFmpeg: {e}")
+        if self.publicador:
+            self.publicador.parar()
+        
+        if self.gravador_clipes:
+            self.gravador_clipes.parar()
+        
+        if self.servidor_metricas:
+            self.servidor_metricas.parar()
+        
+        if self.troca_modelo:
+            self.troca_modelo.parar()
+        
+        if self.pool:
+            self.pool.parar()
         
-        if self.sct:
+        if self.anel_frames:
+            self.anel_frames.fechar()
+        if self.anel_frames_cru:
+            self.anel_frames_cru.fechar()
+        
+        if self.captura:
             try:
-                self.sct.close()
-                logger.info("✅ Captura de tela encerrada.")
+                self.captura.fechar()
+                logger.info("✅ Captura encerrada.")
             except Exception as e:
                 logger.error(f"❌ Erro ao finalizar captura: {e}")
         
+        self.registrar_resumo()
         logger.info("✅ Transmissão encerrada.")
+    
+    def registrar_resumo(self):
+        """Registra o resumo de vazão/latência da execução (e salva em JSON se pedido)."""
+        resumo = self.resumo.resumo()
+        if not resumo['frames']:
+            return
+        resumo.update({
+            'fonte': str(self.replay) if self.replay else f"monitor:{MONITOR_IDX}",
+            'modo': self.modo_pipeline,
+            'backend': self.backend or INFERENCE_BACKEND,
+            'imgsz': self.imgsz,
+            'workers': self.workers,
+            'resolucao': f"{FRAME_WIDTH}x{FRAME_HEIGHT}",
+            'limitar_fps': self.limitar_fps,
+        })
+        if self.detector_movimento:
+            resumo['modelo_pulado'] = round(self.detector_movimento.taxa_pulos(), 3)
+        if self.gatilho_queda:
+            resumo['modelo_queda_execucao'] = round(self.gatilho_queda.taxa_execucao(), 3)
+        if self.publicador:
+            resumo['ffmpeg'] = self.publicador.estatisticas()
+        
+        logger.info(
+            f"📈 Resumo: {resumo['frames']} frames em {resumo['duracao_s']}s | "
+            f"{resumo['fps']} FPS | latência p50/p95/p99: "
+            f"{resumo.get('latencia_p50_ms')}/{resumo.get('latencia_p95_ms')}/{resumo.get('latencia_p99_ms')} ms"
+        )
+        if self.resumo_path:
+            try:
+                with open(self.resumo_path, 'w') as f:
+                    json.dump(resumo, f, indent=2, ensure_ascii=False)
+                logger.info(f"💾 Resumo salvo em {self.resumo_path}")
+            except Exception as e:
+                logger.error(f"❌ Erro ao salvar resumo: {e}")
 
 
 def main():
     """Função principal."""
+    parser = argparse.ArgumentParser(description="Inferência YOLO com transmissão RTSP")
+    parser.add_argument("--replay", type=str, default=None,
+                        help="Vídeo ou diretório usado no lugar da captura de tela")
+    parser.add_argument("--repetir", action="store_true", help="Repetir o replay indefinidamente")
+    parser.add_argument("--max-frames", type=int, default=None, help="Encerrar após N frames")
+    parser.add_argument("--tempo-real", action="store_true",
+                        help="No replay, respeitar o FPS configurado (padrão: velocidade máxima)")
+    parser.add_argument("--rtsp", action="store_true",
+                        help="No replay, publicar também via FFmpeg/RTSP (padrão: desligado)")
+    parser.add_argument("--modo", choices=["sequencial", "estagios"], default=PIPELINE_MODE,
+                        help=f"Modo do pipeline (padrão: {PIPELINE_MODE})")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=None,
+                        help=f"Backend de inferência (padrão: {INFERENCE_BACKEND})")
+    parser.add_argument("--imgsz", type=int, default=None,
+                        help=f"Tamanho de entrada da inferência (padrão: {INFERENCE_IMGSZ})")
+    parser.add_argument("--resumo", type=str, default=None,
+                        help="Salvar o resumo de vazão/latência neste arquivo JSON")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Processos de inferência (padrão: {INFERENCE_WORKERS}; 0 = no próprio processo)")
+    parser.add_argument("--publicador", choices=["ffmpeg", "pyav"], default=None,
+                        help=f"Publicador RTSP (padrão: {RTSP_PUBLISHER})")
+    parser.add_argument("--producao", action="store_true",
+                        help="No replay, manter notificações, banco, arquivos do painel, memória "
+                             "compartilhada e /metrics (padrão: desligados)")
+    args = parser.parse_args()
+    
     try:
-        stream = StreamInferenciaRTSP()
+        stream = StreamInferenciaRTSP(
+            replay=args.replay,
+            repetir_replay=args.repetir,
+            max_frames=args.max_frames,
+            limitar_fps=args.tempo_real or not args.replay,
+            publicar_rtsp=RTSP_PUBLISH_ENABLED and (args.rtsp or not args.replay),
+            modo_pipeline=args.modo,
+            backend=args.backend,
+            imgsz=args.imgsz,
+            resumo_path=args.resumo,
+            workers=args.workers,
+            publicador=args.publicador,
+            efeitos_producao=True if (args.producao or not args.replay) else False
+        )
+        if hasattr(signal, 'SIGHUP'):
+            # kill -HUP <pid>: recarrega os pesos de todos os modelos, sem parar o stream
+            signal.signal(signal.SIGHUP, lambda *_: stream.troca_modelo and stream.troca_modelo.solicitar_todos())
         stream.executar()
     except Exception as e:
         logger.critical(f"❌ Erro crítico: {e}", exc_info=True)